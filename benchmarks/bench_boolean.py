@@ -0,0 +1,20 @@
+''' Benchmarks of the boolean operations between meshes '''
+from madcad.mathutils import vec3
+from madcad.generation import icosphere
+from madcad.boolean import union, difference
+
+
+class Boolean:
+	''' Boolean operations between two overlapping spheres of increasing resolution '''
+	params = [8, 16, 32]
+	param_names = ['divisions']
+	
+	def setup(self, divisions):
+		self.a = icosphere(vec3(0), 1, resolution=('div', divisions))
+		self.b = icosphere(vec3(0.8, 0.3, 0.1), 1, resolution=('div', divisions))
+	
+	def time_union(self, divisions):
+		union(self.a, self.b)
+	
+	def time_difference(self, divisions):
+		difference(self.a, self.b)
@@ -0,0 +1,22 @@
+''' Benchmarks of the chamfer and bevel operations '''
+from madcad.mathutils import vec3
+from madcad.primitives import Circle
+from madcad.generation import extrusion, flatsurface, wire
+from madcad.cut import chamfer, bevel
+
+
+class Cut:
+	''' Chamfer and bevel of the circular edges of a cylinder of increasing resolution '''
+	params = [16, 64, 256]
+	param_names = ['divisions']
+	
+	def setup(self, divisions):
+		base = flatsurface(wire(Circle((vec3(0), vec3(0,0,1)), 1, resolution=('div', divisions)))).flip()
+		self.mesh = extrusion(vec3(0,0,2), base)
+		self.edges = self.mesh.frontiers().edges
+	
+	def time_chamfer(self, divisions):
+		chamfer(self.mesh.own(points=True, faces=True, tracks=True), self.edges, ('width', 0.1))
+	
+	def time_bevel(self, divisions):
+		bevel(self.mesh.own(points=True, faces=True, tracks=True), self.edges, ('width', 0.1))
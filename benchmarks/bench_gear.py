@@ -0,0 +1,12 @@
+''' Benchmarks of the gear generation '''
+from madcad.gear import gear
+
+
+class Gear:
+	''' Generation of a full gear with an increasing number of teeth '''
+	params = [12, 30, 60]
+	param_names = ['teeth']
+	
+	def time_gear(self, teeth):
+		# gear is cached by default, measure the generation itself
+		gear.__wrapped__(3, teeth, 4, bore_radius=2)
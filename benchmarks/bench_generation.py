@@ -0,0 +1,23 @@
+''' Benchmarks of the mesh generation functions '''
+from math import pi
+from madcad.mathutils import vec3, mat4, translate, rotate
+from madcad.primitives import Circle
+from madcad.generation import extrans, revolution, icosphere, web
+
+
+class Generation:
+	''' Generation of surfaces with an increasing number of sections or subdivisions '''
+	params = [16, 64, 256]
+	param_names = ['divisions']
+	
+	def setup(self, divisions):
+		self.profile = web(Circle((vec3(2,0,0), vec3(0,1,0)), 0.5, resolution=('div', divisions)))
+	
+	def time_extrans(self, divisions):
+		extrans(self.profile, (translate(vec3(0,0,i*0.1)) * rotate(i*0.05, vec3(0,0,1))  for i in range(divisions)))
+	
+	def time_revolution(self, divisions):
+		revolution(2*pi, (vec3(0), vec3(0,0,1)), self.profile, resolution=('div', divisions))
+	
+	def time_icosphere(self, divisions):
+		icosphere(vec3(0), 1, resolution=('div', divisions))
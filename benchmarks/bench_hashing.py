@@ -0,0 +1,23 @@
+''' Benchmarks of the spatial hashing structures '''
+import numpy as np
+from madcad.mathutils import vec3, typedlist
+from madcad.hashing import PointSet
+
+
+class Hashing:
+	''' Insertion of random points in a PointSet, with about one duplicate per point '''
+	params = [10_000, 100_000, 500_000]
+	param_names = ['points']
+	
+	def setup(self, points):
+		coords = np.random.default_rng(0).random((points//2, 3))
+		coords = np.concatenate([coords, coords + 1e-9])
+		self.points = typedlist(coords, vec3)
+	
+	def time_add(self, points):
+		s = PointSet(1e-6)
+		for p in self.points:
+			s.add(p)
+	
+	def time_add_many(self, points):
+		PointSet(1e-6).add_many(self.points)
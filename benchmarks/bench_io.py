@@ -0,0 +1,26 @@
+''' Benchmarks of the file reading and writing '''
+import os, tempfile
+from madcad.mathutils import vec3
+from madcad.generation import icosphere
+from madcad import io
+
+
+class IO:
+	''' Write and read a sphere of increasing resolution in every supported format '''
+	params = (['stl', 'ply', 'madcad', 'pickle'], [32, 128])
+	param_names = ['format', 'divisions']
+	
+	def setup(self, format, divisions):
+		self.directory = tempfile.TemporaryDirectory()
+		self.mesh = icosphere(vec3(0), 1, resolution=('div', divisions))
+		self.file = os.path.join(self.directory.name, 'mesh.'+format)
+		io.write(self.mesh, self.file)
+	
+	def teardown(self, format, divisions):
+		self.directory.cleanup()
+	
+	def time_write(self, format, divisions):
+		io.write(self.mesh, self.file)
+	
+	def time_read(self, format, divisions):
+		io.read(self.file)
@@ -0,0 +1,17 @@
+''' Benchmarks of the kinematic solver '''
+from madcad.mathutils import vec3
+from madcad.kinematic import Solid, solvekin
+from madcad.joints import Pivot
+
+
+class Kinematic:
+	''' Solve a chain of pivots starting far from its solution '''
+	params = [3, 6, 10]
+	param_names = ['joints']
+	
+	def time_solvekin(self, joints):
+		solids = [Solid()] + [Solid(pose=(vec3(i,1,0), vec3(0.1*i,0,0)))  for i in range(joints)]
+		csts = [
+			Pivot(solids[i], solids[i+1], (vec3(0,0,1), vec3(1,0,0)), (vec3(0), vec3(1,0,0)))
+			for i in range(joints)]
+		solvekin(csts, [solids[0]], precision=1e-4)
@@ -0,0 +1,22 @@
+''' Benchmarks of the Mesh methods '''
+from madcad.mathutils import vec3
+from madcad.mesh import Mesh
+from madcad.generation import icosphere
+
+
+class MeshMethods:
+	''' Mesh methods on spheres of increasing resolution '''
+	params = [16, 64, 128]
+	param_names = ['divisions']
+	
+	def setup(self, divisions):
+		sphere = icosphere(vec3(0), 1, resolution=('div', divisions))
+		self.sphere = sphere
+		# every face with its own points
+		self.split = Mesh([sphere.points[i]  for f in sphere.faces for i in f], [(i, i+1, i+2)  for i in range(0, 3*len(sphere.faces), 3)])
+	
+	def time_mergeclose(self, divisions):
+		self.split.own(points=True, faces=True, tracks=True).mergeclose()
+	
+	def time_display_buffers(self, divisions):
+		self.sphere.display_buffers()
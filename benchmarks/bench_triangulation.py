@@ -0,0 +1,24 @@
+''' Benchmarks of the outline triangulation functions '''
+from math import cos, sin, pi
+from madcad.mathutils import vec3
+from madcad.mesh import Web, Wire
+from madcad.triangulation import triangulation_outline, triangulation_sweepline
+
+
+class Triangulation:
+	''' Triangulation of a star-shaped polygon, which has many non-convex points '''
+	params = [100, 500, 2000]
+	param_names = ['points']
+	
+	def setup(self, points):
+		self.outline = Wire([
+			(1 + 0.3*(i%2)) * vec3(cos(2*pi*i/points), sin(2*pi*i/points), 0)
+			for i in range(points)])
+		self.outline.indices.append(0)
+		self.lines = Web(self.outline.points, [(i, (i+1)%points) for i in range(points)])
+	
+	def time_outline(self, points):
+		triangulation_outline(self.outline)
+	
+	def time_sweepline(self, points):
+		triangulation_sweepline(self.lines, vec3(0,0,1))
@@ -0,0 +1,91 @@
+''' Standalone runner for the benchmarks, for when asv is not available.
+	
+	The benchmark modules follow the asv conventions: classes with `params`, `param_names`, optional `setup` and `teardown` methods, and benchmarks named `time_*`. Each benchmark is run for each combination of parameters, and its best time over the repetitions is kept.
+	
+	Usage:
+		
+		python -m benchmarks.run [-k FILTER] [--repeat N] [--save FILE] [--compare FILE] [--threshold RATIO]
+	
+	Results can be saved to a json file and later used as a baseline: the run fails if any benchmark is slower than its baseline time multiplied by the threshold. Results depend on the machine, so baselines are not stored in the repository, the default location `benchmarks/results/` is ignored by git.
+'''
+import os, sys, json, time, importlib, itertools, argparse
+
+
+def discover():
+	''' Yield the benchmark classes found in the `bench_*.py` modules of this directory '''
+	directory = os.path.dirname(os.path.abspath(__file__))
+	for filename in sorted(os.listdir(directory)):
+		if filename.startswith('bench_') and filename.endswith('.py'):
+			module = importlib.import_module('benchmarks.' + filename[:-3])
+			for name, cls in vars(module).items():
+				if isinstance(cls, type) and cls.__module__ == module.__name__:
+					yield module.__name__.split('.')[-1] + '.' + name, cls
+
+def combinations(cls) -> list:
+	''' All the parameter sets of a benchmark class '''
+	params = getattr(cls, 'params', None)
+	if params is None:
+		return [()]
+	if len(getattr(cls, 'param_names', ())) > 1:
+		return list(itertools.product(*params))
+	return [(p,) for p in params]
+
+def run(filter='', repeat=5, output=print) -> dict:
+	''' Run the benchmarks matching the filter, and return a dictionnary of the best time of each '''
+	results = {}
+	for name, cls in discover():
+		methods = [m for m in dir(cls) if m.startswith('time_')]
+		for params in combinations(cls):
+			keys = {m: '{}.{}({})'.format(name, m, ', '.join(map(repr, params)))  for m in methods}
+			keys = {m: key  for m, key in keys.items()  if filter in key}
+			if not keys:
+				continue
+			bench = cls()
+			if hasattr(bench, 'setup'):
+				bench.setup(*params)
+			try:
+				for method, key in keys.items():
+					times = []
+					for i in range(repeat):
+						start = time.perf_counter()
+						getattr(bench, method)(*params)
+						times.append(time.perf_counter() - start)
+					results[key] = min(times)
+					output('{:<60} {:>10.4f} s'.format(key, results[key]))
+			finally:
+				if hasattr(bench, 'teardown'):
+					bench.teardown(*params)
+	return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+	''' Return the benchmarks slower than their baseline by more than the threshold ratio, as tuples `(key, baseline, result)` '''
+	return [(key, baseline[key], result)
+			for key, result in results.items()
+			if key in baseline and result > baseline[key] * threshold]
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='run the madcad benchmarks')
+	parser.add_argument('-k', dest='filter', default='', help='only run the benchmarks whose name contain this string')
+	parser.add_argument('--repeat', type=int, default=5, help='number of runs of each benchmark, the best is kept')
+	parser.add_argument('--save', metavar='FILE', help='save the results to this json file')
+	parser.add_argument('--compare', metavar='FILE', help='compare the results to the baseline in this json file')
+	parser.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio above which a benchmark is considered regressing')
+	args = parser.parse_args()
+	
+	results = run(args.filter, args.repeat)
+	
+	if args.save:
+		if os.path.dirname(args.save):
+			os.makedirs(os.path.dirname(args.save), exist_ok=True)
+		with open(args.save, 'w') as file:
+			json.dump(results, file, indent='\t')
+	
+	if args.compare:
+		with open(args.compare) as file:
+			baseline = json.load(file)
+		regressions = compare(results, baseline, args.threshold)
+		for key, before, after in regressions:
+			print('regression {:<49} {:>10.4f} s -> {:.4f} s  (x{:.2f})'.format(key, before, after, after/before))
+		if regressions:
+			sys.exit(1)
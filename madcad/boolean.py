@@ -33,6 +33,9 @@ from operator import itemgetter
 from functools import singledispatch
 from time import time
 from math import inf
+from contextlib import contextmanager
+from concurrent.futures import Executor, ThreadPoolExecutor
+import numpy as np
 from .mathutils import *
 from . import core
 from .mesh import Mesh, Web, Wire, web, edgekey, connef, connpe, line_simplification
@@ -46,9 +49,23 @@ __all__ = ['pierce', 'boolean', 'intersection', 'union', 'difference']
 	
 # ------- implementated operators -------
 
+@contextmanager
+def workpool(workers):
+	''' Context providing an executor for the given `workers` argument, or None if the work should be done sequentially 
+	
+		`workers` can be a number of threads, or an existing executor that will be used but not shut down
+	'''
+	if isinstance(workers, Executor):
+		yield workers
+	elif workers and workers > 1:
+		with ThreadPoolExecutor(workers) as pool:
+			yield pool
+	else:
+		yield None
+
 
 
-def cut_mesh(m1, m2, prec=None) -> '(Mesh, Web)':
+def cut_mesh(m1, m2, prec=None, workers=None) -> '(Mesh, Web)':
 	''' Cut m1 faces at their intersections with m2. 
 		
 		Return:	
@@ -60,23 +77,27 @@ def cut_mesh(m1, m2, prec=None) -> '(Mesh, Web)':
 		
 		Returning the intersection edges in m1 and associated m2 faces.
 		The algorithm is using ngon intersections and retriangulation, in order to avoid infinite loops and intermediate triangles.
+		
+		`workers` is a number of threads (or an existing `concurrent.futures.Executor`) the intersections and retriangulations of the flat regions are split on. The result does not depend on it.
 	'''
 	if not prec:	prec = m1.precision()
 	frontier = Web(m1.points, groups=m2.faces)	# cut points for each face from m2
 	
 	# topology informations for optimization
 	points = hashing.PointSet(prec, manage=m1.points)
-	prox2 = hashing.PositionMap(max(hashing.meshcellsize(m2), hashing.meshcellsize(m1)))
-	for f2 in range(len(m2.faces)):
-		prox2.add(m2.facepoints(f2), f2)
+	points1, faces1 = hashing.mesh_arrays(m1)
+	points2, faces2 = hashing.mesh_arrays(m2)
+	prox2 = hashing.PositionIndex(max(hashing.meshcellsize(m2), hashing.meshcellsize(m1)), points2, faces2)
+	closeoffsets, close = prox2.query_many(points1, faces1)
 	conn = connef(m1.faces)
 	
-	mn = Mesh(m1.points, groups=m1.groups)	# resulting mesh
+	# collect the flat regions hitting m2
+	regions = []
 	grp = [-1]*len(m1.faces)	# flat region id
 	currentgrp = -1
 	for i in range(len(m1.faces)):
 		# process the flat surface starting here, if the m1's triangle hits m2
-		if grp[i] == -1 and m1.facepoints(i) in prox2:
+		if grp[i] == -1 and closeoffsets[i] < closeoffsets[i+1]:
 			
 			# a triangle cutted by an other will split it into 5 triangles, and each will be divided in 5 more if the cutting is stupidly incrmental
 			# here we collect all the planar triangles and cut it as one n-gon to reduce the complexity
@@ -95,7 +116,27 @@ def cut_mesh(m1, m2, prec=None) -> '(Mesh, Web)':
 					f = m1.faces[fi]
 					for edge in ((f[1],f[0]), (f[2],f[1]), (f[0],f[2])):
 						if edge in conn:	front.append(conn[edge])
-			
+			regions.append((surf, normal, track))
+	
+	def intersections(region):
+		''' intersections of all the region triangles with the close m2 triangles '''
+		surf = np.array(region[0], dtype=np.int64)
+		counts = closeoffsets[surf+1] - closeoffsets[surf]
+		pairs = np.empty((counts.sum(), 2), dtype=np.int64)
+		pairs[:,0] = np.repeat(surf, counts)
+		pairs[:,1] = close[np.arange(len(pairs)) + np.repeat(closeoffsets[surf] - np.cumsum(counts) + counts, counts)]
+		hits, sides, positions = core.intersect_triangles_many(points1, faces1, points2, faces2, pairs, 8*prec)
+		return [
+			(f1, f2, ((s[0][0], s[0][1], vec3(*p[0])), (s[1][0], s[1][1], vec3(*p[1]))))
+			for (f1, f2), s, p in zip(pairs[hits].tolist(), sides.tolist(), positions.tolist())
+			]
+	
+	with workpool(workers) as pool:
+		pmap = pool.map if pool else map
+		
+		# the intersection points are merged between regions, so their insertion must remain sequential
+		cutted = []
+		for (surf, normal, track), found in zip(regions, pmap(intersections, regions)):
 			# get region ORIENTED outlines - aka the outline of the n-gon
 			outline = set()
 			for f1 in surf:
@@ -108,34 +149,31 @@ def cut_mesh(m1, m2, prec=None) -> '(Mesh, Web)':
 			# process all ngon triangles
 			# enrich outlines with intersections
 			segts = {}
-			for f1 in surf:
+			for f1, f2, intersect in found:
 				f = m1.faces[f1]
-				for f2 in set( prox2.get(m1.facepoints(f1)) ):
-					intersect = core.intersect_triangles(m1.facepoints(f1), m2.facepoints(f2), 8*prec)
-					if intersect:
-						ia, ib = intersect[0][2], intersect[1][2]
-						if distance2(ia, ib) <= prec**2:	continue
-						# insert intersection points
-						seg = (points.add(ia), points.add(ib))
-						# associate the intersection edge with the m2's face
-						if seg in segts:	continue
-						segts[seg] = f2
-						
-						# cut the outline if needed
-						for i in range(2):
-							ii = intersect[i]
-							if ii[0] != 0:	continue
-							o = f[ii[1]], f[ii[1]-2]
-							if o not in original:	continue
-							# find the place where the outline is cutted
-							p = m1.points[seg[i]]
-							e = min(outline, key=lambda e: distance_pe(p, (m1.points[e[0]], m1.points[e[1]])))  # this perfect minimul should not be needed as the first below the precision should be unique, but for precision robustness ...
-							if seg[i] not in e:
-								#print('  cross', i, e)
-								outline.remove(e)
-								outline.add((e[0],seg[i]))
-								outline.add((seg[i],e[1]))
-										
+				ia, ib = intersect[0][2], intersect[1][2]
+				if distance2(ia, ib) <= prec**2:	continue
+				# insert intersection points
+				seg = (points.add(ia), points.add(ib))
+				# associate the intersection edge with the m2's face
+				if seg in segts:	continue
+				segts[seg] = f2
+				
+				# cut the outline if needed
+				for i in range(2):
+					ii = intersect[i]
+					if ii[0] != 0:	continue
+					o = f[ii[1]], f[ii[1]-2]
+					if o not in original:	continue
+					# find the place where the outline is cutted
+					p = m1.points[seg[i]]
+					e = min(outline, key=lambda e: distance_pe(p, (m1.points[e[0]], m1.points[e[1]])))  # this perfect minimul should not be needed as the first below the precision should be unique, but for precision robustness ...
+					if seg[i] not in e:
+						#print('  cross', i, e)
+						outline.remove(e)
+						outline.add((e[0],seg[i]))
+						outline.add((seg[i],e[1]))
+			
 			# simplify the intersection lines
 			segts = Web(m1.points, segts.keys(), segts.values(), frontier.groups)
 			segts.mergepoints(line_simplification(segts, prec))
@@ -144,12 +182,17 @@ def cut_mesh(m1, m2, prec=None) -> '(Mesh, Web)':
 			# retriangulate the cutted surface
 			segts.edges.extend(uvec2(b,a) for a,b in segts.edges[:])
 			segts.edges.extend(outline)
-			flat = triangulation.triangulation_closest(segts, normal, prec)
-			# append the triangulated face, in association with the original track
-			flat.tracks = typedlist.full(track, len(flat.faces), 'I')
-			flat.groups = m1.groups
-			
-			mn += flat
+			cutted.append((segts, normal, track))
+		
+		# the triangulations only read the points, so they can be run in any order
+		flats, offsets = triangulation.triangulate_many(
+						[segts  for segts, normal, track in cutted], 
+						[normal  for segts, normal, track in cutted], 
+						prec, pool)
+		# the triangulated faces are associated with the original tracks
+		mn = Mesh(m1.points, flats.faces, 
+				typedlist(np.repeat(np.array([track  for segts, normal, track in cutted], dtype=np.uint32), np.diff(offsets)), 'I'),
+				m1.groups)	# resulting mesh
 	
 	# append non-intersected faces
 	for f,t,grp in zip(m1.faces, m1.tracks, grp):
@@ -160,10 +203,10 @@ def cut_mesh(m1, m2, prec=None) -> '(Mesh, Web)':
 	return mn, frontier
 
 
-def pierce_mesh(m1, m2, side=False, prec=None, strict=False) -> Mesh:
+def pierce_mesh(m1, m2, side=False, prec=None, strict=False, workers=None) -> Mesh:
 
 	if not prec:	prec = m1.precision()
-	m1, frontier = cut_mesh(m1, m2, prec)
+	m1, frontier = cut_mesh(m1, m2, prec, workers)
 	
 	conn1 = connef(m1.faces)		# connectivity for propagation
 	stops = set(edgekey(*e) for e in frontier.edges)  # propagation stop points
@@ -237,22 +280,25 @@ def pierce_mesh(m1, m2, side=False, prec=None, strict=False) -> Mesh:
 				#scn3D.append(text.Text((p[0]+p[1]+p[2])/3, str(u), 9, (1,0,1), align=('center', 'center')))
 	
 	# filter mesh content to keep
-	return Mesh(
-			m1.points,
-			(f for u,f in zip(used, m1.faces) if u > 0),
-			(t for u,t in zip(used, m1.tracks) if u > 0),
-			m1.groups,
-			)
+	return m1.filter(np.array(used) > 0)
 
 #debug_propagation = True
 #scn3D = []
 			
-def boolean_mesh(m1, m2, sides=(False,True), prec=None) -> Mesh:
+def boolean_mesh(m1, m2, sides=(False,True), prec=None, workers=None) -> Mesh:
 
 	if not prec:	prec = max(m1.precision(), m2.precision())
 	
-	mc1 = pierce_mesh(m1, m2, sides[0], prec)
-	mc2 = pierce_mesh(m2, m1, sides[1], prec)
+	with workpool(workers) as pool:
+		if pool:
+			# each pass cuts its own copy of the points, so that no pass reads the points inserted by the other
+			with ThreadPoolExecutor(1) as second:
+				mc2 = second.submit(pierce_mesh, m2.own(points=True), m1, sides[1], prec, workers=pool)
+				mc1 = pierce_mesh(m1.own(points=True), m2, sides[0], prec, workers=pool)
+				mc2 = mc2.result()
+		else:
+			mc1 = pierce_mesh(m1, m2, sides[0], prec)
+			mc2 = pierce_mesh(m2, m1, sides[1], prec)
 	if sides[0] and not sides[1]:		mc1 = mc1.flip()
 	if not sides[0] and sides[1]:		mc2 = mc2.flip()
 	res = mc1 + mc2
@@ -276,9 +322,8 @@ def cut_web(w1: Web, ref: Web, prec=None) -> '(Web, Wire)':
 	
 	# topology informations for optimization
 	points = hashing.PointSet(prec, manage=w1.points)
-	prox = hashing.PositionMap(hashing.meshcellsize(ref))
-	for e in range(len(ref.edges)):
-		prox.add(ref.edgepoints(e), e)
+	prox = hashing.PositionIndex.from_mesh(ref)
+	closeoffsets, closeitems = prox.query_many(*hashing.mesh_arrays(w1))
 	conn = connpe(w1.edges)
 	
 	mn = Web(w1.points, groups=w1.groups)  # resulting web
@@ -286,7 +331,7 @@ def cut_web(w1: Web, ref: Web, prec=None) -> '(Web, Wire)':
 		processed = False  # flag enabled when the edge is reconstructed
 		
 		# collect edges in ref that can have intersection with e1
-		close = set( prox.get(w1.edgepoints(e1)) )
+		close = closeitems[closeoffsets[e1]:closeoffsets[e1+1]].tolist()
 		if close:
 			# no need to get the straight zone around because on the case of an edge, it will not grow in complexity more than the number of cut segments
 			# and an edge is easy to reweb after multiple intersections
@@ -371,8 +416,8 @@ def pierce_web(web, ref, side=False, prec=None) -> Web:
 				web.groups,
 				)
 				
-def boolean_web(w1, w2, sides, prec=None) -> Web:
-
+def boolean_web(w1, w2, sides, prec=None, workers=None) -> Web:
+	# the second pass depends on the first one, so `workers` has no effect on webs
 	if not prec:	prec = max(w1.precision(), w2.precision())
 	
 	mc1 = pierce_web(w1, w2, sides[0], prec)
@@ -447,9 +492,8 @@ def cut_web_mesh(w1: Web, ref: Mesh, prec=None) -> '(Web, Wire)':
 	
 	# topology informations for optimization
 	points = hashing.PointSet(prec, manage=w1.points)
-	prox = hashing.PositionMap(hashing.meshcellsize(ref))
-	for f in range(len(ref.faces)):
-		prox.add(ref.facepoints(f), f)
+	prox = hashing.PositionIndex.from_mesh(ref)
+	closeoffsets, closeitems = prox.query_many(*hashing.mesh_arrays(w1))
 	conn = connpe(w1.edges)
 	
 	mn = Web(w1.points, groups=w1.groups)  # resulting web
@@ -457,7 +501,7 @@ def cut_web_mesh(w1: Web, ref: Mesh, prec=None) -> '(Web, Wire)':
 		processed = False	# flag enabled when the edge is reconstructed
 		
 		# collect edges in ref that can have intersection with e1
-		close = set(prox.get(w1.edgepoints(e1)))
+		close = closeitems[closeoffsets[e1]:closeoffsets[e1+1]].tolist()
 		if close:
 		
 			# no need to get the straight zone around because on the case of an edge, it will not grow in complexity more than the number of cut segments
@@ -599,7 +643,7 @@ boolean_ops = {
 	(Mesh,Mesh):	boolean_mesh,
 	(Web,Web):		boolean_web,
 	}
-def boolean(a, b, sides=(False,True), prec=None):
+def boolean(a, b, sides=(False,True), prec=None, workers=None):
 	''' Cut two web/mesh and keep its interior or exterior parts
 	
 		Overloads:
@@ -613,26 +657,28 @@ def boolean(a, b, sides=(False,True), prec=None):
 	
 		 - False keeps the exterior part (part exclusive to the other mesh)
 		 - True keeps the common part
+		
+		`workers` is the number of threads to run the operation on. For meshes, the two cutting passes are run concurrently and their flat regions are processed on the thread pool. The result is the same for any number of workers, and describes the same shape as the sequential operation.
 	'''
 	op = boolean_ops.get((type(a), type(b)))
 	if not op:
 		raise TypeError('boolean is not possible between {} and {}'.format(type(a), type(b)))
-	return op(a, b, sides, prec)
+	return op(a, b, sides, prec, workers)
 
-def union(a, b) -> Mesh:
+def union(a, b, workers=None) -> Mesh:
 	''' Return a mesh for the union of the volumes. 
 		It is a boolean with selector `(False,False)`
 	'''
-	return boolean(a,b, (False,False))
+	return boolean(a,b, (False,False), workers=workers)
 
-def intersection(a, b) -> Mesh:	
+def intersection(a, b, workers=None) -> Mesh:	
 	''' Return a mesh for the common volume. 
 		It is a boolean with selector `(True, True)`
 	'''
-	return boolean(a,b, (True,True))
+	return boolean(a,b, (True,True), workers=workers)
 
-def difference(a, b) -> Mesh:	
+def difference(a, b, workers=None) -> Mesh:	
 	''' Return a mesh for the volume of `a` less the common volume with `b`
 		It is a boolean with selector `(False, True)`
 	'''
-	return boolean(a,b, (False,True))
+	return boolean(a,b, (False,True), workers=workers)
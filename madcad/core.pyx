@@ -3,13 +3,15 @@
 # cython: language_level=3, cdivision=True
 
 from libc.math cimport fabs, ceil, floor, sqrt, fmod, isfinite, INFINITY
+from libc.stdlib cimport malloc, realloc, free
 cimport cython
 import glm
+import numpy as np
 
 cdef:
 	DEF NUMPREC = 1e-13
 	
-	double pmod(double l, double r):
+	double pmod(double l, double r) noexcept nogil:
 		''' proceed to a python-like modulo on floats 
 			(C module doesn't give a good reminder for negative values) 
 		'''
@@ -22,62 +24,62 @@ cdef:
 		double y
 		double z
 	
-	double * varr(cvec3 *v):
+	double * varr(cvec3 *v) noexcept nogil:
 		return <double*> v
 
-	double dot(cvec3 a, cvec3 b):
+	double dot(cvec3 a, cvec3 b) noexcept nogil:
 		return a.x*b.x + a.y*b.y + a.z*b.z
-	cvec3 cross(cvec3 a, cvec3 b):
+	cvec3 cross(cvec3 a, cvec3 b) noexcept nogil:
 		return cvec3(a.y*b.z - a.z*b.y,   a.z*b.x - a.x*b.z,   a.x*b.y - a.y*b.x)
-	cvec3 vabs(cvec3 v):
+	cvec3 vabs(cvec3 v) noexcept nogil:
 		return cvec3(fabs(v.x), fabs(v.y), fabs(v.z))
-	double amax(double *v, size_t l):
+	double amax(double *v, size_t l) noexcept nogil:
 		cdef double m
 		m = v[0]
 		for i in range(1,l):
 			if v[i] > m:	m = v[i]
 		return m
-	double amin(double *v, size_t l):
+	double amin(double *v, size_t l) noexcept nogil:
 		cdef double m
 		m = v[0]
 		for i in range(1,l):
 			if v[i] < m:	m = v[i]
 		return m
-	double aimax(double *v, size_t l):
+	double aimax(double *v, size_t l) noexcept nogil:
 		j = 0
 		for i in range(1,l):
 			if v[i] > v[j]:	j = i
 		return j
-	double aimin(double *v, size_t l):
+	double aimin(double *v, size_t l) noexcept nogil:
 		j = 0
 		for i in range(1,l):
 			if v[i] < v[j]:	j = i
 		return j
-	double vmax(cvec3 v):
+	double vmax(cvec3 v) noexcept nogil:
 		return amax(<double*>&v,3)
-	double vmin(cvec3 v):
+	double vmin(cvec3 v) noexcept nogil:
 		return amin(<double*>&v,3)
-	cvec3 vadd(cvec3 a, cvec3 b):
+	cvec3 vadd(cvec3 a, cvec3 b) noexcept nogil:
 		return cvec3(a.x+b.x, a.y+b.y, a.z+b.z)
-	cvec3 vsub(cvec3 a, cvec3 b):
+	cvec3 vsub(cvec3 a, cvec3 b) noexcept nogil:
 		return cvec3(a.x-b.x, a.y-b.y, a.z-b.z)
-	cvec3 vmul(cvec3 v, double r):
+	cvec3 vmul(cvec3 v, double r) noexcept nogil:
 		return cvec3(r*v.x, r*v.y, r*v.z)
-	double length(cvec3 v):
+	double length(cvec3 v) noexcept nogil:
 		return sqrt(dot(v,v))
-	double norminf(cvec3 v):
+	double norminf(cvec3 v) noexcept nogil:
 		cdef cvec3 a = cvec3(abs(v.x), abs(v.y), abs(v.z))
 		return amax(<double*>&a,3)
 
-	cvec3 normalize(cvec3 v):
+	cvec3 normalize(cvec3 v) noexcept nogil:
 		return vmul(v, 1/length(v))
 		
-	cvec3 vaffine(cvec3 b, cvec3 a, double x):
+	cvec3 vaffine(cvec3 b, cvec3 a, double x) noexcept nogil:
 		return cvec3(b.x + a.x*x,
 					b.y + a.y*x,
 					b.z + a.z*x)
 					
-	int visfinite(cvec3 v):
+	int visfinite(cvec3 v) noexcept nogil:
 		return isfinite(v.x) and isfinite(v.y) and isfinite(v.z)
 
 cdef cvec3 glm2c(v):
@@ -91,40 +93,74 @@ cdef cvec3 glm2c(v):
 cdef object c2glm(cvec3 v):
 	return glm.dvec3(v.x, v.y, v.z)
 	
-cdef int dsign(double v):
+cdef int dsign(double v) noexcept nogil:
 	if v > 0:	return 1
 	elif v < 0:	return -1
 	else:		return 0
 	
 
 	
-cdef long key(double f, double cell):
+cdef long key(double f, double cell) noexcept nogil:
 	''' hashing key for a float '''
 	return <long> floor(f/cell)
-	
-def rasterize_segment(spaceo, double cell):
-	''' return a list of hashing keys for an edge '''
-	cdef cvec3 n, v, o
+
+
+# growable buffer of hashing keys, each key is 3 consecutive longs
+cdef struct keybuf:
+	long *data
+	size_t len
+	size_t cap
+
+cdef int keybuf_push(keybuf *buf, long *pk, size_t *reorder) noexcept nogil:
+	''' append a key to the buffer, reordering its coordinates. return -1 on allocation failure '''
+	cdef long *data
+	cdef size_t cap
+	if buf.len+3 > buf.cap:
+		cap = 2*buf.cap if buf.cap else 48
+		data = <long*> realloc(buf.data, cap*sizeof(long))
+		if not data:	return -1
+		buf.data = data
+		buf.cap = cap
+	buf.data[buf.len]   = pk[reorder[0]]
+	buf.data[buf.len+1] = pk[reorder[1]]
+	buf.data[buf.len+2] = pk[reorder[2]]
+	buf.len += 3
+	return 0
+
+cdef object keybuf_tuples(keybuf *buf):
+	''' convert the buffer content into a list of key tuples '''
+	cdef size_t i
+	return [(buf.data[i], buf.data[i+1], buf.data[i+2])	for i in range(0, buf.len, 3)]
+
+cdef object keybuf_error(int status):
+	if status == -1:	return MemoryError('unable to allocate rasterization buffer')
+	elif status == -2:	return ValueError('cannot rasterize non finite space')
+	else:				return ValueError('rasterization failed')
+
+
+cdef int segment_keys(cvec3 *spaceo, double cell, keybuf *out) noexcept nogil:
+	''' push the hashing keys of an edge into the given buffer.
+		return 0 on success, -1 on allocation failure, -2 if the space is not finite
+	'''
+	cdef cvec3 n, v, o, temp
 	cdef size_t order[3]
 	cdef size_t reorder[3]
 	cdef size_t i,j,k
-	cdef double x,y,z, xmin,ymin, zmin,zmax
+	cdef double x,y,z, xmin,xmax, ymin,ymax, zmin,zmax
+	cdef double dx, dy, cell2
 	cdef long pk[3]
 	cdef cvec3 space[2]
 	cdef double prec
 	
-	space = [glm2c(spaceo[0]), glm2c(spaceo[1])]
-	rasterization = []
+	space[0], space[1] = spaceo[0], spaceo[1]
 	prec = NUMPREC * max(norminf(space[0]), norminf(space[1]))
 	
-	if not cell > 0:	
-		raise ValueError('cell must be strictly positive')
 	if not (visfinite(space[0]) and visfinite(space[1])):	
-		raise ValueError('cannot rasterize non finite space')
+		return -2
 	
 	# permutation of coordinates to get the direction the closest to Z
 	n = vabs(vsub(space[1], space[0]))
-	if vmax(n) < prec:	return rasterization
+	if vmax(n) < prec:	return 0
 	if   n.y >= n.x and n.y >= n.z:		order,reorder = [2,0,1],[1,2,0]
 	elif n.x >= n.y and n.x >= n.z:		order,reorder = [1,2,0],[2,0,1]
 	else:								order,reorder = [0,1,2],[0,1,2]
@@ -136,7 +172,6 @@ def rasterize_segment(spaceo, double cell):
 	# prepare variables
 	v = vsub(space[1], space[0])
 	cell2 = cell/2
-	assert v.z, order
 	dy = v.y/v.z
 	dx = v.x/v.z
 	o = space[0]
@@ -169,37 +204,37 @@ def rasterize_segment(spaceo, double cell):
 				x = xmin + k*cell + cell2
 				
 				pk = [key(x,cell), key(y,cell), key(z,cell)]
-				rasterization.append(( pk[reorder[0]], pk[reorder[1]], pk[reorder[2]] ))
-	return rasterization
-
+				if keybuf_push(out, pk, reorder):	return -1
+	return 0
 
-def rasterize_triangle(spaceo, double cell):
-	''' return a list of hashing keys for a triangle '''
-	cdef size_t i,j,k
+cdef int triangle_keys(cvec3 *spaceo, double cell, keybuf *out) noexcept nogil:
+	''' push the hashing keys of a triangle into the given buffer.
+		return 0 on success, -1 on allocation failure, -2 if the space is not finite
+	'''
+	cdef size_t i,j,k,e
 	cdef size_t order[3]
 	cdef size_t reorder[3]
 	cdef cvec3 v[3]
+	cdef cvec3 n, o, temp
 	cdef double candz[4]
 	cdef double candy[6]
 	cdef size_t candylen
 	cdef long pk[3]
 	cdef cvec3 pmin, pmax
-	cdef double xmin,xmax, ymin,ymax, zmin,zmax
+	cdef double x,y,z, xmin,xmax, ymin,ymax, zmin,zmax
+	cdef double d, dx, dy, cell2
 	cdef cvec3 space[3]
 	cdef double prec
 	
-	space = [glm2c(spaceo[0]), glm2c(spaceo[1]), glm2c(spaceo[2])]
-	rasterization = []
+	space[0], space[1], space[2] = spaceo[0], spaceo[1], spaceo[2]
 	prec = NUMPREC*max(norminf(space[0]), norminf(space[1]), norminf(space[2]))
 	
-	if not cell > 0:	
-		raise ValueError('cell must be strictly positive')
 	if not (visfinite(space[0]) and visfinite(space[1]) and visfinite(space[2])):	
-		raise ValueError('cannot rasterize non finite space')
+		return -2
 	
 	# permutation of coordinates to get the normal the closer to Z
 	n = vabs(cross(vsub(space[1],space[0]), vsub(space[2],space[0])))
-	if vmax(n) < prec:	return rasterization
+	if vmax(n) < prec:	return 0
 	if   n.y >= n.x and n.y >= n.z:		order,reorder = [2,0,1],[1,2,0]
 	elif n.x >= n.y and n.x >= n.z:		order,reorder = [1,2,0],[2,0,1]
 	else:								order,reorder = [0,1,2],[0,1,2]
@@ -212,7 +247,6 @@ def rasterize_triangle(spaceo, double cell):
 	# WARNING: due to C differences with modulo (%) we can't use the negative indices for arrays
 	v = [vsub(space[0],space[1]), vsub(space[1],space[2]), vsub(space[2],space[0])]
 	n = cross(v[0],v[1])
-	assert n.z
 	dx = -n.x/n.z
 	dy = -n.y/n.z
 	o = space[0]
@@ -240,12 +274,12 @@ def rasterize_triangle(spaceo, double cell):
 	
 		# y selection
 		candylen = 0
-		for i in range(3):
+		for e in range(3):
 			# NOTE: cet interval ajoute parfois des cases inutiles apres les sommets
-			if (space[(i+1)%3].x-x+cell2)*(space[i].x-x-cell2) <= 0 or (space[(i+1)%3].x-x-cell2)*(space[i].x-x+cell2) <= 0:
-				d = v[i].y / (v[i].x if v[i].x else INFINITY)
-				candy[candylen]   = ( space[i].y + d * (x-cell2-space[i].x) )
-				candy[candylen+1] = ( space[i].y + d * (x+cell2-space[i].x) )
+			if (space[(e+1)%3].x-x+cell2)*(space[e].x-x-cell2) <= 0 or (space[(e+1)%3].x-x-cell2)*(space[e].x-x+cell2) <= 0:
+				d = v[e].y / (v[e].x if v[e].x else INFINITY)
+				candy[candylen]   = ( space[e].y + d * (x-cell2-space[e].x) )
+				candy[candylen+1] = ( space[e].y + d * (x+cell2-space[e].x) )
 				candylen += 2
 		ymin,ymax = max(pmin.y,amin(candy,candylen)), min(pmax.y,amax(candy,candylen))
 		ymin -= prec
@@ -273,31 +307,129 @@ def rasterize_triangle(spaceo, double cell):
 				# remove box from corners that goes out of the area
 				if pmin.x<x and pmin.y<y and pmin.z<z and x<pmax.x and y<pmax.y and z<pmax.z:
 					pk = [key(x,cell), key(y,cell), key(z,cell)]
-					rasterization.append(( pk[reorder[0]], pk[reorder[1]], pk[reorder[2]] ))
-	return rasterization
-
+					if keybuf_push(out, pk, reorder):	return -1
+	return 0
 
-def intersect_triangles(f0, f1, precision):
-	''' Intersects 2 triangles and outputs intersections vertices
+	
+def rasterize_segment(spaceo, double cell):
+	''' return a list of hashing keys for an edge '''
+	cdef cvec3 space[2]
+	cdef keybuf buf = keybuf(NULL, 0, 0)
+	cdef int status
+	
+	if not cell > 0:	
+		raise ValueError('cell must be strictly positive')
+	space = [glm2c(spaceo[0]), glm2c(spaceo[1])]
+	try:
+		with nogil:
+			status = segment_keys(space, cell, &buf)
+		if status:	raise keybuf_error(status)
+		return keybuf_tuples(&buf)
+	finally:
+		free(buf.data)
 
-		f0 = first face (tuple of 3 vertices given in clock wise orientation. vertices are glm.vec3 or glm.dvec3)
-		f1 = second face
+def rasterize_triangle(spaceo, double cell):
+	''' return a list of hashing keys for a triangle '''
+	cdef cvec3 space[3]
+	cdef keybuf buf = keybuf(NULL, 0, 0)
+	cdef int status
+	
+	if not cell > 0:	
+		raise ValueError('cell must be strictly positive')
+	space = [glm2c(spaceo[0]), glm2c(spaceo[1]), glm2c(spaceo[2])]
+	try:
+		with nogil:
+			status = triangle_keys(space, cell, &buf)
+		if status:	raise keybuf_error(status)
+		return keybuf_tuples(&buf)
+	finally:
+		free(buf.data)
 
-		output = None if no intersection
-					2 intersection vertices given as : 
-					((fi, ej, xj), (fk, em, xm)) where
-						fi, fj = face id
-						ej, em = edge id on face
-						xj, xm = intersection point (same precision as input vertices) 
-						
-		restrictions : vertices on faces must be spatially different. identical vertices on triangles are not managed
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def rasterize_simplices(const double[:,:] points, const unsigned int[:,:] simplices, double cell):
+	''' rasterize many edges or triangles at once
+	
+		Parameters:
+			points:     array of shape (n,3) of point coordinates
+			simplices:  array of shape (m,2) for edges or (m,3) for triangles, indexing `points`
+			cell:       the hashing cell size
+			
+		Return:
+			`(keys, counts)`  where `keys` is an int64 array of shape (k,3) of all the hashing keys concatenated, and `counts[i]` is the number of keys generated by simplex `i`
 	'''
-	cdef cvec3 A1A2, A1A3, B1B2, B1B3, nA, nB, d, xA, xB, yA, yB
-	cdef int i
+	cdef size_t i, j, dim, last
+	cdef cvec3 space[3]
+	cdef keybuf buf = keybuf(NULL, 0, 0)
+	cdef int status = 0
+	
+	if not cell > 0:	
+		raise ValueError('cell must be strictly positive')
+	if points.shape[1] != 3:
+		raise ValueError('points must be an array of shape (n,3)')
+	dim = simplices.shape[1]
+	if dim != 2 and dim != 3:
+		raise ValueError('simplices must be an array of shape (m,2) or (m,3)')
+	
+	cdef long long[:] vcounts
+	cdef long long[:,:] vkeys
+	
+	if simplices.shape[0] and np.asarray(simplices).max() >= points.shape[0]:
+		raise IndexError('simplices reference points out of range')
+	
+	counts = np.empty(simplices.shape[0], dtype=np.int64)
+	vcounts = counts
+	try:
+		with nogil:
+			for i in range(<size_t>simplices.shape[0]):
+				for j in range(dim):
+					space[j] = cvec3(points[simplices[i,j],0], points[simplices[i,j],1], points[simplices[i,j],2])
+				last = buf.len
+				if dim == 2:	status = segment_keys(space, cell, &buf)
+				else:			status = triangle_keys(space, cell, &buf)
+				if status:	break
+				vcounts[i] = (buf.len - last) // 3
+		if status:	raise keybuf_error(status)
+		
+		keys = np.empty((buf.len//3, 3), dtype=np.int64)
+		vkeys = keys
+		with nogil:
+			for i in range(buf.len//3):
+				for j in range(3):
+					vkeys[i,j] = buf.data[3*i+j]
+	finally:
+		free(buf.data)
+	return keys, counts
 
-	cdef cvec3[3] fA = [glm2c(f0[0]), glm2c(f0[1]), glm2c(f0[2])]
-	cdef cvec3[3] fB = [glm2c(f1[0]), glm2c(f1[1]), glm2c(f1[2])]
-	cdef double prec = precision
+
+# intersection of two triangles: for each of the 2 intersection vertices, the face and edge it lays on, and its position
+cdef struct triint:
+	int face[2]
+	int edge[2]
+	cvec3 point[2]
+
+cdef inline void triint_set(triint *out, size_t i, int face, int edge, cvec3 point) noexcept nogil:
+	out.face[i] = face
+	out.edge[i] = edge
+	out.point[i] = point
+
+cdef int triangle_intersection(cvec3 *fA, cvec3 *fB, double prec, triint *out) noexcept nogil:
+	''' intersect 2 triangles, see `intersect_triangles`
+		return 1 if the triangles intersect and `out` is set, 0 if they do not intersect, -1 in an unexpected case
+	'''
+	cdef cvec3 A1A2, A1A3, B1B2, B1B3, nA, nB, d, d1, tA, tB, pA1, xA, xB, yA, yB
+	cdef double ld1
+	cdef cvec3[3] pfA
+	cdef cvec3[3] pfB
+	cdef int[3] sYA
+	cdef int[3] sYB
+	cdef int eIA[3]
+	cdef int eIB[3]
+	cdef size_t neIA=0
+	cdef size_t neIB=0
+	cdef double xIA[2]
+	cdef double xIB[2]
+	cdef int i, j, piA, miA, piB, miB
 	
 	# get the normal to the first face
 	A1A2 = vsub(fA[1],fA[0])
@@ -314,7 +446,7 @@ def intersect_triangles(f0, f1, precision):
 	ld1 = length(d1)
 	if ld1 <= prec :
 		#print("coplanar or parallel faces")
-		return None
+		return 0
 	d = vmul(d1, 1/ld1)
 	
 	# projection direction on to d from fA and fB
@@ -325,11 +457,11 @@ def intersect_triangles(f0, f1, precision):
 	# xA being the coordinates of fA onto d
 	pA1 = vsub(fA[0],  vmul(tA, dot(vsub(fA[0],fB[0]), nB) / dot(tA,nB)) )
 	xA = cvec3(0, dot(A1A2,d), dot(A1A3,d))
-	cdef cvec3[3] pfA = [pA1, vaffine(pA1, d, xA.y), vaffine(pA1, d, xA.z)]
+	pfA = [pA1, vaffine(pA1, d, xA.y), vaffine(pA1, d, xA.z)]
 	
 	# project fB summits onto d
 	xB = cvec3(dot(vsub(fB[0],fA[0]), d), dot(vsub(fB[1],fA[0]), d), dot(vsub(fB[2],fA[0]), d))
-	cdef cvec3[3] pfB = [vaffine(pA1, d, xB.x), vaffine(pA1, d, xB.y), vaffine(pA1, d, xB.z)]
+	pfB = [vaffine(pA1, d, xB.x), vaffine(pA1, d, xB.y), vaffine(pA1, d, xB.z)]
 	
 	# project fA and fB summits on transversal direction tA and tB
 	for i in range(3):
@@ -337,15 +469,13 @@ def intersect_triangles(f0, f1, precision):
 		varr(&yB)[i] = dot(vsub(fB[i], pfB[i]), tB)
 	
 	# identify signs of yA and yB
-	cdef int[3] sYA
-	cdef int[3] sYB
 	for i in range(3):
-		if abs(varr(&yA)[i]) <= prec:
+		if fabs(varr(&yA)[i]) <= prec:
 			sYA[i] = 0
 			varr(&yA)[i] = 0
 		else:
 			sYA[i] = dsign(varr(&yA)[i])
-		if abs(varr(&yB)[i]) <= prec:
+		if fabs(varr(&yB)[i]) <= prec:
 			sYB[i] = 0
 			varr(&yB)[i] = 0
 		else:
@@ -354,16 +484,11 @@ def intersect_triangles(f0, f1, precision):
 	# check if triangles have no intersections with line D
 	if abs(sYA[0]+sYA[1]+sYA[2]) == 3 or abs(sYB[0]+sYB[1]+sYB[2]) == 3:
 		#print("plans intersects but no edges intersection (1)")
-		return None
+		return 0
 	
 	# we know that triangles do intersect the line D
 	# edges of intersection on A and B with the convention : edge i of face X connects fX[i] and fX[(i+1)%3] 
-	cdef int eIA[3]
-	cdef int eIB[3]
-	cdef size_t neIA=0
-	cdef size_t neIB=0
 	
-	cdef int j, k
 	# prioritize on edges really getting through the face (not stopping on)
 	for j in range(3):
 		if sYA[j]*sYA[(j+1)%3] < 0:
@@ -382,57 +507,290 @@ def intersect_triangles(f0, f1, precision):
 		if sYB[i%3]*sYB[(i+1)%3] <= 0 and abs(sYB[i%3])+abs(sYB[(i+1)%3]) > 0 : 
 			eIB[neIB] = i%3
 			neIB += 1
+	# degenerated triangles laying on line D
+	if neIA==0 or neIB==0:
+		return 0
 	if neIA==1:		eIA[1] = eIA[0]
 	if neIB==1:		eIB[1] = eIB[0]
 
 	# intersections coordinates onto line D
-	cdef double xIA[2]
-	cdef double xIB[2]
 	for i in range(2):
 		xIA[i] = (varr(&yA)[(eIA[i]+1)%3] * varr(&xA)[eIA[i]] - varr(&yA)[eIA[i]] * varr(&xA)[(eIA[i]+1)%3]) / (varr(&yA)[(eIA[i]+1)%3] - varr(&yA)[eIA[i]])
 		xIB[i] = (varr(&yB)[(eIB[i]+1)%3] * varr(&xB)[eIB[i]] - varr(&yB)[eIB[i]] * varr(&xB)[(eIB[i]+1)%3]) / (varr(&yB)[(eIB[i]+1)%3] - varr(&yB)[eIB[i]])
 		
 	# intervals of intersections
-	piA, miA = (0, 1)	if xIA[0] > xIA[1] else   (1, 0)
-	piB, miB = (0, 1)	if xIB[0] > xIB[1] else   (1, 0)
+	if xIA[0] > xIA[1]:	piA, miA = 0, 1
+	else:				piA, miA = 1, 0
+	if xIB[0] > xIB[1]:	piB, miB = 0, 1
+	else:				piB, miB = 1, 0
 	
-    # one intersection at the border of the intervals
-	if abs(xIA[piA]-xIB[miB]) <= prec:
+	# one intersection at the border of the intervals
+	if fabs(xIA[piA]-xIB[miB]) <= prec:
 		# edge of max from A matches min of B
-		return (0, eIA[piA], c2glm(vaffine(pA1, d, xIA[piA]))),  (1, eIB[miB], c2glm(vaffine(pA1, d, xIB[miB])))
+		triint_set(out, 0, 0, eIA[piA], vaffine(pA1, d, xIA[piA]))
+		triint_set(out, 1, 1, eIB[miB], vaffine(pA1, d, xIB[miB]))
+		return 1
 		
-	if abs(xIB[piB]-xIA[miA]) <= prec:
+	if fabs(xIB[piB]-xIA[miA]) <= prec:
 		# edge of max from B matches min of A
-		return (0, eIA[miA], c2glm(vaffine(pA1, d, xIA[miA]))),  (1, eIB[piB], c2glm(vaffine(pA1, d, xIB[piB])))
+		triint_set(out, 0, 0, eIA[miA], vaffine(pA1, d, xIA[miA]))
+		triint_set(out, 1, 1, eIB[piB], vaffine(pA1, d, xIB[piB]))
+		return 1
 	
 	# no intersection - intervals doesn't cross
 	if xIB[piB]-prec < xIA[miA] or xIA[piA]-prec < xIB[miB]:
 		#print("plans intersects but no edges intersection (2)")
-		return None
+		return 0
 		
 	# one interval is included in the other one
 	if xIB[miB]-prec <= xIA[miA] and xIA[piA]-prec <= xIB[piB]:
 		# edges of A cross face B
-		return (0, eIA[miA], c2glm(vaffine(pA1, d, xIA[miA]))),  (0, eIA[piA], c2glm(vaffine(pA1, d, xIA[piA])))
+		triint_set(out, 0, 0, eIA[miA], vaffine(pA1, d, xIA[miA]))
+		triint_set(out, 1, 0, eIA[piA], vaffine(pA1, d, xIA[piA]))
+		return 1
 	if xIA[miA]-prec <= xIB[miB] and xIB[piB]-prec <= xIA[piA]:
 		# edges of A cross face B
 		#return (1, eIB[miB], c2glm(vaffine(pA1, d, xIB[miB]))),  (1, eIB[piB], c2glm(vaffine(pA1, d, xIB[piB])))
 		
 		# give priority to face index 0 when equivalent regarding the precision
-		if abs(xIA[miA]-xIB[miB]) <= prec:	mr = (0, eIA[miA], c2glm(vaffine(pA1, d, xIA[miA])))
-		else:								mr = (1, eIB[miB], c2glm(vaffine(pA1, d, xIB[miB])))
-		if abs(xIB[piB]-xIA[piA]) <= prec:	pr = (0, eIA[piA], c2glm(vaffine(pA1, d, xIA[piA])))
-		else:								pr = (1, eIB[piB], c2glm(vaffine(pA1, d, xIB[piB])))
-		return mr, pr
+		if fabs(xIA[miA]-xIB[miB]) <= prec:	triint_set(out, 0, 0, eIA[miA], vaffine(pA1, d, xIA[miA]))
+		else:								triint_set(out, 0, 1, eIB[miB], vaffine(pA1, d, xIB[miB]))
+		if fabs(xIB[piB]-xIA[piA]) <= prec:	triint_set(out, 1, 0, eIA[piA], vaffine(pA1, d, xIA[piA]))
+		else:								triint_set(out, 1, 1, eIB[piB], vaffine(pA1, d, xIB[piB]))
+		return 1
 	
 	# intervals cross each other
 	if xIB[miB] > xIA[miA]-prec and xIA[piA]-prec < xIB[piB]:
 		# M edge of B crosses face A and P edge of A crosses face B
-		return (0, eIA[piA], c2glm(vaffine(pA1, d, xIA[piA]))), (1, eIB[miB], c2glm(vaffine(pA1, d, xIB[miB])))
+		triint_set(out, 0, 0, eIA[piA], vaffine(pA1, d, xIA[piA]))
+		triint_set(out, 1, 1, eIB[miB], vaffine(pA1, d, xIB[miB]))
+		return 1
 	if xIA[miA] > xIB[miB]-prec and xIB[piB]-prec < xIA[piA]:
 		# M edge of A crosses face B and P edge of B crosses face A
-		return (0, eIA[miA], c2glm(vaffine(pA1, d, xIA[miA]))), (1, eIB[piB], c2glm(vaffine(pA1, d, xIB[piB])))
+		triint_set(out, 0, 0, eIA[miA], vaffine(pA1, d, xIA[miA]))
+		triint_set(out, 1, 1, eIB[piB], vaffine(pA1, d, xIB[piB]))
+		return 1
+	
+	return -1
+
+def intersect_triangles(f0, f1, precision):
+	''' Intersects 2 triangles and outputs intersections vertices
+
+		f0 = first face (tuple of 3 vertices given in clock wise orientation. vertices are glm.vec3 or glm.dvec3)
+		f1 = second face
+
+		output = None if no intersection
+					2 intersection vertices given as : 
+					((fi, ej, xj), (fk, em, xm)) where
+						fi, fj = face id
+						ej, em = edge id on face
+						xj, xm = intersection point (same precision as input vertices) 
+						
+		restrictions : vertices on faces must be spatially different. identical vertices on triangles are not managed
+	'''
+	cdef cvec3[3] fA = [glm2c(f0[0]), glm2c(f0[1]), glm2c(f0[2])]
+	cdef cvec3[3] fB = [glm2c(f1[0]), glm2c(f1[1]), glm2c(f1[2])]
+	cdef double prec = precision
+	cdef triint out
+	cdef int status
 	
-	raise Exception("unexpected case: {} {}".format(repr(fA), repr(fB)))
+	with nogil:
+		status = triangle_intersection(fA, fB, prec, &out)
+	if status == 0:
+		return None
+	elif status < 0:
+		raise Exception("unexpected case: {} {}".format(repr(fA), repr(fB)))
+	return (
+		(out.face[0], out.edge[0], c2glm(out.point[0])),
+		(out.face[1], out.edge[1], c2glm(out.point[1])),
+		)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def intersect_triangles_many(const double[:,:] points0, const unsigned int[:,:] faces0, const double[:,:] points1, const unsigned int[:,:] faces1, const long long[:,:] pairs, double precision):
+	''' Intersects many pairs of triangles at once, the computation is done without the GIL
+	
+		Parameters:
+			points0:    array of shape (n,3) of the first mesh points
+			faces0:     array of shape (m,3) of the first mesh faces
+			points1:    array of shape (n,3) of the second mesh points
+			faces1:     array of shape (m,3) of the second mesh faces
+			pairs:      array of shape (k,2) of the face indices to intersect, `pairs[i] = (f0, f1)` with `f0` in `faces0` and `f1` in `faces1`
+			precision:  same as for `intersect_triangles`
+			
+		Return:
+			`(hits, sides, positions)`  where
+			
+				- `hits` are the indices in `pairs` of the intersecting pairs
+				- `sides[i]` is an array of shape (2,2), the face id (0 or 1) and edge id of each intersection vertex of pair `hits[i]`
+				- `positions[i]` is an array of shape (2,3), the position of each intersection vertex of pair `hits[i]`
+				
+			This is the same as the output of `intersect_triangles` for each pair.
+	'''
+	cdef size_t i, j, k, count
+	cdef unsigned int f
+	cdef cvec3 fA[3]
+	cdef cvec3 fB[3]
+	cdef triint out
+	cdef int status = 0
+	cdef long long[:] vhits
+	cdef long long[:,:,:] vsides
+	cdef double[:,:,:] vpositions
+	
+	if points0.shape[1] != 3 or points1.shape[1] != 3:
+		raise ValueError('points must be arrays of shape (n,3)')
+	if faces0.shape[1] != 3 or faces1.shape[1] != 3:
+		raise ValueError('faces must be arrays of shape (m,3)')
+	if pairs.shape[1] != 2:
+		raise ValueError('pairs must be an array of shape (k,2)')
+	for i in range(<size_t>pairs.shape[0]):
+		if not (0 <= pairs[i,0] < faces0.shape[0] and 0 <= pairs[i,1] < faces1.shape[0]):
+			raise IndexError('pair {} references a face out of range'.format(i))
+	
+	hits = np.empty(pairs.shape[0], dtype=np.int64)
+	sides = np.empty((pairs.shape[0],2,2), dtype=np.int64)
+	positions = np.empty((pairs.shape[0],2,3), dtype=np.float64)
+	vhits, vsides, vpositions = hits, sides, positions
+	
+	count = 0
+	with nogil:
+		for i in range(<size_t>pairs.shape[0]):
+			for j in range(3):
+				f = faces0[pairs[i,0],j]
+				if f >= <size_t>points0.shape[0]:	status = -2
+				else:	fA[j] = cvec3(points0[f,0], points0[f,1], points0[f,2])
+				f = faces1[pairs[i,1],j]
+				if f >= <size_t>points1.shape[0]:	status = -2
+				else:	fB[j] = cvec3(points1[f,0], points1[f,1], points1[f,2])
+			if status < 0:	break
+			status = triangle_intersection(fA, fB, precision, &out)
+			if status < 0:	break
+			if status == 0:	continue
+			vhits[count] = i
+			for j in range(2):
+				vsides[count,j,0] = out.face[j]
+				vsides[count,j,1] = out.edge[j]
+				for k in range(3):
+					vpositions[count,j,k] = varr(&out.point[j])[k]
+			count += 1
+	if status == -2:
+		raise IndexError('pair {} references a face with points out of range'.format(i))
+	elif status < 0:
+		raise Exception("unexpected case for pair {}".format(i))
+	return hits[:count], sides[:count], positions[:count]
+
 
 
+
+
+# hash table slot associating a hashing key to a point index, empty slots have a negative value
+cdef struct cellslot:
+	long long key[3]
+	long long value
+
+cdef size_t cellhash(long long *k, size_t mask) noexcept nogil:
+	''' hash a cell key into a table index '''
+	cdef unsigned long long h
+	h = <unsigned long long>k[0] * 0x9E3779B97F4A7C15ULL
+	h = (h ^ (h >> 31)) + <unsigned long long>k[1] * 0xC2B2AE3D27D4EB4FULL
+	h = (h ^ (h >> 29)) + <unsigned long long>k[2] * 0x165667B19E3779F9ULL
+	return (h ^ (h >> 32)) & mask
+
+cdef cellslot *cellfind(cellslot *table, size_t mask, long long *k) noexcept nogil:
+	''' return the slot holding the given key, or the empty slot where it should be inserted '''
+	cdef size_t i = cellhash(k, mask)
+	while table[i].value >= 0 and not (table[i].key[0] == k[0] and table[i].key[1] == k[1] and table[i].key[2] == k[2]):
+		i = (i+1) & mask
+	return &table[i]
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def pointset_insert(const double[:,:] points, double cell, const long long[:,:] keys=None, const long long[:] values=None, long long start=0):
+	''' insert many points in a point hashing table, merging the points closer than `cell`
+	
+		This is the same algorithm as `hashing.PointSet.add` called successively on each point, but using a C hash table.
+		
+		Parameters:
+			points:    array of shape (n,3) of the points to insert
+			cell:      hashing cell size
+			keys:      array of shape (k,3) of the keys already present in the table
+			values:    array of shape (k,) of the point indices associated to `keys`
+			start:     index of the first point inserted
+			
+		Return:
+			`(indices, inserted, newkeys)`  where 
+			
+				- `indices[i]` is the index in the set of `points[i]`
+				- `inserted` are the indices in `points` of the points added to the set, in insertion order. the index in the set of `points[inserted[j]]` is `start+j`
+				- `newkeys[j]` is the key associated to `points[inserted[j]]`
+	'''
+	cdef size_t n, nk, i, j, c, mask, capacity, count
+	cdef long long cand[3]
+	cdef long long k[2][3]
+	cdef double vox
+	cdef cellslot *table
+	cdef cellslot *slot
+	cdef long long[:] vindices
+	cdef long long[:] vinserted
+	cdef long long[:,:] vnewkeys
+	
+	if not cell > 0:	
+		raise ValueError('cell must be strictly positive')
+	if points.shape[1] != 3:
+		raise ValueError('points must be an array of shape (n,3)')
+	n = points.shape[0]
+	nk = 0
+	if keys is not None:
+		nk = keys.shape[0]
+		if values is None or <size_t>values.shape[0] != nk or keys.shape[1] != 3:
+			raise ValueError('keys must have shape (k,3) and values shape (k,)')
+	
+	indices = np.empty(n, dtype=np.int64)
+	inserted = np.empty(n, dtype=np.int64)
+	newkeys = np.empty((n,3), dtype=np.int64)
+	vindices, vinserted, vnewkeys = indices, inserted, newkeys
+	
+	capacity = 16
+	while capacity < 2*(n+nk):	capacity *= 2
+	mask = capacity-1
+	table = <cellslot*> malloc(capacity*sizeof(cellslot))
+	if not table:
+		raise MemoryError('unable to allocate the hashing table')
+	try:
+		with nogil:
+			for i in range(capacity):	table[i].value = -1
+			
+			# register the existing content
+			for i in range(nk):
+				for j in range(3):	cand[j] = keys[i,j]
+				slot = cellfind(table, mask, cand)
+				slot.key = cand
+				slot.value = values[i]
+				
+			count = 0
+			for i in range(n):
+				# look for a close point in the neighboring cells
+				for j in range(3):
+					vox = points[i,j]/cell
+					k[0][j] = <long long> floor(vox-0.5+NUMPREC)
+					k[1][j] = <long long> floor(vox+0.5-NUMPREC)
+				slot = NULL
+				for c in range(8):
+					cand = [k[c&1][0], k[(c>>1)&1][1], k[(c>>2)&1][2]]
+					slot = cellfind(table, mask, cand)
+					if slot.value >= 0:	break
+				if slot.value >= 0:
+					vindices[i] = slot.value
+					continue
+				# insert a new point
+				for j in range(3):	cand[j] = <long long> floor(points[i,j]/cell)
+				slot = cellfind(table, mask, cand)
+				slot.key = cand
+				slot.value = start + count
+				vindices[i] = start + count
+				vinserted[count] = i
+				vnewkeys[count,0], vnewkeys[count,1], vnewkeys[count,2] = cand[0], cand[1], cand[2]
+				count += 1
+	finally:
+		free(table)
+	return indices, inserted[:count], newkeys[:count]
@@ -8,6 +8,7 @@
 
 from .mathutils import *
 from .mesh import *
+from .mesh.container import reindex_table
 from . import generation as gt
 from . import hashing
 from . import text
@@ -17,6 +18,7 @@ from .blending import blenditer, match_length
 
 from numbers import Number
 from functools import singledispatch
+import numpy as np
 
 __all__ = [	'chamfer', 'bevel', 'multicut',
 			'mesh_cut', 'web_cut', 'planeoffsets',
@@ -372,6 +374,7 @@ def mesh_multicut(mesh, edges, cutter, conn=None, prec=None, removal=None):
 			separators[(junc,p)] = plane
 	
 	outlines = {}
+	lp, lf = len(mesh.points), len(mesh.faces)
 	# couper les aretes
 	for edge, offset in offsets.items():
 		outlines[edge] = mesh_cut(mesh, edge, 
@@ -384,6 +387,9 @@ def mesh_multicut(mesh, edges, cutter, conn=None, prec=None, removal=None):
 								(pts[corner]+offset, -normalize(offset)), 
 								(),
 								conn, prec, removal, False)
+	mesh.touch('points', lp)
+	mesh.touch('faces')
+	mesh.touch('tracks', lf)
 	if final:
 		frontier = []
 		for edges in outlines.values():
@@ -407,15 +413,14 @@ def finalize(mesh, outlines, removal, prec):
 		outlines[e] = lines
 		merges.update(reindex)
 	# apply merges, but keeping the empty faces, to keep the removal list valid
-	for i,f in enumerate(mesh.faces):
-		mesh.faces[i] = (
-			merges.get(f[0],f[0]),
-			merges.get(f[1],f[1]),
-			merges.get(f[2],f[2]),
-			)
+	faces = typedlist_view(mesh.faces)
+	faces[:] = reindex_table(merges, len(mesh.points))[faces]
+	mesh.touch('faces', 0, len(mesh.faces))
 	
 	# delete inside faces and empty ones
-	removefaces(mesh, lambda fi: fi in removal or faceheight(mesh,fi) <= prec)
+	remove = faceheights(mesh) <= prec
+	remove[selection_mask(removal, len(mesh.faces))] = True
+	removefaces(mesh, remove)
 
 def arrangeface(f, p):
 	if   p == f[1]:	return f[1],f[2],f[0]
@@ -480,27 +485,19 @@ def intersection_axis_face(axis, face, prec):
 
 
 
-def removefaces(mesh, crit):
-	''' Remove faces whose indices are present in faces, (for huge amount, prefer pass faces as a set) '''
-	newfaces = typedlist(dtype=uvec3)
-	newtracks = typedlist(dtype='I')
-	for i in range(len(mesh.faces)):
-		if not crit(i):
-			newfaces.append(mesh.faces[i])
-			newtracks.append(mesh.tracks[i])
-	mesh.faces = newfaces
-	mesh.tracks = newtracks
+def removefaces(mesh, selection):
+	''' Remove inplace the faces designated by `selection`, a boolean mask or an iterable of face indices (see `Mesh.filter`) '''
+	kept = mesh.filter(~selection_mask(selection, len(mesh.faces)))
+	mesh.faces, mesh.tracks = kept.faces, kept.tracks
+	mesh.touch('faces')
+	mesh.touch('tracks')
 	
-def removeedges(mesh, crit):
-	''' Remove faces whose indices are present in faces, (for huge amount, prefer pass faces as a set) '''
-	newedges = typedlist(dtype=uvec2)
-	newtracks = typedlist(dtype='I')
-	for i in range(len(mesh.edges)):
-		if not crit(i):
-			newedges.append(mesh.edges[i])
-			newtracks.append(mesh.tracks[i])
-	mesh.edges = newedges
-	mesh.tracks = newtracks
+def removeedges(mesh, selection):
+	''' Remove inplace the edges designated by `selection`, a boolean mask or an iterable of edge indices (see `Web.filter`) '''
+	kept = mesh.filter(~selection_mask(selection, len(mesh.edges)))
+	mesh.edges, mesh.tracks = kept.edges, kept.tracks
+	mesh.touch('edges')
+	mesh.touch('tracks')
 
 #def facesurf(mesh, fi):
 	#o,x,y = mesh.facepoints(fi)
@@ -529,6 +526,15 @@ def faceheight(mesh, fi):
 		if h < m:	m = h
 	return m
 
+def faceheights(mesh) -> 'ndarray':
+	''' array of the smallest height of each face, as `faceheight` '''
+	corners = typedlist_view(mesh.points)[typedlist_view(mesh.faces)]
+	sides = corners[:,[1,2,0]] - corners
+	# the smallest height is the one above the longest side
+	longest = np.linalg.norm(sides, axis=2).max(axis=1, initial=0)
+	area = np.linalg.norm(np.cross(sides[:,0], sides[:,1]), axis=1)
+	return np.divide(area, longest, out=np.zeros(len(area)), where=longest > 0)
+
 
 
 @chamfer.register(Mesh)
@@ -538,6 +544,7 @@ def mesh_chamfer(mesh, edges, cutter):
 	'''
 	# cut faces
 	segments = mesh_multicut(mesh, edges, cutter)
+	lf = len(mesh.faces)
 	
 	# create junctions
 	group = len(mesh.groups)
@@ -582,6 +589,8 @@ def mesh_chamfer(mesh, edges, cutter):
 		faces = triangulation_outline(Wire(mesh.points, suites(s)[0])).faces
 		mesh.faces.extend(faces)
 		mesh.tracks.extend([group]*len(faces))
+	mesh.touch('faces', lf)
+	mesh.touch('tracks', lf)
 
 @bevel.register(Mesh)
 def mesh_bevel(mesh, edges, cutter, resolution=None):
@@ -779,6 +788,7 @@ def web_multicut(web, points, cutter, conn=None, prec=None, removal=None):
 	removal = set()
 	cutter = interpretcutter(cutter)
 	pts = web.points
+	lp = len(pts)
 	intersections = {}
 	
 	for pi in points:
@@ -798,7 +808,8 @@ def web_multicut(web, points, cutter, conn=None, prec=None, removal=None):
 		
 		intersections[pi] = web_cut(web, pi, plane, conn, prec, removal)
 	
-	removeedges(web, lambda i: i in removal)	
+	web.touch('points', lp)
+	removeedges(web, removal)
 	return intersections
 	
 @chamfer.register(Web)
@@ -807,6 +818,7 @@ def web_chamfer(web, points, cutter):
 
 	g = len(web.groups)
 	web.groups.append(None)
+	lp, le = len(web.points), len(web.edges)
 	
 	conn = connpe(web.edges)
 	def link(e):
@@ -822,6 +834,9 @@ def web_chamfer(web, points, cutter):
 			web.points.append(sum(web.points[c] for c in cuts) / len(cuts))
 			web.edges.extend( link((c,pi))  for c in cuts )
 			web.tracks.extend( [g] * len(cuts) )
+	web.touch('points', lp)
+	web.touch('edges', le)
+	web.touch('tracks', le)
 	
 @bevel.register(Web)
 def web_bevel(obj, points, cutter, resolution=None):
@@ -863,6 +878,7 @@ def web_bevel(obj, points, cutter, resolution=None):
 			pi = len(pts)
 			top = center + normal*radius
 			pts.append(top)
+			obj.touch('points', pi)
 			# place arcs
 			for t in tangents:
 				u = (top, noproject(t[0]-top, normal))
@@ -890,6 +906,7 @@ def wire_multicut(wire: Wire, points, cutter):
 
 	cuts = []
 	closed = wire.indices[0] == wire.indices[-1]
+	lp = len(wire.points)
 	
 	for index, origin in enumerate(wire.indices):
 		if origin not in points:
@@ -949,6 +966,9 @@ def wire_multicut(wire: Wire, points, cutter):
 			wire.indices[-1] = wire.indices[0]
 			wire.tracks[-1] = wire.tracks[0]
 
+	wire.touch('points', lp)
+	wire.touch('indices')
+	wire.touch('tracks')
 	return cuts
 		
 @chamfer.register(Wire)
@@ -964,6 +984,7 @@ def wire_bevel(wire, points, cutter, resolution=None):
 	wire.groups[g] = None
 
 	cuts.reverse()
+	lp = len(wire.points)
 	for ii0, ii1 in cuts:
 		p0 = wire[ii0]
 		p1 = wire[ii1]
@@ -980,6 +1001,9 @@ def wire_bevel(wire, points, cutter, resolution=None):
 		wire.tracks[ii0:ii0+1] = [g] * (len(wire.points)-old_l-1)
 		if closed and ii0==0:
 			wire.indices[-1] == wire.indices[0]
+	wire.touch('points', lp)
+	wire.touch('indices')
+	wire.touch('tracks')
 
 
 		
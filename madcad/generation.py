@@ -767,12 +767,12 @@ def repeat(pattern, n:int, transform):
 			n:         the number of repetitions
 			transform:     is the transformation between each duplicate
 	'''
-	current = pattern
-	pool = type(pattern)(groups=pattern.groups)
-	if n:	pool += current
+	if not n:
+		return type(pattern)(groups=pattern.groups)
+	parts = [pattern]
 	for i in range(1,n):
-		current = current.transform(transform)
-		pool += current
-	return pool
+		parts.append(parts[-1].transform(transform))
+	# all the parts share the groups of the pattern
+	return type(pattern).concatenate(parts, share=True)
 
 
@@ -9,6 +9,7 @@ from .mathutils import *
 from . import core
 from . import mesh
 from functools import reduce
+import numpy as np
 from math import floor, ceil, sqrt, inf
 
 
@@ -216,6 +217,152 @@ class PositionMap:
 			web += mesh.Web([base*(p+k)  for p in self._display[0]], self._display[1], groups=[k])
 		return web.display(scene)
 
+class PositionIndex:
+	''' Array-backed and read-only counterpart of `PositionMap`, made to index the simplices of a whole mesh at once.
+	
+		All the simplices are rasterized in one call to `core.rasterize_simplices`, and the cells are stored as a flat CSR index (sorted cell keys, offsets and simplex indices) instead of a dictionnary of lists. This avoids the interpreter overhead of `PositionMap.add` and allows to query many simplices at once with `query_many`.
+		
+		Attributes defined here:
+			:cellsize:    the boxing parameter
+			:origin:      the smallest cell key indexed, used to pack cell keys into integers
+			:shape:       number of cells in each direction between the smallest and the biggest key
+			:cells:       sorted array of packed keys of the non-empty cells
+			:offsets:     the simplices in `cells[i]` are `items[offsets[i]:offsets[i+1]]`
+			:items:       simplices indices for each cell
+			
+		Example:
+		
+			>>> prox = PositionIndex.from_mesh(m2)
+			>>> offsets, close = prox.query_many(*mesh_arrays(m1))
+			>>> # faces of m2 that can intersect face i of m1
+			>>> close[offsets[i]:offsets[i+1]]
+	'''
+	__slots__ = 'cellsize', 'origin', 'shape', 'cells', 'offsets', 'items', 'options'
+	def __init__(self, cellsize, points, simplices):
+		self.options = {}
+		self.cellsize = cellsize
+		keys, counts = rasterize_arrays(points, simplices, cellsize)
+		owners = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+		
+		if len(keys):
+			self.origin = keys.min(axis=0)
+			self.shape = keys.max(axis=0) - self.origin + 1
+		else:
+			self.origin = np.zeros(3, dtype=np.int64)
+			self.shape = np.ones(3, dtype=np.int64)
+		if int(self.shape[0]) * int(self.shape[1]) * int(self.shape[2]) >= 2**62:
+			raise ValueError('cellsize is too small for the extent of the indexed simplices')
+		
+		packed = self._pack(keys)
+		order = np.argsort(packed, kind='stable')
+		packed = packed[order]
+		self.items = owners[order]
+		self.cells, starts = np.unique(packed, return_index=True)
+		self.offsets = np.append(starts, len(packed))
+		
+	@classmethod
+	def from_mesh(cls, mesh, cellsize=None) -> 'PositionIndex':
+		''' Index all the faces of a `Mesh` or all the edges of a `Web`. `cellsize` defaults to `meshcellsize(mesh)` '''
+		if cellsize is None:	cellsize = meshcellsize(mesh)
+		return cls(cellsize, *mesh_arrays(mesh))
+		
+	def _pack(self, keys):
+		''' Convert an array of cell keys into integers, keys out of the indexed area are packed to -1 '''
+		local = keys - self.origin
+		packed = (local[:,0] * self.shape[1] + local[:,1]) * self.shape[2] + local[:,2]
+		packed[np.any((local < 0) | (local >= self.shape), axis=1)] = -1
+		return packed
+	
+	def _lookup(self, keys):
+		''' Index in `cells` of each given key, or -1 if the key is not in the index '''
+		packed = self._pack(keys)
+		if not len(self.cells):
+			return np.full(len(packed), -1, dtype=np.int64)
+		found = np.minimum(np.searchsorted(self.cells, packed), len(self.cells)-1)
+		found[(self.cells[found] != packed) | (packed < 0)] = -1
+		return found
+	
+	def keysfor(self, space):
+		''' Rasterize the primitive, returning an array of the position keys. Allowed primitives are the same as for `PositionMap` '''
+		if isinstance(space, vec3):
+			return np.array([glm.floor(space/self.cellsize)], dtype=np.int64)
+		elif isinstance(space, tuple) and len(space) in (2,3):
+			keys, _ = rasterize_arrays(space, [range(len(space))], self.cellsize)
+			return keys
+		else:
+			raise TypeError("PositionIndex only supports keys of type:  points, segments, triangles")
+	
+	def get(self, space):
+		''' Get the simplices indices associated with the given primitive '''
+		for c in self._lookup(self.keysfor(space)):
+			if c >= 0:
+				yield from self.items[self.offsets[c]:self.offsets[c+1]].tolist()
+	
+	def __contains__(self, space):
+		return bool(np.any(self._lookup(self.keysfor(space)) >= 0))
+	
+	def query_many(self, points, simplices) -> '(offsets, items)':
+		''' Find the indexed simplices sharing cells with each of the given simplices.
+			
+			Parameters:
+				points:     array of shape (n,3)
+				simplices:  array of shape (m,2) or (m,3) indexing `points`
+				
+			Return:
+				a CSR `(offsets, items)`  so that `items[offsets[i]:offsets[i+1]]` are the sorted unique indexed simplices close to `simplices[i]`
+		'''
+		keys, counts = rasterize_arrays(points, simplices, self.cellsize)
+		owners = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+		found = self._lookup(keys)
+		hit = found >= 0
+		owners, found = owners[hit], found[hit]
+		# expand the content of the cells found
+		starts = self.offsets[found]
+		lengths = self.offsets[found+1] - starts
+		shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+		items = self.items[shift + np.arange(len(shift))]
+		owners = np.repeat(owners, lengths)
+		# remove duplicates and sort by query simplex
+		stride = len(self.items)+1
+		pairs = np.unique(owners * stride + items)
+		owners, items = np.divmod(pairs, stride)
+		offsets = np.searchsorted(owners, np.arange(len(counts)+1))
+		return offsets, items
+	
+	def display(self, scene):
+		web = mesh.Web()
+		if 'color' in self.options:		web.options['color'] = self.options['color']
+		base = vec3(self.cellsize)
+		keys = np.stack(np.unravel_index(self.cells, tuple(self.shape)), axis=1) + self.origin
+		for k in keys.tolist():
+			web += mesh.Web([base*(p+vec3(k))  for p in PositionMap._display[0]], PositionMap._display[1], groups=[tuple(k)])
+		return web.display(scene)
+
+def rasterize_arrays(points, simplices, cellsize) -> '(keys, counts)':
+	''' Rasterize many simplices given as arrays, see `core.rasterize_simplices` '''
+	return core.rasterize_simplices(
+				np.ascontiguousarray(points, dtype='f8').reshape(-1,3), 
+				np.ascontiguousarray(simplices, dtype='u4'), 
+				cellsize)
+
+def mesh_arrays(mesh) -> '(ndarray, ndarray)':
+	''' Return the points and simplices of a `Mesh`, `Web` or `Wire` as numpy arrays of shape (n,3) and (m,3) or (m,2) '''
+	from .mesh import Mesh, Web, Wire, typedlist_to_numpy
+	if isinstance(mesh, Mesh):		simplices, dim = mesh.faces, 3
+	elif isinstance(mesh, Web):		simplices, dim = mesh.edges, 2
+	elif isinstance(mesh, Wire):
+		indices = typedlist_to_numpy(mesh.indices, 'u4')
+		return (
+			typedlist_to_numpy(mesh.points, 'f8').reshape(-1,3),
+			np.stack((indices[:-1], indices[1:]), axis=1),
+			)
+	else:
+		raise TypeError('expected a Mesh, Web or Wire, not {}'.format(type(mesh).__name__))
+	return (
+		typedlist_to_numpy(mesh.points, 'f8').reshape(-1,3),
+		typedlist_to_numpy(simplices, 'u4').reshape(-1,dim),
+		)
+
 def meshcellsize(mesh):
 	''' Returns a good cell size to index primitives of a mesh with a PositionMap 
 		
@@ -226,6 +373,253 @@ def meshcellsize(mesh):
 	return length(mesh.box().width) / sqrt(len(mesh.points))
 
 
+class BoxTree:
+	''' Bounding volume hierarchy over simplices (points, edges or triangles), answering proximity queries in logarithmic time
+	
+		The simplices are sorted along a Morton curve and grouped by `leafsize` in the leafs of a complete binary tree. The nodes are stored in heap order: the children of node `i` are `2*i+1` and `2*i+2`, and the empty nodes have an inverted box.
+		Simplices with non finite points are not indexed.
+		
+		Attributes defined here:
+			:points:      array of shape (n,3) of the simplices points
+			:simplices:   array of shape (m,1), (m,2) or (m,3) indexing `points`
+			:order:       simplices indices in leaf order, leaf `i` holds `order[i*leafsize:(i+1)*leafsize]`
+			:lo, hi:      arrays of shape (k,3) of the nodes boxes corners
+			:leafsize:    maximum number of simplices per leaf, `None` puts them all in one leaf so the queries are linear scans, without the cost of sorting
+			
+		Example:
+		
+			>>> tree = BoxTree(*mesh_arrays(m))
+			>>> face, dist = tree.nearest(vec3(1,2,3))
+	'''
+	__slots__ = 'points', 'simplices', 'order', 'lo', 'hi', 'leafsize'
+	def __init__(self, points, simplices=None, leafsize=8):
+		self.points = points = np.ascontiguousarray(points, dtype='f8').reshape(-1,3)
+		if simplices is None:
+			simplices = np.arange(len(points), dtype='u4')
+		simplices = np.asarray(simplices, dtype='u4')
+		if simplices.ndim == 1:
+			simplices = simplices.reshape(-1,1)
+		self.simplices = simplices
+		self.leafsize = leafsize = leafsize or max(1, len(simplices))
+		
+		plo, phi = _bounds(points[simplices])
+		valid = np.flatnonzero(np.isfinite(plo).all(axis=1) & np.isfinite(phi).all(axis=1))
+		
+		# sort the simplices along a Morton curve of their centers, unless they all fit in one leaf
+		center = (plo[valid] + phi[valid]) / 2
+		if len(center) > leafsize:
+			cmin = center.min(axis=0)
+			extent = center.max(axis=0) - cmin
+			extent[extent == 0] = 1
+			quantized = ((center - cmin) / extent * 0x1fffff).astype(np.uint64)
+			code = _spreadbits(quantized[:,0]) | _spreadbits(quantized[:,1]) << np.uint64(1) | _spreadbits(quantized[:,2]) << np.uint64(2)
+			self.order = valid[np.argsort(code, kind='stable')]
+		else:
+			self.order = valid
+		
+		# boxes of the leafs, enlarged by the numeric precision so the queries are never missing a simplex by rounding
+		nleafs = -(-len(self.order) // leafsize)
+		size = 1 << max(0, nleafs-1).bit_length()
+		self.lo = np.full((2*size-1, 3), inf)
+		self.hi = np.full((2*size-1, 3), -inf)
+		if nleafs:
+			prec = NUMPREC * max(1, np.abs(plo[valid]).max(), np.abs(phi[valid]).max())
+			starts = np.arange(0, len(self.order), leafsize)
+			self.lo[size-1:size-1+nleafs] = np.minimum.reduceat(plo[self.order], starts) - prec
+			self.hi[size-1:size-1+nleafs] = np.maximum.reduceat(phi[self.order], starts) + prec
+		# boxes of the parents, level by level
+		first = size-1
+		while first:
+			parent = (first-1)//2
+			self.lo[parent:first] = np.minimum(self.lo[first:2*first+1:2], self.lo[first+1:2*first+2:2])
+			self.hi[parent:first] = np.maximum(self.hi[first:2*first+1:2], self.hi[first+1:2*first+2:2])
+			first = parent
+	
+	@classmethod
+	def from_mesh(cls, mesh, points=False, leafsize=8) -> 'BoxTree':
+		''' Index the faces of a `Mesh`, or the edges of a `Web` or `Wire`, or only their points if `points` is True '''
+		if points:
+			from .mesh import typedlist_to_numpy
+			return cls(typedlist_to_numpy(mesh.points, 'f8').reshape(-1,3), leafsize=leafsize)
+		return cls(*mesh_arrays(mesh), leafsize=leafsize)
+	
+	def __len__(self):
+		return len(self.order)
+	
+	def _descend(self, select):
+		''' Indices of the leaf nodes reached from the root, following the children for which `select(nodes)` is True '''
+		nodes = np.zeros(1, dtype=np.int64)
+		nodes = nodes[select(nodes)]
+		first = len(self.lo)//2
+		while len(nodes) and nodes[0] < first:
+			nodes = np.stack((2*nodes+1, 2*nodes+2), axis=1).ravel()
+			nodes = nodes[select(nodes)]
+		return nodes
+	
+	def _content(self, leafs):
+		''' Simplices indices in the given leaf nodes '''
+		start = (leafs - (len(self.lo)//2)) * self.leafsize
+		stop = np.minimum(start + self.leafsize, len(self.order))
+		lengths = np.maximum(stop - start, 0)
+		shift = np.repeat(start - np.cumsum(lengths) + lengths, lengths)
+		return self.order[shift + np.arange(len(shift))]
+	
+	def _simplex(self, i) -> tuple:
+		''' Points of the given simplex as glm vectors '''
+		return tuple(vec3(*p)  for p in self.points[self.simplices[i]].tolist())
+	
+	def distance(self, point, i) -> float:
+		''' Distance from a point to the given simplex '''
+		simplex = self._simplex(i)
+		if len(simplex) == 1:	return distance(point, simplex[0])
+		elif len(simplex) == 2:	return distance_pe(point, simplex)
+		else:					return distance_pt(point, simplex)
+	
+	def nearest(self, point: vec3) -> '(int, float)':
+		''' Return the index of the simplex the nearest to `point`, and its distance. 
+			When several simplices are at the same distance, the smallest index is returned.
+			Return `(None, inf)` if there is no simplex.
+		'''
+		p = np.array(tuple(point), dtype='f8')
+		def bounds(nodes):
+			lo, hi = self.lo[nodes], self.hi[nodes]
+			inside = np.maximum(np.maximum(lo - p, p - hi), 0)
+			outside = np.maximum(np.abs(p - lo), np.abs(p - hi))
+			return np.sqrt((inside**2).sum(axis=1)), np.sqrt((outside**2).sum(axis=1))
+		def select(nodes):
+			lower, upper = bounds(nodes)
+			# the farthest point of a non-empty box is an upper bound of the nearest distance
+			upper[np.isnan(upper) | (self.lo[nodes,0] > self.hi[nodes,0])] = inf
+			return lower <= upper.min()
+		
+		candidates = self._content(self._descend(select))
+		if not len(candidates):
+			return None, inf
+		# any corner of a simplex bounds its distance, so the simplices which box is beyond the smallest bound are skipped
+		corners = self.points[self.simplices[candidates]]
+		lo, hi = _bounds(corners)
+		lower = np.linalg.norm(np.maximum(np.maximum(lo - p, p - hi), 0), axis=1)
+		upper = np.linalg.norm(corners[:,0] - p, axis=1).min()
+		close = lower <= upper + NUMPREC * max(1, np.abs(p).max(), upper)
+		candidates, corners = candidates[close], corners[close]
+		# the exact distance is only evaluated for the simplices that are the nearest up to the rounding errors
+		approx = _distances(p, corners)
+		tolerance = NUMPREC * max(1, np.abs(p).max(), approx.min())
+		best = min((self.distance(point, i), i)  
+					for i in candidates[approx <= approx.min() + tolerance].tolist())
+		return best[1], best[0]
+	
+	def cast(self, origin: vec3, direction: vec3) -> '(int, float)':
+		''' Return the index of the first triangle hit by the ray starting from `origin` in `direction`, and the distance along the ray in units of `direction`. 
+			Return `(None, inf)` if no triangle is hit.
+		'''
+		if self.simplices.shape[1] != 3:
+			raise TypeError('ray casting is only possible on triangles')
+		o = np.array(tuple(origin), dtype='f8')
+		d = np.array(tuple(direction), dtype='f8')
+		def entry(nodes):
+			with np.errstate(divide='ignore', invalid='ignore'):
+				t1 = (self.lo[nodes] - o) / d
+				t2 = (self.hi[nodes] - o) / d
+			# axis parallel to the ray: all or nothing depending on the origin
+			parallel = d == 0
+			if parallel.any():
+				inside = (self.lo[nodes] <= o) & (o <= self.hi[nodes])
+				t1[:,parallel] = np.where(inside[:,parallel], -inf, inf)
+				t2[:,parallel] = np.where(inside[:,parallel], inf, -inf)
+			tmin = np.maximum(np.minimum(t1, t2).max(axis=1), 0)
+			tmax = np.maximum(t1, t2).min(axis=1)
+			return tmin, tmax
+		def select(nodes):
+			tmin, tmax = entry(nodes)
+			return tmin <= tmax
+		
+		leafs = self._descend(select)
+		best = (inf, None)
+		for start, leaf in sorted(zip(entry(leafs)[0].tolist(), leafs.tolist())):
+			if start > best[0]:	break
+			for i in self._content(np.array([leaf])).tolist():
+				t = _ray_triangle(origin, direction, self._simplex(i))
+				if t is not None:
+					best = min(best, (t, i))
+		return best[1], best[0]
+	
+	def inbox(self, box: Box) -> '[int]':
+		''' Return the sorted indices of the simplices which bounding box intersects the given box '''
+		lo, hi = np.array(tuple(box.min), dtype='f8'), np.array(tuple(box.max), dtype='f8')
+		def select(nodes):
+			return np.all((self.lo[nodes] <= hi) & (lo <= self.hi[nodes]), axis=1)
+		candidates = np.sort(self._content(self._descend(select)))
+		corners = self.points[self.simplices[candidates]]
+		keep = np.all((corners.min(axis=1) <= hi) & (lo <= corners.max(axis=1)), axis=1)
+		return candidates[keep].tolist()
+	
+	def within(self, point: vec3, radius: float) -> '[int]':
+		''' Return the sorted indices of the simplices at distance `radius` or less from `point` '''
+		return [i  for i in self.inbox(Box(point-radius, point+radius))
+					if self.distance(point, i) <= radius]
+
+def _bounds(corners):
+	''' Lower and upper corners of the boxes of simplices given as an array of shape (m,k,3), element-wise operations are much faster than reductions over such a small axis '''
+	lo = hi = corners[:,0]
+	for i in range(1, corners.shape[1]):
+		lo, hi = np.minimum(lo, corners[:,i]), np.maximum(hi, corners[:,i])
+	return lo, hi
+
+def _distances(p, simplices):
+	''' Distances from a point to simplices given as an array of shape (m,k,3) '''
+	if simplices.shape[1] == 1:
+		return np.linalg.norm(simplices[:,0] - p, axis=1)
+	elif simplices.shape[1] == 2:
+		a, b = simplices[:,0], simplices[:,1]
+		d = b - a
+		l = (d*d).sum(axis=1)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			x = np.clip(((p - a)*d).sum(axis=1) / l, 0, 1)
+		x[l == 0] = 0
+		return np.linalg.norm(a + x[:,None]*d - p, axis=1)
+	else:
+		normal = np.cross(simplices[:,1] - simplices[:,0], simplices[:,2] - simplices[:,0])
+		area = np.linalg.norm(normal, axis=1)
+		outside = area == 0
+		for i in range(3):
+			outside |= ((p - simplices[:,i-1]) * np.cross(simplices[:,i-2] - simplices[:,i-1], normal)).sum(axis=1) < 0
+		with np.errstate(divide='ignore', invalid='ignore'):
+			result = np.abs(((p - simplices[:,0]) * normal).sum(axis=1)) / area
+		if outside.any():
+			result[outside] = np.min([
+				_distances(p, simplices[outside][:,[i-1,i]])  
+				for i in range(3)], axis=0)
+		return result
+
+def _ray_triangle(origin, direction, triangle):
+	''' Distance along the ray in units of `direction` to the triangle, or None if the ray does not hit it '''
+	e1 = triangle[1] - triangle[0]
+	e2 = triangle[2] - triangle[0]
+	h = cross(direction, e2)
+	det = dot(e1, h)
+	if not det:	return None
+	o = origin - triangle[0]
+	u = dot(o, h) / det
+	if u < 0 or u > 1:	return None
+	q = cross(o, e1)
+	v = dot(direction, q) / det
+	if v < 0 or u+v > 1:	return None
+	t = dot(e2, q) / det
+	if t < 0:	return None
+	return t
+
+def _spreadbits(x):
+	''' Spread the 21 lower bits of integers, so that each bit is followed by 2 zeros (Morton code) '''
+	x = x & np.uint64(0x1fffff)
+	x = (x | x << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+	x = (x | x << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+	x = (x | x << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+	x = (x | x << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+	x = (x | x << np.uint64(2)) & np.uint64(0x1249249249249249)
+	return x
+
+
 class PointSet:
 	''' Holds a list of points and hash them.
 		The points are holds using indices, that allows to get the point buffer at any time, or to retrieve only a point index.
@@ -276,6 +670,26 @@ class PointSet:
 	def update(self, iterable):
 		''' Add the points from an iterable '''
 		for pt in iterable:	self.add(pt)
+	def add_many(self, points) -> 'ndarray':
+		''' Add many points at once, and return an array of the index of each point in the set.
+		
+			This is equivalent to calling `add` on each point successively, but all the hashing is done in one call to `core.pointset_insert`. `points` can be a typedlist of vec3 or an array of shape (n,3)
+		'''
+		from .mesh import typedlist_view, ensure_typedlist
+		if isinstance(points, typedlist):
+			points = typedlist_view(ensure_typedlist(points, vec3))
+		points = np.ascontiguousarray(points, dtype='f8').reshape(-1,3)
+		if self.dict:
+			keys = np.array(list(self.dict.keys()), dtype=np.int64)
+			values = np.fromiter(self.dict.values(), np.int64, len(self.dict))
+		else:
+			keys = values = None
+		start = len(self.points)
+		indices, inserted, newkeys = core.pointset_insert(points, self.cellsize, keys, values, start)
+		self.points.extend(typedlist(np.ascontiguousarray(points[inserted]), vec3))
+		self.dict.update(zip(map(tuple, newkeys.tolist()), range(start, start+len(inserted))))
+		return indices
+		
 	def difference_update(self, iterable):
 		''' Remove the points from an iterable '''
 		for pt in iterable:	self.discard(pt)
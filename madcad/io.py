@@ -2,12 +2,14 @@
 
 import numpy as np
 import numpy.lib.recfunctions as rfn
-import os, tempfile
+import os, tempfile, inspect, time
 from functools import wraps
 from hashlib import md5
+from collections import OrderedDict
+from threading import Lock, get_ident
 
-from .mathutils import vec3, glm, inf, typedlist
-from .mesh import Mesh, Wire
+from .mathutils import vec3, uvec2, uvec3, glm, inf, typedlist
+from .mesh import Mesh, Web, Wire, numpy_to_typedlist, typedlist_to_numpy, ensure_typedlist
 
 class FileFormatError(Exception):	pass
 
@@ -70,28 +72,140 @@ def cache(filename: str, create: callable=None, name=None, storage=None, **opts)
 	
 	
 
+class FunctionCache:
+	''' Cache of function results, with an in-memory tier in front of a directory of files.
+	
+		Both tiers are evicted in least recently used order: the memory tier is bounded in number of objects, the directory in total bytes size. Files are written atomically, so many processes can share the same directory.
+		The keys depend on the madcad version and on the function source code, so changes in the library do not reuse outdated results.
+		
+		Attributes:
+			directory (str):  the directory containing the cache files
+			maxsize (int):    maximum total size in bytes of the cache files
+			memsize (int):    maximum number of objects kept in memory
+			hits (int):       number of results found in memory
+			loads (int):      number of results loaded from files
+			misses (int):     number of results that had to be computed
+	'''
+	__slots__ = 'directory', 'maxsize', 'memsize', 'memory', 'sources', 'size', 'hits', 'loads', 'misses', 'lock'
+	
+	def __init__(self, directory, maxsize=2**30, memsize=256):
+		self.directory = directory
+		self.maxsize = maxsize
+		self.memsize = memsize
+		self.memory = OrderedDict()
+		self.sources = {}
+		self.size = None
+		self.hits = self.loads = self.misses = 0
+		self.lock = Lock()
+	
+	def key(self, f, args, kwargs) -> str:
+		''' Cache key of a function call '''
+		if f not in self.sources:
+			from . import version
+			try:	source = inspect.getsource(f).encode()
+			except (OSError, TypeError):	source = f.__code__.co_code
+			self.sources[f] = version + '-' + md5(source).hexdigest()
+		return '{}{}-{}'.format(
+			f.__module__ + '.' if f.__module__ else '',
+			f.__qualname__,
+			md5(repr((
+				self.sources[f],
+				*args,
+				sorted(kwargs.items()),
+				)).encode()).hexdigest(),
+			)
+	
+	def get(self, key, create: callable):
+		''' Return the object associated to the given key, calling create() to provide it if it is in none of the tiers '''
+		with self.lock:
+			if key in self.memory:
+				self.memory.move_to_end(key)
+				self.hits += 1
+				return self.memory[key]
+		
+		filename = '{}/{}.madcad'.format(self.directory, key)
+		try:
+			obj = read(filename)
+			# the modification time is the last use time for eviction
+			os.utime(filename)
+		except (OSError, ValueError, EOFError, FileFormatError, pickle.UnpicklingError):
+			obj = create()
+			os.makedirs(self.directory, exist_ok=True)
+			write(obj, filename)
+			with self.lock:
+				self.misses += 1
+				# the file may already have been evicted by an other thread
+				try:	self.grow(os.path.getsize(filename))
+				except OSError:	pass
+		else:
+			with self.lock:
+				self.loads += 1
+		
+		with self.lock:
+			self.memory[key] = obj
+			self.memory.move_to_end(key)
+			while len(self.memory) > self.memsize:
+				self.memory.popitem(last=False)
+		return obj
+	
+	def grow(self, size):
+		''' Account for a new file in the cache directory, and evict old files if the directory is too big.
+			The lock must be held by the caller
+		'''
+		if self.size is None or self.size + size > self.maxsize:
+			self.evict()
+		else:
+			self.size += size
+	
+	def evict(self):
+		''' Remove the least recently used files until the directory is under 3/4 of its maximum size.
+			The lock must be held by the caller
+		'''
+		try:	entries = list(os.scandir(self.directory))
+		except OSError:	entries = []
+		files = []
+		for entry in entries:
+			try:	stat = entry.stat()
+			except OSError:	continue
+			# temporary files may be being written by other processes, only remove the ones left behind
+			if entry.name.endswith('.tmp') and stat.st_mtime > time.time() - 3600:
+				continue
+			files.append((stat.st_mtime, stat.st_size, entry.path))
+		files.sort()
+		self.size = sum(size  for _, size, _ in files)
+		if self.size <= self.maxsize:
+			return
+		for _, size, path in files:
+			if self.size <= self.maxsize * 3//4:
+				break
+			try:	os.remove(path)
+			except OSError:	pass
+			else:	self.size -= size
+	
+	def clear(self):
+		''' Remove all the cached objects, in memory and in files '''
+		with self.lock:
+			self.memory.clear()
+			for entry in os.scandir(self.directory) if os.path.exists(self.directory) else ():
+				try:	os.remove(entry.path)
+				except OSError:	pass
+			self.size = 0
+	
+	def stats(self) -> dict:
+		''' Hit and miss statistics '''
+		with self.lock:
+			return dict(hits=self.hits, loads=self.loads, misses=self.misses, memory=len(self.memory), size=self.size)
+
+functioncache = FunctionCache(cachedir)
+
 def cachefunc(f):
 	''' Decorator to cache a function results.
 		
-		Use it if you want to cache their result associated with the argument set used 
+		Use it if you want to cache their result associated with the argument set used. The results are stored in `functioncache`
 	'''
 	@wraps(f)
 	def repl(*args, **kwargs):
-		if not os.path.exists(cachedir):
-			os.makedirs(cachedir)
-		key = '{}/{}{}-{}.pickle'.format(
-			cachedir,
-			f.__module__ + '.' if f.__module__ else '',
-			f.__name__,
-			hex(int.from_bytes(
-				md5(repr((
-					*args, 
-					sorted(list(kwargs.items()))
-					)).encode())
-					.digest(),
-				'little')),
-			)
-		return cache(key, lambda: f(*args, **kwargs))
+		return functioncache.get(functioncache.key(f, args, kwargs), lambda: f(*args, **kwargs))
 	return repl
 
 	
@@ -106,6 +220,77 @@ def pickle_read(file, **opts):
 def pickle_write(obj, file, **opts):
 	return pickle.dump(obj, open(file, 'wb'))
 
+'''
+	MADCAD files are the native binary format, made for fast caching of meshes.
+	
+	The file starts with a magic number and a json header describing the buffers that follow. Points, simplices and tracks are stored as aligned raw buffers in the memory layout of `typedlist`, so they are loaded by memory-mapping the file without any copy. Groups and options are arbitrary python objects and are pickled, as well as any object that is not a mesh. As for pickle files, do not load a file that is not from your own caching.
+'''
+import json
+
+madcad_magic = b'MADCAD\0\1'
+madcad_align = 64
+madcad_types = {
+	'Mesh': (Mesh, {'points': vec3, 'faces': uvec3, 'tracks': 'I'}),
+	'Web': (Web, {'points': vec3, 'edges': uvec2, 'tracks': 'I'}),
+	'Wire': (Wire, {'points': vec3, 'indices': 'I', 'tracks': 'I'}),
+	}
+
+def madcad_read(file, **opts):
+	data = np.memmap(file, 'u1', 'c')
+	if bytes(data[:len(madcad_magic)]) != madcad_magic:
+		raise FileFormatError('not a madcad file')
+	start = len(madcad_magic) + 4
+	size = int.from_bytes(data[len(madcad_magic):start], 'little')
+	header = json.loads(bytes(data[start:start+size]))
+	start = -(-(start+size) // madcad_align) * madcad_align
+	
+	offset, size = header['meta']
+	meta = pickle.loads(data[start+offset:start+offset+size])
+	if header['type'] not in madcad_types:
+		return meta
+	cls, fields = madcad_types[header['type']]
+	buffers = {}
+	for name, (offset, count, itemsize) in header['buffers'].items():
+		if itemsize != typedlist(dtype=fields[name]).ddtype.dsize:
+			raise FileFormatError('incompatible layout for buffer {}'.format(name))
+		# copy-on-write mapping, so the loaded object can be modified without altering the file
+		buffers[name] = typedlist(data[start+offset:start+offset+count*itemsize], fields[name])
+	return cls(**buffers, **meta)
+
+def madcad_write(obj, file, **opts):
+	kind = type(obj).__name__
+	if kind in madcad_types and type(obj) is madcad_types[kind][0]:
+		buffers = {name: ensure_typedlist(getattr(obj, name), dtype)
+					for name, dtype in madcad_types[kind][1].items()
+					if getattr(obj, name) is not None}
+		meta = pickle.dumps({'groups': obj.groups, 'options': obj.options})
+	else:
+		kind = 'pickle'
+		buffers = {}
+		meta = pickle.dumps(obj)
+	
+	# place the buffers at aligned offsets after the header
+	layout = {}
+	offset = 0
+	for name, buffer in buffers.items():
+		layout[name] = (offset, len(buffer), buffer.ddtype.dsize)
+		offset += -(-len(buffer)*buffer.ddtype.dsize // madcad_align) * madcad_align
+	header = json.dumps({'type': kind, 'buffers': layout, 'meta': (offset, len(meta))}).encode()
+	start = len(madcad_magic) + 4 + len(header)
+	
+	# write in a temporary file first, the previous file may still be mapped by loaded objects
+	tmp = '{}.{}-{}.tmp'.format(file, os.getpid(), get_ident())
+	with open(tmp, 'wb') as f:
+		f.write(madcad_magic)
+		f.write(len(header).to_bytes(4, 'little'))
+		f.write(header)
+		f.write(bytes(-start % madcad_align))
+		for buffer in buffers.values():
+			f.write(np.asarray(buffer))
+			f.write(bytes(-f.tell() % madcad_align))
+		f.write(meta)
+	os.replace(tmp, file)
+
 '''
 	PLY is loaded using plyfile module 	https://github.com/dranjan/python-plyfile
 	using the specifications from 	https://web.archive.org/web/20161221115231/http://www.cs.virginia.edu/~gfx/Courses/2001/Advanced.spring.01/plylib/Ply.txt
@@ -130,18 +315,15 @@ else:
 		# collect faces
 		faces = data['face'].data
 		if faces.dtype.names[0] == 'vertex_indices':
-			for face in faces['vertex_indices']:
-				#print('  ', type(face), face, face.dtype, face.strides)
-				if len(face) == 3:	# triangle
-					mesh.faces.append(face)
-				elif len(face) > 3:	# quad or other extended face
-					mesh += triangulation.triangulation_outline(Wire(mesh.points, face))
+			triangles, source = polygons_triangulation(mesh.points, faces['vertex_indices'])
 		else:
-			mesh.faces = numpy_to_typedlist(faces.astype('u4'), dtype=uvec3)
+			triangles = faces.astype('u4')
+			source = np.arange(len(faces))
+		mesh.faces = numpy_to_typedlist(triangles, uvec3)
 
 		# collect tracks
 		if 'group' in faces.dtype.names:
-			mesh.tracks = typedlist(faces['group'].astype('u4'), dtype='I')
+			mesh.tracks = typedlist(faces['group'].astype('u4')[source], dtype='I')
 		else:
 			mesh.tracks = typedlist.full(0, len(mesh.faces), 'I')
 		
@@ -150,6 +332,52 @@ else:
 		
 		return mesh
 
+	def polygons_triangulation(points, polygons) -> '(ndarray, ndarray)':
+		''' Triangulate polygons given as a sequence of index arrays, return the triangles array of shape (n,3) and for each triangle the index of the polygon it comes from.
+		
+			Polygons are grouped by size and convex ones are fan-triangulated in bulk, only the non-convex polygons are triangulated one by one using `triangulation_outline`
+		'''
+		from .mesh import typedlist_view
+		sizes = np.fromiter(map(len, polygons), np.int64, len(polygons))
+		indices = np.concatenate([*polygons, np.empty(0, 'u4')]).astype('u4', copy=False)
+		starts = np.cumsum(sizes) - sizes
+		coords = typedlist_view(points)
+		
+		triangles = [np.empty((0,3), 'u4')]
+		source = [np.empty(0, np.int64)]
+		outlines = []
+		for k in np.unique(sizes).tolist():
+			if k < 3:	continue
+			selected = np.flatnonzero(sizes == k)
+			loops = indices[starts[selected,None] + np.arange(k)]
+			if k > 3:
+				# a polygon is convex when it always turns the same way, and simple when its fan triangles are all in the same direction
+				p = coords[loops]
+				normal = np.cross(p, np.roll(p, -1, axis=1)).sum(axis=1)
+				edges = np.roll(p, -1, axis=1) - p
+				turns = np.einsum('ijk,ik->ij', np.cross(np.roll(edges, 1, axis=1), edges), normal)
+				fans = np.einsum('ijk,ik->ij', np.cross(p[:,1:-1]-p[:,:1], p[:,2:]-p[:,:1]), normal)
+				convex = (turns >= 0).all(axis=1) & (fans > 0).all(axis=1)
+				outlines.extend(zip(selected[~convex].tolist(), loops[~convex]))
+				selected, loops = selected[convex], loops[convex]
+			fan = np.empty((len(loops), k-2, 3), 'u4')
+			fan[:,:,0] = loops[:,:1]
+			fan[:,:,1] = loops[:,1:-1]
+			fan[:,:,2] = loops[:,2:]
+			triangles.append(fan.reshape(-1,3))
+			source.append(np.repeat(selected, k-2))
+		
+		for i, loop in outlines:
+			fan = typedlist_to_numpy(triangulation.triangulation_outline(Wire(points, typedlist(loop.tolist(), 'I'))).faces, 'u4').reshape(-1,3)
+			triangles.append(fan)
+			source.append(np.full(len(fan), i))
+		
+		triangles = np.concatenate(triangles)
+		source = np.concatenate(source)
+		# restore the file order of the polygons
+		order = np.argsort(source, kind='stable')
+		return triangles[order], source[order]
+
 	def ply_write(mesh, file, **opts):
 		vertices = np.array(mesh.points, copy=False).astype(np.dtype([('x', 'f4'), ('y', 'f4'), ('z', 'f4')]))
 		faces = np.empty(len(mesh.faces), dtype=[('vertex_indices', 'u4', (3,)), ('group', 'u2')])
@@ -161,21 +389,73 @@ else:
 
 
 '''
-	STL is loaded using numpy-stl module 	https://github.com/WoLpH/numpy-stl
+	STL binary files are loaded natively by memory-mapping the triangle records, 
+	STL ascii files and STL writing use the numpy-stl module 	https://github.com/WoLpH/numpy-stl
 '''
+stl_dtype = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3,3)), ('attributes', '<u2')])
+
+def stl_read(file, merge=False, **opts):
+	''' Load a STL file.
+	
+		Binary files are read without any per-triangle python object: the file is memory-mapped, the points are converted in one numpy operation and the faces are generated as a range.
+		If `merge` is True, the vertices with the exact same coordinates are merged during load, else every triangle has its own 3 points.
+	'''
+	size = os.path.getsize(file)
+	with open(file, 'rb') as f:
+		header = f.read(84)
+	# some exporters pad binary files after the triangles. ascii files have text in place of the triangle count, making it too big for the file
+	if len(header) < 84 or size < 84 + stl_dtype.itemsize * int.from_bytes(header[80:84], 'little'):
+		return stl_read_ascii(file, **opts)
+	trinum = int.from_bytes(header[80:84], 'little')
+	
+	if trinum:
+		vertices = np.memmap(file, stl_dtype, 'r', offset=84, shape=(trinum,))['vertices'].reshape(trinum*3, 3)
+	else:
+		vertices = np.empty((0,3), 'f4')
+	if merge:
+		# bitwise comparison of vertices, with negative zeros considered equal to zeros
+		bits = np.ascontiguousarray(vertices + np.float32(0)).view('u4')
+		high = (bits[:,0].astype('u8') << 32) | bits[:,1]
+		order = np.lexsort((bits[:,2], high))
+		high, low = high[order], bits[order,2]
+		new = np.empty(len(order), bool)
+		new[:1] = True
+		new[1:] = (high[1:] != high[:-1]) | (low[1:] != low[:-1])
+		# lexsort is stable, so the first of each group is its first appearance in the file
+		first = order[new]
+		rank = np.empty(len(first), 'u4')
+		rank[np.argsort(first)] = np.arange(len(first), dtype='u4')
+		indices = np.empty(len(order), 'u4')
+		indices[order] = rank[np.cumsum(new) - 1]
+		points = vertices[np.sort(first)]
+		faces = indices.reshape(trinum, 3)
+	else:
+		points = vertices
+		faces = np.arange(trinum*3, dtype='u4').reshape(trinum, 3)
+	
+	mesh = Mesh(
+		typedlist(np.ascontiguousarray(points, 'f8'), vec3), 
+		numpy_to_typedlist(faces, uvec3),
+		)
+	mesh.options['name'] = header[:80].rstrip(b'\0 ').decode(errors='replace')
+	return mesh
+
 try:	
 	import stl
-except ImportError:	pass
+except ImportError:	
+	def stl_read_ascii(file, **opts):
+		raise FileFormatError('reading ascii STL files requires module numpy-stl')
 else:
 
 	from .mathutils import *
-	from .mesh import numpy_to_typedlist, typedlist_to_numpy
-	def stl_read(file, **opts):
-		stlmesh = stl.mesh.Mesh.from_file(file, calculate_normals=False)
+	
+	def stl_read_ascii(file, **opts):
+		# numpy-stl detects the format again, in case the file is a binary one not recognized as such
+		stlmesh = stl.mesh.Mesh.from_file(file, calculate_normals=False, mode=stl.Mode.AUTOMATIC)
 		trinum = stlmesh.points.shape[0]
 		mesh = Mesh(
 			numpy_to_typedlist(stlmesh.points.reshape(trinum*3, 3), vec3), 
-			typedlist(uvec3(i, i+1, i+2)  for i in range(0, 3*trinum, 3)),
+			numpy_to_typedlist(np.arange(trinum*3, dtype='u4').reshape(trinum, 3), uvec3),
 			)
 		mesh.options['name'] = stlmesh.name
 		return mesh
@@ -213,7 +493,6 @@ else:
 	always using the official json specifications
 	it can store many object types, not only shapes
 '''
-import json
 
 class JSONEncoder(json.JSONEncoder):
 	def default(self, obj):
@@ -302,10 +302,14 @@ def distance_ae(axis, edge):
 def distance_pt(p, triangle):
 	''' Point - triangle distance '''
 	normal = cross(triangle[1]-triangle[0], triangle[2]-triangle[0])
-	for i in range(3):
-		if dot(p-triangle[i-1], cross(triangle[i-2]-triangle[i-1], normal)) > 0:
-			return distance_pe(p, (triangle[i-1],triangle[i-2]))
-	return length(project(normal, p-triangle[0]))
+	if length2(normal):
+		for i in range(3):
+			if dot(p-triangle[i-1], cross(triangle[i-2]-triangle[i-1], normal)) < 0:
+				break
+		else:
+			return abs(dot(p-triangle[0], normal)) / length(normal)
+	# the nearest point is on the outline
+	return min(distance_pe(p, (triangle[i-1],triangle[i]))  for i in range(3))
 
 
 #-- algorithmic functions ---------
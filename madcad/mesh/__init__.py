@@ -59,11 +59,11 @@ from ..mathutils import *
 
 
 __all__ = [
-		'Mesh', 'Web', 'Wire', 'MeshError', 'web', 'wire', 
+		'Mesh', 'Web', 'Wire', 'MeshError', 'Topology', 'Changes', 'web', 'wire', 
 		'connpp', 'connpp', 'connpe', 'connef',
 		'edgekey', 'facekeyo', 'arrangeface', 'arrangeedge', 
 		'suites', 'line_simplification', 'mesh_distance', 'striplist',
-		'typedlist_to_numpy', 'numpy_to_typedlist', 'ensure_typedlist',
+		'typedlist_to_numpy', 'numpy_to_typedlist', 'ensure_typedlist', 'typedlist_view', 'selection_mask', 'validate_buffers',
 		]
 
 
@@ -71,13 +71,14 @@ __all__ = [
 from .mesh import Mesh, mkquad, mktri
 from .web import Web
 from .wire import Wire
+from .topology import Topology
 from .conversions import *
 from .container import (
-	MeshError, NMesh,
+	MeshError, NMesh, Changes,
 	connpe, connef, connpp, connexity,
 	facekeyo, edgekey, arrangeface, arrangeedge,
 	suites, striplist,
-	typedlist_to_numpy, numpy_to_typedlist, ensure_typedlist,
+	typedlist_to_numpy, numpy_to_typedlist, ensure_typedlist, typedlist_view, selection_mask, validate_buffers,
 	)
 
 # topological genericity definitions
@@ -5,7 +5,8 @@ from random import random
 import numpy as np
 import numpy.lib.recfunctions as rfn
 from array import array
-from collections import OrderedDict, Counter
+from collections import OrderedDict, Counter, deque
+from itertools import compress
 from numbers import Integral, Real
 import math
 
@@ -20,6 +21,52 @@ class MeshError(Exception):
 	pass
 
 
+class Changes:
+	''' Log of the modifications made to the buffers of a mesh, obtained with `NMesh.track()`
+	
+		Each modification recorded increments `version` and gives the range of items modified in a buffer, so anything built from the buffers at a former version can know what changed since, and update instead of rebuilding.
+		Appended items are recorded as a range at the end of the buffer, removed items by the range they were occupying.
+		
+		Attributes:
+			version (int):   number of modifications recorded so far
+			log (deque):     the last modifications as `(version, name, start, stop)`
+			buffers (dict):  identity and length `(id, len)` of each buffer after its last recorded modification, used to detect the buffers replaced or resized without recording it
+	'''
+	__slots__ = 'version', 'log', 'buffers'
+	maxlog = 1024
+	
+	def __init__(self, mesh):
+		self.version = 0
+		self.log = deque(maxlen=self.maxlog)
+		self.buffers = {}
+		for name in type(mesh).__slots__:
+			buffer = getattr(mesh, name, None)
+			if isinstance(buffer, typedlist):
+				self.buffers[name] = (id(buffer), len(buffer))
+	
+	def record(self, name, buffer, start, stop):
+		''' record the modification of items `start:stop` of the given buffer '''
+		self.version += 1
+		self.log.append((self.version, name, start, stop))
+		self.buffers[name] = (id(buffer), len(buffer))
+	
+	def since(self, mesh, name, version) -> slice:
+		''' Return the slice of the buffer `name` of the mesh covering all the items modified since the given version, or None if the log has been dropped since.
+			A buffer replaced or resized without having been recorded is considered fully modified.
+		'''
+		buffer = getattr(mesh, name)
+		if self.buffers.get(name) != (id(buffer), len(buffer)):
+			self.record(name, buffer, 0, len(buffer))
+		if version > self.version or self.log and version < self.log[0][0]-1:
+			return None
+		start, stop = len(buffer), 0
+		for v, n, a, b in reversed(self.log):
+			if v <= version:	break
+			if n == name:
+				start, stop = min(start, a), max(stop, b)
+		return slice(start, max(start, stop))
+
+
 class NMesh(object):
 	''' Common methods for points container (typically Mesh, Web, Wire) '''
 	
@@ -51,10 +98,25 @@ class NMesh(object):
 	
 	def transform(self, trans) -> 'Self':
 		''' Apply the transform to the points of the mesh, returning the new transformed mesh'''
-		trans = transformer(trans)
 		transformed = copy(self)
-		transformed.points = typedlist((trans(p) for p in self.points), dtype=vec3)
+		transformed.points = transform_points(self.points, trans)
 		return transformed
+	
+	def instances(self, transforms) -> list:
+		''' Return the meshes resulting of each of the given transforms, as `transform` would.
+			The instances share the same simplices, tracks and groups buffers, and the point buffer is converted only once. This is meant to place many copies of a part in an assembly.
+		'''
+		points = typedlist_view(ensure_typedlist(self.points, vec3))
+		instances = []
+		for trans in transforms:
+			instance = copy(self)
+			matrix = _affine(trans)
+			if matrix is None:
+				instance.points = transform_points(self.points, trans)
+			else:
+				instance.points = typedlist(_transformed(points, matrix), vec3)
+			instances.append(instance)
+		return instances
 			
 	def mergeclose(self, limit=None) -> dict:
 		''' Merge points below the specified distance, or below the precision 
@@ -64,18 +126,19 @@ class NMesh(object):
 		'''
 		if limit is None:	limit = self.precision()
 		
-		merges = {}
 		points = hashing.PointSet(limit)
-		for i in range(len(self.points)):
-			used = points.add(self.points[i])
-			if used != i:	merges[i] = used
+		used = points.add_many(self.points)
+		moved = np.flatnonzero(used != np.arange(len(used)))
+		merges = dict(zip(moved.tolist(), used[moved].tolist()))
 		self.points = points.points
+		self.touch('points')
 		self.mergepoints(merges)
 		return merges
 	
 	def stripgroups(self) -> list:
 		''' Remove groups that are used by no faces. return the reindex list. '''
 		self.groups, self.tracks, reindex = striplist(self.groups, self.tracks)
+		self.touch('tracks')
 		return reindex
 	
 	def mergegroups(self, defs=None, merges=None) -> 'self':
@@ -97,6 +160,7 @@ class NMesh(object):
 			for i,t in enumerate(self.tracks):
 				if t in merges:
 					self.tracks[i] = merges[t]+l
+		self.touch('tracks')
 		return self
 	
 	def finish(self) -> 'self':
@@ -127,13 +191,84 @@ class NMesh(object):
 	
 	def pointat(self, point: vec3, neigh=NUMPREC) -> int:
 		''' Return the index of the first point at the given location, or None '''
-		for i,p in enumerate(self.points):
-			if distance(p,point) <= neigh:	return i
+		found = self._searchtree(points=True).within(point, neigh)
+		if found:	return found[0]
 	
 	def pointnear(self, point: vec3) -> int:
 		''' Return the nearest point the the given location '''
-		return min(	range(len(self.points)), 
-					lambda i: distance(self.points[i], point))
+		return self._searchtree(points=True).nearest(point)[0]
+	
+	def boxtree(self, points=False) -> 'hashing.BoxTree':
+		''' Return a `hashing.BoxTree` of the mesh simplices (faces, or edges), or of its points if `points` is True.
+			Building it costs `O(n*log(n))`, then each proximity query costs `O(log(n))`. It is kept on the meshes tracking their changes (see `track`), otherwise it is built at each call and should be kept by the caller for several queries.
+		'''
+		from .mesh import Mesh
+		from .web import Web
+		if points:
+			return self._cached('pointtree', lambda: hashing.BoxTree.from_mesh(self, points=True), 'points')
+		simplices = 'faces' if isinstance(self, Mesh) else 'edges' if isinstance(self, Web) else 'indices'
+		return self._cached('boxtree', lambda: hashing.BoxTree.from_mesh(self), 'points', simplices)
+	
+	def _searchtree(self, points=False) -> 'hashing.BoxTree':
+		''' Tree for a single proximity query: the cached `boxtree` when the changes are tracked, else a tree of one leaf, as a linear scan is cheaper than building a tree for one query '''
+		if getattr(self, '_changes', None) is not None:
+			return self.boxtree(points)
+		return hashing.BoxTree.from_mesh(self, points, leafsize=None)
+	
+	def track(self) -> Changes:
+		''' Enable the tracking of the modifications of the mesh buffers, and return the `Changes` log.
+		
+			Once enabled, the methods of the mesh record what they modify, but the modifications made directly on the buffers must be reported using `touch`. The data like `topology()`, `box()` or `boxtree()` are then cached and validated using the log. `box()`, `maxnum()` and `topology()` are updated rather than rebuilt when items were only appended, the box trees are always rebuilt.
+			
+			Untracked meshes cache nothing, so they need no reporting.
+		'''
+		try:
+			return self._changes
+		except AttributeError:
+			self._changes = changes = Changes(self)
+			return changes
+	
+	def touch(self, name, start=0, stop=None):
+		''' Report the modification of items `start:stop` of the given buffer (`'points'`, `'faces'`, ...) when the changes are tracked, see `track` '''
+		changes = getattr(self, '_changes', None)
+		buffer = getattr(self, name)
+		if changes is not None and buffer is not None:
+			changes.record(name, buffer, start, len(buffer) if stop is None else stop)
+	
+	def _cached(self, name, build, *buffers, update=None):
+		''' Return the result of `build()` cached with the given name when the changes are tracked, the cache is dropped when any of the given buffers changes according to the log.
+		
+			`buffers` are the names of the attributes the result depends on. `update(result, appended)` is called if given when items were only appended to the buffers, with `appended` the dictionnary of the slices appended to each buffer, and must return the updated result.
+		'''
+		changes = getattr(self, '_changes', None)
+		if changes is None:
+			return build()
+		current = tuple(getattr(self, buffer)  for buffer in buffers)
+		if not all(isinstance(buffer, typedlist)  for buffer in current):
+			return build()
+		try:
+			cache = self._cache
+		except AttributeError:
+			cache = self._cache = {}
+		lengths = tuple(len(buffer)  for buffer in current)
+		
+		if name in cache:
+			# the previous buffers are kept referenced, so their identity cannot be reused by new buffers
+			previous, sizes, since, result = cache[name]
+			if all(a is b  for a, b in zip(previous, current)):
+				modified = [changes.since(self, buffer, since)  for buffer in buffers]
+				if all(m is not None  for m in modified):
+					if all(m.start >= m.stop  for m in modified):
+						cache[name] = current, lengths, changes.version, result
+						return result
+					if update and all(m.start >= m.stop or m.start >= size  for m, size in zip(modified, sizes)):
+						result = update(result, {buffer: slice(size, len(getattr(self, buffer)))  
+												for buffer, size in zip(buffers, sizes)})
+						cache[name] = current, lengths, changes.version, result
+						return result
+		result = build()
+		cache[name] = current, lengths, changes.version, result
+		return result
 	
 	def qualify(self, *quals, select=None, replace=False) -> 'self':
 		''' Set a new qualifier for the given groups 
@@ -172,30 +307,38 @@ class NMesh(object):
 		
 	def qualified_indices(self, quals):
 		''' Yield the faces indices when their associated group are matching the requirements '''
+		yield from np.flatnonzero(self.qualified_mask(quals)).tolist()
+	
+	def qualified_mask(self, quals) -> 'ndarray':
+		''' Boolean array telling for each face (or edge) if its group is matching the requirements, as `qualified_indices` does '''
+		tracks = typedlist_view(self.tracks)
+		groups = self.groupmask(quals)
+		if len(tracks) and tracks.max() >= len(groups):
+			groups = np.concatenate([groups, np.zeros(int(tracks.max())+1-len(groups), bool)])
+		return groups[tracks]
+	
+	def groupmask(self, quals) -> 'ndarray':
+		''' Boolean array telling for each group if it is matching the requirements. 
+			Requirements are the same as for `qualified_indices`: a group index, a qualifier, an iterable of group indices, or an iterable of qualifiers that the groups must all have.
+		'''
 		if isinstance(quals, int):
-			yield from self.qualified_indices({quals})
+			quals = {quals}
 		elif isinstance(quals, str):
-			yield from self.qualified_indices([quals])
+			quals = [quals]
 		
-		elif not quals:
-			yield from range(len(self.tracks))
+		if not quals:
+			return np.ones(len(self.groups), bool)
 		elif isinstance(next(iter(quals)), int):
-			if not isinstance(quals, set):	quals = set(quals)
-			for i,t in enumerate(self.tracks):
-				if t in quals:
-					yield i
+			indices = np.fromiter(quals, np.int64, len(quals))
+			mask = np.zeros(max(len(self.groups), int(indices.max())+1), bool)
+			mask[indices] = True
+			return mask
 		else:
 			inclusive = None in quals
-			seen = {}
-			for i,t in enumerate(self.tracks):
-				if t in seen:
-					ok = seen[t]
-				elif self.groups[t]:
-					ok = seen[t] = all(k in self.groups[t]   for k in quals)
-				else:
-					ok = inclusive
-				if ok:
-					yield i
+			return np.fromiter((
+					all(key in group  for key in quals)  if group else inclusive
+					for group in self.groups), 
+				bool, len(self.groups))
 				
 	def qualified_groups(self, quals):
 		''' Yield the groups indices when they are matching the requirements '''
@@ -218,12 +361,8 @@ class NMesh(object):
 	
 	def maxnum(self) -> float:
 		''' Maximum numeric value of the mesh, use this to get an hint on its size or to evaluate the numeric precision '''
-		m = 0
-		for p in self.points:
-			for v in p:
-				a = abs(v)
-				if a > m:	m = a
-		return m
+		return self._cached('maxnum', lambda: _maxnum(self.points), 'points', 
+				update=lambda m, appended: max(m, _maxnum(self.points[appended['points']])))
 	
 	def precision(self, propag=3) -> float:
 		''' Numeric coordinate precision of operations on this mesh, allowed by the floating point precision '''
@@ -235,19 +374,15 @@ class NMesh(object):
 		if i is None:
 			i = len(self.points)
 			self.points.append(point)
+			self.touch('points', i)
 		return i
 					
 	def box(self) -> Box:
 		''' Return the extreme coordinates of the mesh (vec3, vec3) '''
 		if not self.points:		return Box()
-		p = next(filter(isfinite, self.points))
-		max = deepcopy(p)
-		min = deepcopy(p)
-		for pt in self.points:
-			for i in range(3):
-				if   pt[i] < min[i]:	min[i] = pt[i]
-				elif pt[i] > max[i]:	max[i] = pt[i]
-		return Box(min, max)
+		min, max = self._cached('box', lambda: _bounds(self.points), 'points', 
+				update=lambda bounds, appended: _bounds(self.points[appended['points']], bounds))
+		return Box(vec3(*min), vec3(*max))
 	
 	def barycenter_points(self) -> vec3:
 		''' Barycenter of points used '''
@@ -259,6 +394,56 @@ class NMesh(object):
 
 
 
+def transform_points(points, trans) -> typedlist:
+	''' Return a new typedlist of the points transformed by `trans`, which can be anything accepted by `transformer`.
+		The whole buffer is transformed at once, except for callables which are called on each point.
+	'''
+	if isinstance(trans, (dquat, fquat)):
+		trans = mat3_cast(trans)
+	if callable(trans):
+		return typedlist(map(trans, points), dtype=vec3)
+	view = typedlist_view(ensure_typedlist(points, vec3))
+	if isinstance(trans, (int, float)):
+		return typedlist(view * trans, vec3)
+	if isinstance(trans, (dvec3, fvec3)):
+		return typedlist(view + np.array(trans, dtype='f8'), vec3)
+	matrix = _affine(trans)
+	if matrix is None:
+		raise TypeError('a transformer must be a  vec3, quat, mat3, mat4 or callable, not {}'.format(trans))
+	return typedlist(_transformed(view, matrix), vec3)
+
+def _affine(trans) -> 'ndarray':
+	''' (4,4) float64 array of the given matrix or quaternion, or None if it is not one '''
+	if isinstance(trans, (dquat, fquat)):
+		trans = mat3_cast(trans)
+	if isinstance(trans, (dmat3, fmat3)):
+		matrix = np.identity(4)
+		matrix[:3,:3] = np.array(trans)
+		return matrix
+	if isinstance(trans, (dmat4, fmat4)):
+		return np.array(trans, dtype='f8')
+	return None
+
+def _transformed(points, matrix) -> 'ndarray':
+	''' apply the affine matrices to the points, with the same operations order as glm so the results are the same '''
+	return (  (points[:,0,None] * matrix[:3,0] + points[:,1,None] * matrix[:3,1])
+			+ (points[:,2,None] * matrix[:3,2] + matrix[:3,3])  )
+
+def _maxnum(points) -> float:
+	''' maximum absolute coordinate of the given points, ignoring nan '''
+	points = typedlist_view(ensure_typedlist(points, vec3))
+	return float(np.max(np.abs(points), initial=0, where=~np.isnan(points)))
+
+def _bounds(points, bounds=None) -> tuple:
+	''' extreme coordinates `(min, max)` of the given points ignoring nan, merged with the former bounds if given '''
+	points = typedlist_view(ensure_typedlist(points, vec3))
+	defined = ~np.isnan(points)
+	min = np.min(points, axis=0, initial=inf, where=defined)
+	max = np.max(points, axis=0, initial=-inf, where=defined)
+	if bounds is not None:
+		min, max = np.minimum(min, bounds[0]), np.maximum(max, bounds[1])
+	return min, max
+
 def numpy_to_typedlist(array: 'ndarray', dtype) -> 'typedlist':
 	''' Convert a numpy.ndarray into a typedlist with the given dtype, if the conversion is possible term to term '''
 	ndtype = np.array(typedlist(dtype)).dtype
@@ -269,12 +454,97 @@ def numpy_to_typedlist(array: 'ndarray', dtype) -> 'typedlist':
 	
 def typedlist_to_numpy(array: 'typedlist', dtype) -> 'ndarray':
 	''' Convert a typedlist to a numpy.ndarray with the given dtype, if the conversion is possible term to term '''
-	tmp = np.array(array, copy=False)
+	tmp = np.asarray(array)
 	if tmp.dtype.fields:
 		return rfn.structured_to_unstructured(tmp, dtype)
 	else:
 		return tmp.astype(dtype)
 		
+def typedlist_view(array: 'typedlist') -> 'ndarray':
+	''' Return a numpy.ndarray sharing the memory of the given typedlist, of shape (n,) for scalars or (n,k) for vectors.
+	
+		The view is writable, but it is invalidated as soon as the typedlist is reallocated (like when appending to it), so it must only be kept for immediate use.
+	'''
+	dtype = np.asarray(array).dtype
+	if dtype.fields:
+		base = dtype.fields['f0'][0]
+		return np.ndarray((len(array), len(dtype.fields)), base, buffer=array, strides=(dtype.itemsize, base.itemsize))
+	else:
+		return np.ndarray((len(array),), dtype, buffer=array)
+
+def selection_mask(selection, size) -> 'ndarray':
+	''' Return a boolean array of the given size telling which simplices are selected.
+
+		`selection` can be a boolean array-like of that size, or an iterable of simplex indices (like a set)
+	'''
+	if isinstance(selection, (np.ndarray, list, tuple)):
+		selection = np.asarray(selection)
+	else:
+		selection = np.fromiter(selection, np.int64)
+	if selection.dtype == bool:
+		if selection.shape != (size,):
+			raise ValueError('the selection mask must have one value per simplex, got shape {} for {} simplices'.format(selection.shape, size))
+		return selection
+	mask = np.zeros(size, bool)
+	mask[selection.astype(np.int64, copy=False)] = True
+	return mask
+
+def validate_buffers(points, simplices, tracks=None, groups=(), checks=None) -> dict:
+	''' Report the inconsistencies and defects of mesh buffers, as a dictionnary of arrays of the faulty element indices. The following checks are available, all are done by default:
+	
+		- `points`: points with non-finite coordinates
+		- `indices`: simplices referencing points out of `points`
+		- `degenerated`: simplices using the same point multiple times
+		- `duplicated`: simplices using the same points as a previous simplex, regardless of their order
+		- `tracks`: simplices whose group is out of `groups`
+		
+		`simplices` can be a typedlist of `uvec3`, `uvec2` or `'I'` (single point simplices are never degenerated nor duplicated), `tracks` can be None
+	'''
+	if checks is None:
+		checks = ('points', 'indices', 'degenerated', 'duplicated', 'tracks')
+	simplices = typedlist_view(simplices) if isinstance(simplices, typedlist) else np.asarray(simplices, dtype=np.int64)
+	if simplices.ndim == 1:	simplices = simplices[:,None]
+	size = len(points)
+	report = {}
+	if 'points' in checks:
+		points = typedlist_view(points) if isinstance(points, typedlist) else np.asarray(points, dtype=np.float64).reshape(-1,3)
+		report['points'] = np.flatnonzero(~np.isfinite(points).all(axis=1))
+	if 'indices' in checks:
+		report['indices'] = np.flatnonzero((simplices >= size).any(axis=1))
+	if 'degenerated' in checks:
+		degenerated = np.zeros(len(simplices), bool)
+		for i in range(simplices.shape[1]):
+			for j in range(i):
+				degenerated |= simplices[:,i] == simplices[:,j]
+		report['degenerated'] = np.flatnonzero(degenerated)
+	if 'duplicated' in checks:
+		report['duplicated'] = _duplicated(simplices, size)
+	if 'tracks' in checks:
+		if tracks is None:	tracks = ()
+		tracks = typedlist_view(tracks) if isinstance(tracks, typedlist) else np.asarray(tracks, dtype=np.int64)
+		report['tracks'] = np.flatnonzero(tracks[:len(simplices)] >= len(groups))
+	return report
+
+def _duplicated(simplices, size) -> 'ndarray':
+	''' indices of the simplices using the same points as a previous one '''
+	if simplices.shape[1] < 2 or not len(simplices):
+		return np.empty(0, np.int64)
+	rows = np.sort(simplices, axis=1).astype(np.int64)
+	size = max(size, int(rows.max())+1)
+	if size ** rows.shape[1] < 2**63:
+		keys = rows[:,0]
+		for i in range(1, rows.shape[1]):
+			keys = keys*size + rows[:,i]
+		order = np.argsort(keys)
+		new = keys[order[1:]] != keys[order[:-1]]
+	else:
+		order = np.lexsort(rows.T[::-1])
+		new = (rows[order[1:]] != rows[order[:-1]]).any(axis=1)
+	# the first occurence of each simplex is the smallest index among the equal ones
+	starts = np.flatnonzero(np.concatenate([[True], new]))
+	firsts = np.minimum.reduceat(order, starts)
+	return np.sort(order[order != np.repeat(firsts, np.diff(starts, append=len(order)))])
+
 def ensure_typedlist(obj, dtype):
 	''' Return a typedlist with the given dtype, create it from whatever is in obj if needed '''
 	if isinstance(obj, typedlist) and obj.dtype == dtype:
@@ -345,37 +615,71 @@ def connexity(links):
 			reach[p] = reach.get(p,0) +1
 	return reach
 
-def suites(lines, oriented=True, cut=True, loop=False):
+def suites(lines, oriented=True, cut=True, loop=False, array=False):
 	''' Return a list of the suites that can be formed with lines.
 		`lines` is an iterable of edges
 		
 		Parameters:
 			oriented:      specifies that (a,b) and (c,b) will not be assembled
 			cut:           cut suites when they are crossing each others
+			loop:          stop extending a suite as soon as it is closed
+			array:         if True, return the suites as arrays `(indices, offsets)` such as suite `i` is `indices[offsets[i]:offsets[i+1]]`
 		
 		Return a list of the sequences that can be formed
+		
+		Complexity is `O(n)` thanks to an index of the edges by their extremities
 	'''
-	lines = list(lines)
+	if isinstance(lines, typedlist):
+		lines = typedlist_view(lines).tolist()
+	elif isinstance(lines, np.ndarray):
+		lines = lines.tolist()
+	else:
+		# glm vectors cannot be sliced
+		lines = [tuple(edge)  for edge in lines]
+	
+	# index the edges by their extremities, preserving the order of lines
+	starts = {}
+	ends = {}
+	for i, edge in enumerate(lines):
+		starts.setdefault(edge[0], deque()).append(i)
+		ends.setdefault(edge[-1], deque()).append(i)
+	used = [False] * len(lines)
+	none = len(lines)
+	def first(index, point):
+		''' first unused edge in the given index for the given point '''
+		queue = index.get(point)
+		if not queue:	return none
+		while queue and used[queue[0]]:
+			queue.popleft()
+		return queue[0] if queue else none
+	
 	# get contiguous suite of points
 	suites = []
-	while lines:
-		suite = list(lines.pop())
-		found = True
-		while found:
-			found = False
-			for i,edge in enumerate(lines):
-				if edge[-1] == suite[0]:		suite[0:1] = edge
-				elif edge[0] == suite[-1]:		suite[-1:] = edge
-				# for unoriented lines
-				elif not oriented and edge[0] == suite[0]:		suite[0:1] = reversed(edge)
-				elif not oriented and edge[-1] == suite[-1]:	suite[-1:] = reversed(edge)
-				else:
-					continue
-				lines.pop(i)
-				found = True
-				break
+	remain = len(lines)
+	while True:
+		# start from the last remaining edge
+		remain -= 1
+		while remain >= 0 and used[remain]:
+			remain -= 1
+		if remain < 0:	break
+		used[remain] = True
+		suite = deque(lines[remain])
+		# extend with the first remaining edge that can be assembled
+		while True:
+			if oriented:
+				i = min(first(ends, suite[0]), first(starts, suite[-1]))
+			else:
+				i = min(first(ends, suite[0]), first(starts, suite[-1]), first(starts, suite[0]), first(ends, suite[-1]))
+			if i == none:	break
+			edge = lines[i]
+			if edge[-1] == suite[0]:		suite.extendleft(reversed(edge[:-1]))
+			elif edge[0] == suite[-1]:		suite.extend(edge[1:])
+			# for unoriented lines
+			elif edge[0] == suite[0]:		suite.extendleft(edge[1:])
+			else:							suite.extend(reversed(edge[:-1]))
+			used[i] = True
 			if loop and suite[-1] == suite[0]:	break
-		suites.append(suite)
+		suites.append(list(suite))
 	# cut at suite intersections (sub suites or crossing suites)
 	if cut:
 		reach = {}
@@ -388,6 +692,10 @@ def suites(lines, oriented=True, cut=True, loop=False):
 					suites.append(suite[i:])
 					suite[i+1:] = []
 					break
+	if array:
+		offsets = np.zeros(len(suites)+1, dtype=np.int64)
+		np.cumsum([len(suite)  for suite in suites], out=offsets[1:])
+		return np.fromiter((p  for suite in suites for p in suite), np.int64, offsets[-1]), offsets
 	return suites
 
 
@@ -399,26 +707,83 @@ def reprarray(array, name):
 	content = ', '.join((repr(e) for e in array))
 	return '['+content+']'
 
+def reindex_table(merges, size) -> 'ndarray':
+	''' Return an array `reindex` of the given size so that `reindex[i] == merges.get(i,i)` '''
+	reindex = np.arange(size, dtype=np.uint32)
+	if merges:
+		reindex[np.fromiter(merges.keys(), np.int64, len(merges))] = np.fromiter(merges.values(), np.int64, len(merges))
+	return reindex
+
+def mergesimplices(simplices, tracks, merges, size) -> int:
+	''' Apply the merge dictionnary to a typedlist of simplices, and remove inplace the simplices that became degenerated.
+		`size` is the minimum number of points referenced by simplices
+		Return the number of simplices kept
+	'''
+	view = typedlist_view(simplices)
+	if not len(view):	return 0
+	merged = reindex_table(merges, max(size, int(view.max())+1, max(merges, default=-1)+1))[view]
+	keep = np.ones(len(merged), dtype=bool)
+	for i in range(merged.shape[1]):
+		keep &= merged[:,i] != merged[:,i-1]
+	kept = int(np.count_nonzero(keep))
+	view[:kept] = merged[keep]
+	if tracks is not None:
+		tview = typedlist_view(tracks)
+		tview[:kept] = tview[keep]
+		del tracks[kept:]
+	del simplices[kept:]
+	return kept
+
+def concatenate_buffers(buffers, dtype=None, share=False) -> tuple:
+	''' Concatenate buffers (typedlists of the given dtype, or lists if no dtype is given) into a new one allocated once.
+		Return it with the offset of each buffer in it.
+		
+		If `share` is True and there is several buffers that are all the same object, it is returned as is with null offsets, like the sum of meshes sharing their buffers does.
+	'''
+	if share and len(buffers) > 1 and all(buffer is buffers[0]  for buffer in buffers):
+		return buffers[0], [0] * len(buffers)
+	result = typedlist(dtype=dtype, reserve=sum(map(len, buffers)))  if dtype else []
+	offsets = []
+	for buffer in buffers:
+		offsets.append(len(result))
+		result.extend(buffer)
+	return result, offsets
+
+def concatenate_indices(buffers, dtype, offsets) -> typedlist:
+	''' Concatenate typedlists of indices into a new one, each shifted by the matching offset '''
+	result = typedlist(dtype=dtype, reserve=sum(map(len, buffers)))
+	for buffer in buffers:
+		result.extend(buffer)
+	view = typedlist_view(result)
+	if len(view):
+		view += np.repeat(
+				np.asarray(offsets, dtype=view.dtype), 
+				[len(buffer)  for buffer in buffers],
+				).reshape(-1, *[1]*(view.ndim-1))
+	return result
+
 def striplist(points, indices):
-	used = [False] * len(points)
-	for index in indices:
-		if isinstance(index, int):	
-			used[index] = True
-		else:
-			for p in index:
-				used[p] = True
-	optimized = typedlist(dtype=points.dtype)  if isinstance(points, typedlist) else []
-	reindices = typedlist(dtype=indices.dtype)
-	reindex = typedlist(dtype='i', reserve=len(points))
-	for p, u in zip(points, used):
-		if u:
-			reindex.append(len(optimized))
-			optimized.append(p)
-		else:
-			reindex.append(-1)
-	for index in indices:
-		if isinstance(index, int):	
-			reindices.append(reindex[index])
-		else:
-			reindices.append([reindex[i]   for i in index])
-	return optimized, reindices, reindex
+	''' Remove the points that are not used by the given indices.
+	
+		Return `(optimized, reindices, reindex)` with the used points, the indices renumbered accordingly, and the reindex table giving the new index of each old point or -1 if removed.
+		The given buffers are not modified, since they can be shared with other meshes.
+	'''
+	if isinstance(indices, typedlist):
+		view = typedlist_view(indices)
+	else:
+		view = np.asarray(indices, dtype=np.int64)
+	used = np.zeros(len(points), bool)
+	used[view.ravel()] = True
+	reindex = np.cumsum(used, dtype=np.int32) - 1
+	reindex[~used] = -1
+	
+	if isinstance(points, typedlist):
+		optimized = typedlist(np.asarray(points)[used], points.dtype)
+	else:
+		optimized = list(compress(points, used.tolist()))
+	if isinstance(indices, typedlist):
+		reindices = typedlist(np.array(np.asarray(indices)), indices.dtype)
+		typedlist_view(reindices)[:] = reindex[view]
+	else:
+		reindices = reindex[view].tolist()
+	return optimized, reindices, typedlist(reindex, 'i')
@@ -21,9 +21,7 @@ def mesh(*arg, resolution=None) -> Mesh:
 	elif hasattr(arg, 'mesh'):
 		return mesh(arg.mesh(resolution=resolution))
 	elif hasattr(arg, '__iter__'):
-		pool = Mesh()
-		for primitive in arg:
-			pool += mesh(primitive, resolution=resolution)
+		pool = Mesh.concatenate(mesh(primitive, resolution=resolution)  for primitive in arg)
 		pool.mergeclose()
 		return pool
 	else:
@@ -57,9 +55,7 @@ def web(*arg, resolution=None) -> Web:
 	elif isinstance(arg, (typedlist,list,tuple)) and isinstance(arg[0], vec3):
 		return Web(arg, [(i,i+1) for i in range(len(arg)-1)])
 	elif hasattr(arg, '__iter__'):
-		pool = Web()
-		for primitive in arg:
-			pool += web(primitive, resolution=resolution)
+		pool = Web.concatenate(web(primitive, resolution=resolution)  for primitive in arg)
 		pool.mergeclose()
 		return pool
 	else:
@@ -1,6 +1,7 @@
 from .container import *
 from .web import Web
 from .wire import Wire
+from .topology import Topology
 
 
 class Mesh(NMesh):
@@ -18,7 +19,7 @@ class Mesh(NMesh):
 			groups:     custom information for each group
 			options:	custom informations for the entire mesh
 	'''
-	__slots__ = 'points', 'faces', 'tracks', 'groups', 'options'
+	__slots__ = 'points', 'faces', 'tracks', 'groups', 'options', '_cache', '_changes'
 	
 	# BEGIN --- special methods ---
 	
@@ -32,35 +33,47 @@ class Mesh(NMesh):
 	def __add__(self, other):
 		''' return a new mesh concatenating the faces and points of both meshes '''
 		if isinstance(other, Mesh):
-			r = Mesh(
-				self.points if self.points is other.points else self.points[:], 
-				self.faces[:], 
-				self.tracks[:], 
-				self.groups if self.groups is other.groups else self.groups[:],
-				)
-			r.__iadd__(other)
-			return r
+			return Mesh.concatenate((self, other), share=True)
 		else:
 			return NotImplemented
 			
 	def __iadd__(self, other):
 		''' append the faces and points of the other mesh '''
 		if isinstance(other, Mesh):		
-			if self.points is other.points:
-				self.faces.extend(other.faces)
-			else:
+			lf = len(self.faces)
+			self.faces.extend(other.faces)
+			if self.points is not other.points:
 				lp = len(self.points)
 				self.points.extend(other.points)
-				self.faces.extend(f+lp  for f in other.faces)
-			if self.groups is other.groups:
-				self.tracks.extend(other.tracks)
-			else:
+				typedlist_view(self.faces)[lf:] += lp
+				self.touch('points', lp)
+			if self.groups is not other.groups:
 				lt = len(self.groups)
 				self.groups.extend(other.groups)
-				self.tracks.extend(track+lt  for track in other.tracks)
+				self.tracks.extend(other.tracks)
+				typedlist_view(self.tracks)[lf:] += lt
+			else:
+				self.tracks.extend(other.tracks)
+			self.touch('faces', lf)
+			self.touch('tracks', lf)
 			return self
 		else:
 			return NotImplemented
+	
+	@classmethod
+	def concatenate(cls, meshes, share=False) -> 'Mesh':
+		''' return a new mesh concatenating the faces and points of all the given meshes, as their sum would do but allocating the buffers only once.
+			The points and groups are always new buffers, unless `share` is True and all the meshes share them, like their sum does.
+		'''
+		meshes = list(meshes)
+		points, pointoffsets = concatenate_buffers([m.points  for m in meshes], vec3, share)
+		groups, groupoffsets = concatenate_buffers([m.groups  for m in meshes], share=share)
+		return cls(
+			points, 
+			concatenate_indices([m.faces  for m in meshes], uvec3, pointoffsets), 
+			concatenate_indices([m.tracks  for m in meshes], 'I', groupoffsets), 
+			groups,
+			)
 		
 	# END BEGIN --- data management ---
 	
@@ -71,26 +84,26 @@ class Mesh(NMesh):
 			return a table of the reindex made
 		'''
 		self.points, self.faces, reindex = striplist(self.points, self.faces)
+		self.touch('points')
+		self.touch('faces')
 		return reindex
 	
 	def mergepoints(self, merges) -> 'self':
 		''' merge points with the merge dictionnary {src index: dst index}
 			merged points are not removed from the buffer.
 		'''
-		j = 0
-		for i,f in enumerate(self.faces):
-			f = uvec3(
-				merges.get(f[0], f[0]),
-				merges.get(f[1], f[1]),
-				merges.get(f[2], f[2]),
-				)
-			if not (f[0] == f[1] or f[1] == f[2] or f[2] == f[0]):
-				self.faces[j] = f
-				self.tracks[j] = self.tracks[i]
-				j += 1
-		del self.faces[j:]
-		del self.tracks[j:]
+		l = len(self.faces)
+		mergesimplices(self.faces, self.tracks, merges, len(self.points))
+		self.touch('faces', 0, l)
+		self.touch('tracks', 0, l)
 		return self
+	
+	def arrays(self) -> tuple:
+		''' Return `(points, faces, tracks)` as numpy arrays sharing the memory of the mesh buffers, of shapes (n,3) float64, (m,3) uint32 and (m,) uint32.
+		
+			As for `typedlist_view`, they are invalidated when the buffers are reallocated, so they must only be kept for immediate use.
+		'''
+		return typedlist_view(self.points), typedlist_view(self.faces), typedlist_view(self.tracks)
 					
 					
 	# END BEGIN ---- mesh checks -----
@@ -99,32 +112,36 @@ class Mesh(NMesh):
 		''' return True if the mesh is a well defined surface (an edge has 2 connected triangles at maximum, with consistent normals)
 			such meshes are usually called 'manifold'
 		''' 
-		reached = set()
-		for face in self.faces:
-			for e in ((face[0], face[1]), (face[1], face[2]), (face[2],face[0])):
-				if e in reached:	return False
-				else:				reached.add(e)
-		return True
+		return len(self.topology().duplicates()) == 0
 	
 	def isenvelope(self):
 		''' return True if the surfaces are a closed envelope (the outline is empty)
 		'''
 		return len(self.outlines_oriented()) == 0
 	
+	def validate(self, checks=None) -> dict:
+		''' Return a report of the inconsistencies and defects of the mesh data, as a dictionnary of arrays of faulty point or face indices. See `validate_buffers` for the available checks. '''
+		return validate_buffers(self.points, self.faces, self.tracks, self.groups, checks)
+	
 	def check(self):
 		''' raise if the internal data is inconsistent '''
 		if not (isinstance(self.points, typedlist) and self.points.dtype == vec3):	raise MeshError("points must be a typedlist(dtype=vec3)")
 		if not (isinstance(self.faces, typedlist) and self.faces.dtype == uvec3): 	raise MeshError("faces must be a typedlist(dtype=uvec3)")
 		if not (isinstance(self.tracks, typedlist) and self.tracks.dtype == 'I'): 	raise MeshError("tracks must be a typedlist(dtype='I')")
-		l = len(self.points)
-		for face in self.faces:
-			for p in face:
-				if p >= l:	raise MeshError("some point indices are greater than the number of points", face, l)
-			if face[0] == face[1] or face[1] == face[2] or face[2] == face[0]:	raise MeshError("some faces use the same point multiple times", face)
+		report = self.validate(('indices', 'degenerated', 'tracks'))
+		if len(report['indices']):	raise MeshError("some point indices are greater than the number of points", self.faces[report['indices'][0]], len(self.points))
+		if len(report['degenerated']):	raise MeshError("some faces use the same point multiple times", self.faces[report['degenerated'][0]])
 		if len(self.faces) != len(self.tracks):	raise MeshError("tracks list doesn't match faces list length")
-		if max(self.tracks, default=-1) >= len(self.groups): raise MeshError("some face group indices are greater than the number of groups", max(self.tracks, default=-1), len(self.groups))
+		if len(report['tracks']): raise MeshError("some face group indices are greater than the number of groups", max(self.tracks), len(self.groups))
 	
 
+	def topology(self) -> Topology:
+		''' Return the `Topology` of the faces, giving array-based connectivity queries.
+			It is built at each call, unless the changes are tracked (see `track`): it is then kept until the faces change, and extended instead of rebuilt when faces were only appended.
+		'''
+		return self._cached('topology', lambda: Topology(self.faces), 'faces', 
+				update=lambda topology, appended: topology.extend(self.faces[appended['faces']]))
+	
 	# END BEGIN --- selection methods ---
 	
 	def groupnear(self, point) -> int:
@@ -133,8 +150,7 @@ class Mesh(NMesh):
 		
 	def facenear(self, point) -> int:
 		''' return the index of the closest triangle to the given point '''
-		return min(	range(len(self.faces)), 
-					key=lambda i: distance_pt(point, self.facepoints(i)) )
+		return self._searchtree().nearest(point)[0]
 	
 	def group(self, quals) -> 'Self':
 		''' extract a part of the mesh corresponding to the designated groups.
@@ -159,27 +175,40 @@ class Mesh(NMesh):
 				>>> mesh.group(['extrusion', 'arc'])   
 				<Mesh ...>
 		'''
-		faces = typedlist(dtype=uvec3)
-		tracks = typedlist(dtype='I')
-		for i in self.qualified_indices(quals):
-			faces.append(self.faces[i])
-			tracks.append(self.tracks[i])
-		return Mesh(self.points, faces, tracks, self.groups)
+		return self.filter(self.qualified_mask(quals))
+	
+	def filter(self, selection) -> 'Self':
+		''' extract the faces designated by `selection`, sharing the points and groups with the current mesh.
+		
+			`selection` can be a boolean mask with one value per face, or an iterable of face indices
+			
+			Example:
+			
+				>>> # keep only the faces facing upward
+				>>> mesh.filter(typedlist_view(mesh.facenormals())[:,2] > 0)
+				<Mesh ...>
+		'''
+		selection = selection_mask(selection, len(self.faces))
+		return Mesh(self.points, 
+			numpy_to_typedlist(typedlist_view(self.faces)[selection], uvec3), 
+			typedlist(typedlist_view(self.tracks)[selection], 'I'), 
+			self.groups)
 		
 	def replace(self, mesh, groups=None) -> 'self':
 		''' replace the given groups by the given mesh.
 			If groups is not specified, it will take the matching groups (with same index) in the current mesh
 		'''
 		if groups:
-			groups = set(self.qualified_groups(groups))
+			groups = np.fromiter(self.qualified_groups(groups), np.int64)
 		else:
-			groups = set(mesh.tracks)
-		j = 0
-		for i,t in enumerate(self.tracks):
-			if t not in groups:
-				self.faces[j] = self.faces[i]
-				self.tracks[j] = t
-				j += 1
+			groups = np.unique(typedlist_view(mesh.tracks))
+		simplices, tracks = typedlist_view(self.faces), typedlist_view(self.tracks)
+		keep = ~np.isin(tracks, groups)
+		j = int(np.count_nonzero(keep))
+		simplices[:j] = simplices[keep]
+		tracks[:j] = tracks[keep]
+		self.touch('faces', 0, len(self.faces))
+		self.touch('tracks', 0, len(self.tracks))
 		del self.faces[j:]
 		del self.tracks[j:]
 		self += mesh
@@ -205,7 +234,8 @@ class Mesh(NMesh):
 	
 	def facenormals(self) -> '[vec3]':
 		''' list normals for each face '''
-		return typedlist(map(self.facenormal, self.faces), vec3)
+		points, faces, _ = self.arrays()
+		return typedlist(_facenormals(points[faces]), vec3)
 	
 	def edgenormals(self) -> '{uvec2: vec3}':
 		''' dict of normals for each UNORIENTED edge '''
@@ -222,37 +252,42 @@ class Mesh(NMesh):
 		
 	def vertexnormals(self) -> '[vec3]':
 		''' list of normals for each point '''
-		
-		# collect the mesh border as edges and as points
-		outline = self.outlines_oriented()
-		border = set()
-		for a,b in outline:
-			border.add(a)
-			border.add(b)
-		
-		# sum contributions to normals
-		l = len(self.points)
-		normals = typedlist.full(vec3(0), l)
-		for face in self.faces:
-			normal = self.facenormal(face)
-			if not isfinite(normal):	continue
-			for i in range(3):
-				o = self.points[face[i]]
-				# point on the surface
-				if face[i] not in border:
-					# triangle normals are weighted by their angle at the point
-					contrib = anglebt(self.points[face[i-2]]-o, self.points[face[i-1]]-o)
-					normals[face[i]] += contrib * normal
-				# point on the outline
-				elif (face[i], face[i-1]) in outline:
-					# only the triangle creating the edge does determine its normal
-					normals[face[i]] += normal
-					normals[face[i-1]] += normal
-		
-		for i in range(l):
-			normals[i] = normalize(normals[i])
-		assert len(normals) == len(self.points)
-		return normals
+		topology = self.topology()
+		faces = topology.faces
+		corners = typedlist_view(self.points)[faces]
+		normals = _facenormals(corners)
+		finite = np.isfinite(normals).all(axis=1)
+		
+		# collect the mesh border as half-edges and as points, half-edge k of a face goes from its corner k to k+1
+		# every copy of a duplicated half-edge is on the outline when one of them is
+		keys = topology.origins()*topology.size + topology.destinations()
+		outline = np.isin(keys, keys[topology.borders()]).reshape(-1,3)
+		border = np.zeros(len(self.points), bool)
+		border[faces[outline]] = True
+		border[faces[:,[1,2,0]][outline]] = True
+		
+		# contributions of each face corner to its point and to the previous point
+		indices = np.empty((len(faces),3,2), np.int64)
+		contribs = np.zeros((len(faces),3,2,3))
+		used = np.zeros((len(faces),3,2), bool)
+		for i in range(3):
+			o = corners[:,i]
+			indices[:,i,0] = faces[:,i]
+			indices[:,i,1] = faces[:,i-1]
+			# point on the surface: triangle normals are weighted by their angle at the point
+			inner = finite & ~border[faces[:,i]]
+			contribs[inner,i,0] = _anglebt(corners[inner,i-2]-o[inner], corners[inner,i-1]-o[inner])[:,None] * normals[inner]
+			used[inner,i,0] = True
+			# point on the outline: only the triangle creating the edge does determine its normal
+			edge = finite & border[faces[:,i]] & outline[:,i-1]
+			contribs[edge,i] = normals[edge,None]
+			used[edge,i] = True
+		
+		# sum contributions to normals, in the same order as the faces
+		indices = indices[used]
+		contribs = contribs[used]
+		sums = np.stack([np.bincount(indices, contribs[:,k], minlength=len(self.points))  for k in range(3)], axis=1)
+		return typedlist(_normalize(sums), vec3)
 		
 	def tangents(self) -> '{int: vec3}':
 		''' tangents to outline points '''
@@ -278,12 +313,8 @@ class Mesh(NMesh):
 	
 	def edges(self) -> set:
 		''' set of UNORIENTED edges present in the mesh '''
-		edges = set()
-		for face in self.faces:
-			edges.add(edgekey(face[0], face[1]))
-			edges.add(edgekey(face[1], face[2]))
-			edges.add(edgekey(face[2], face[0]))
-		return edges
+		edges = self.topology().edges()
+		return set(zip(edges[:,0].tolist(), edges[:,1].tolist()))
 	
 	def edges_oriented(self) -> set:
 		''' iterator of ORIENTED edges, directly retreived of each face '''
@@ -294,24 +325,21 @@ class Mesh(NMesh):
 	
 	def outlines_oriented(self) -> set:
 		''' return a set of the ORIENTED edges delimiting the surfaces of the mesh '''
-		edges = set()
-		for face in self.faces:
-			for e in ((face[0], face[1]), (face[1], face[2]), (face[2],face[0])):
-				if e in edges:	edges.remove(e)
-				else:			edges.add((e[1], e[0]))
-		return edges
+		topology = self.topology()
+		borders = topology.borders()
+		return set(zip(topology.destinations(borders).tolist(), topology.origins(borders).tolist()))
 	
 	def outlines_unoriented(self) -> set:
 		''' return a set of the UNORIENTED edges delimiting the surfaces of the mesh 
 			this method is robust to face orientation aberations
 		'''
-		edges = set()
-		for face in self.faces:
-			for edge in ((face[0],face[1]),(face[1],face[2]),(face[2],face[0])):
-				e = edgekey(*edge)
-				if e in edges:	edges.remove(e)
-				else:			edges.add(e)
-		return edges
+		topology = self.topology()
+		origins, destinations = topology.origins(), topology.destinations()
+		size = max(topology.size, 1)
+		# edges used an odd number of times
+		keys, counts = np.unique(np.minimum(origins, destinations)*size + np.maximum(origins, destinations), return_counts=True)
+		keys = keys[counts % 2 == 1]
+		return set(zip((keys // size).tolist(), (keys % size).tolist()))
 	
 	def outlines(self) -> 'Web':
 		''' return a Web of ORIENTED edges '''
@@ -322,22 +350,22 @@ class Mesh(NMesh):
 			
 			On a frontier between multiple groups, there is as many edges as groups, each associated to a group.
 		'''
-		edges = typedlist(dtype=uvec2)		# outline
-		tracks = typedlist(dtype='I')		# groups for edges
-
-		tmp = {}	# faces adjacent to edges
-		for i,face in enumerate(self.faces):
-			for e in ((face[1],face[0]),(face[2],face[1]),(face[0],face[2])):
-				track = self.tracks[i]
-				if e in tmp:
-					if tmp[e] != track:
-						edges.append(e)
-						tracks.append(track)
-					del tmp[e]
-				else:
-					tmp[(e[1],e[0])] = track
-		edges.extend(tmp.keys())
-		tracks.extend(tmp.values())
+		topology = self.topology()
+		halfedges = np.arange(len(topology))
+		twins = topology.twins
+		tracks = np.repeat(typedlist_view(self.tracks), 3)
+		paired = twins >= 0
+		# frontiers are reported once, by the half-edge of the latter face, with the group of that face
+		frontier = paired & (twins < halfedges)
+		frontier[frontier] = tracks[frontier] != tracks[twins[frontier]]
+		border = ~paired
+		
+		edges = np.concatenate([
+			np.stack([topology.destinations(frontier), topology.origins(frontier)], axis=1),
+			np.stack([topology.origins(border), topology.destinations(border)], axis=1),
+			])
+		edges = numpy_to_typedlist(edges.astype('u4'), uvec2)
+		tracks = typedlist(np.concatenate([tracks[frontier], tracks[border]]).astype('u4'), 'I')
 		return Web(self.points, edges, tracks, self.groups)
 		
 	def frontiers(self, *args) -> 'Web':
@@ -371,67 +399,101 @@ class Mesh(NMesh):
 		else:
 			groups = None
 		
-		edges = typedlist(dtype=uvec2)
-		tracks = typedlist(dtype='I')
-		couples = OrderedDict()
-		belong = {}
-		for i,face in enumerate(self.faces):
-			track = self.tracks[i]
-			if groups is None or None in groups or track in groups:
-				for i in range(len(face)):
-					e = edgekey(face[i-1], face[i])
-					if e in belong:
-						if belong[e] != track and (groups is None or track in groups and belong[e] in groups):
-							g = edgekey(belong[e],track)
-							edges.append(e)
-							tracks.append(couples.setdefault(g, len(couples)))
-						del belong[e]
-					else:
-						belong[e] = track
+		topology = self.topology()
+		size = max(topology.size, 1)
+		tracks = typedlist_view(self.tracks).astype(np.int64)
+		if groups is None or None in groups:
+			halfedges = np.arange(len(topology))
+		else:
+			halfedges = np.flatnonzero(np.repeat(np.isin(tracks, list(groups)), 3))
+		origins, destinations = topology.origins(halfedges), topology.destinations(halfedges)
+		keys = np.minimum(origins, destinations)*size + np.maximum(origins, destinations)
+		tracks = tracks[halfedges // 3]
+		
+		# the successive occurences of an unoriented edge are paired two by two
+		order = np.argsort(keys, kind='stable')
+		sortedkeys = keys[order]
+		starts = np.ones(len(sortedkeys), bool)
+		starts[1:] = sortedkeys[1:] != sortedkeys[:-1]
+		rank = np.arange(len(sortedkeys)) - np.maximum.accumulate(np.where(starts, np.arange(len(sortedkeys)), 0))
+		last = np.ones(len(sortedkeys), bool)
+		last[:-1] = starts[1:]
+		# frontiers are reported by the second occurence of the pair
+		second = order[rank % 2 == 1]
+		first = order[np.flatnonzero(rank % 2 == 1) - 1]
+		select = tracks[first] != tracks[second]
+		if groups is not None:
+			selected = np.isin(tracks, [g  for g in groups if g is not None])
+			select &= selected[first] & selected[second]
+		second, first = second[select], first[select]
+		# occurences left without pair are on the border of the selected groups
 		if groups and None in groups:
-			for e, i in belong.items():
-				if i in groups:
-					g = (i,None)
-					edges.append(e)
-					tracks.append(couples.setdefault(g, len(couples)))
-		return Web(self.points, edges, tracks, list(couples))
+			alone = order[(rank % 2 == 0) & last]
+			alone = alone[selected[alone]]
+		else:
+			alone = np.empty(0, np.int64)
+		# report edges in the order of the faces, each face enumerating its edges starting from the last
+		position = halfedges//3*3 + (halfedges%3 + 1)%3
+		reorder = np.argsort(position[second])
+		second, first = second[reorder], first[reorder]
+		alone = alone[np.argsort(position[alone])]
+		
+		# number the couples of groups by order of appearance
+		ngroups = int(tracks.max())+2 if len(tracks) else 1
+		couples = np.concatenate([
+			np.minimum(tracks[first], tracks[second]) * ngroups + np.maximum(tracks[first], tracks[second]),
+			tracks[alone] * ngroups + ngroups-1,
+			])
+		unique, index, inverse = np.unique(couples, return_index=True, return_inverse=True)
+		numbers = np.empty(len(unique), np.int64)
+		numbers[np.argsort(index)] = np.arange(len(unique))
+		couples = [(a, b if b != ngroups-1 else None)  
+					for a, b in zip(*(x.tolist() for x in divmod(couples[np.sort(index)], ngroups)))]
+		
+		reported = np.concatenate([keys[second], keys[alone]])
+		edges = numpy_to_typedlist(np.stack([reported // size, reported % size], axis=1).astype('u4'), uvec2)
+		tracks = typedlist(numbers[inverse].astype('u4'), 'I')
+		return Web(self.points, edges, tracks, couples)
 	
 	def surface(self) -> float:
 		''' total surface of triangles '''
-		s = 0
-		for f in self.faces:
-			a,b,c = self.facepoints(f)
-			s += length(cross(a-b, a-c))
-		return s /2
+		points, faces, _ = self.arrays()
+		a, b, c = np.moveaxis(points[faces], 1, 0)
+		return float(np.linalg.norm(np.cross(a-b, a-c), axis=1).sum()) /2
 		
 	def volume(self) -> float:
 		''' return the volume enclosed by the mesh if composed of envelopes (else it has no meaning) '''
-		o = self.barycenter()
-		s = 0
-		for f in self.faces:
-			a,b,c = self.facepoints(f)
-			s += glm.determinant(mat3(a-o, b-o, c-o))
-		return s /6
+		if not self.faces:
+			return 0.
+		points, faces, _ = self.arrays()
+		a, b, c = np.moveaxis(points[faces] - self.barycenter(), 1, 0)
+		return float(np.einsum('ij,ij->', a, np.cross(b, c))) /6
 	
 	def barycenter(self) -> vec3:
 		''' surface barycenter of the mesh '''
 		if not self.faces:	
 			return None
-		acc = vec3(0)
-		tot = 0
-		for f in self.faces:
-			a,b,c = self.facepoints(f)
-			weight = length(cross(b-a, c-a))
-			tot += weight
-			acc += weight*(a+b+c)
-		return acc / (3*tot)
+		points, faces, _ = self.arrays()
+		a, b, c = np.moveaxis(points[faces], 1, 0)
+		weights = np.linalg.norm(np.cross(b-a, c-a), axis=1)
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return vec3(*(weights @ (a+b+c)) / (3*weights.sum()))
 			
 	def propagate(self, atface, atisland=None, find=None, conn=None):
-		''' return the unconnected parts of the mesh as several meshes '''
-		if not conn:	
-			conn = connef(self.faces)
+		''' propagate over the faces through their edges, calling `atface(face, reached)` for each reached face and `atisland(reached)` each time no more face can be reached.
+		
+			`find(stack, reached)` can be given to choose where to start each propagation, and `conn` to use a custom connectivity as returned by `connef`
+		'''
 		if not self.faces:
 			return
+		if conn:
+			def neighbors(f):
+				face = self.faces[f]
+				for i in range(3):
+					yield conn.get((face[i], face[i-1]), -1)
+		else:
+			adjacents = self.topology().adjacents()[:,[2,0,1]].tolist()
+			neighbors = adjacents.__getitem__
 		
 		reached = [False] * len(self.faces)	# faces reached
 		stack = []
@@ -456,11 +518,9 @@ class Mesh(NMesh):
 				if reached[i]:	continue	# make sure this face has not been stacked twice
 				reached[i] = True
 				atface(i, reached)
-				f = self.faces[i]
-				for i in range(3):
-					e = f[i],f[i-1]
-					if e in conn and not reached[conn[e]]:
-						stack.append(conn[e])
+				for n in neighbors(i):
+					if n >= 0 and not reached[n]:
+						stack.append(n)
 			if atisland:
 				atisland(reached)
 	
@@ -499,6 +559,8 @@ class Mesh(NMesh):
 		
 		self.points = points
 		self.faces = faces
+		self.touch('points')
+		self.touch('faces')
 		return idents
 		
 	def split(self, edges) -> 'Self':
@@ -506,23 +568,24 @@ class Mesh(NMesh):
 			The points in common with two or more designated edges will be dupliated once or more, and the face indices will be reassigned so that faces each side of the given edges will own a duplicate of that point each.
 		'''
 		# get connectivity and set of edges to manage
-		conn = connef(self.faces)
+		conn = self.topology()
 		edges = set(edgekey(*edge)   for edge in edges)
 		# collect the points to multiply
 		ranks = Counter(p  for e in edges for p in e)
 		separations = set(p  for p, count in ranks.items() if count > 1)
 		newfaces = deepcopy(self.faces)
+		lp = len(self.points)
 		# for each edge, reassign neighboring faces to the proper points
 		for edge in edges:
 			for pivot in edge:
-				if edge in conn and pivot in newfaces[conn[edge]]:
+				if conn.edgeface(*edge) >= 0 and pivot in newfaces[conn.edgeface(*edge)]:
 					dupli = len(self.points)
 					self.points.append(self.points[pivot])
 					
 					# change the point index in every neighbooring face
 					front = edge
-					while front in conn:
-						fi = conn[front]
+					while conn.edgeface(*front) >= 0:
+						fi = conn.edgeface(*front)
 						f = arrangeface(self.faces[fi], pivot)
 						fm = arrangeface(newfaces[fi], pivot)
 						
@@ -539,21 +602,23 @@ class Mesh(NMesh):
 							break
 		
 		self.faces = newfaces
+		self.touch('points', lp)
+		self.touch('faces')
 		return self
 	
 	def islands(self, conn=None) -> '[Mesh]':
 		''' return the unconnected parts of the mesh as several meshes '''
 		islands = []
-		faces = typedlist(dtype=uvec3)
-		tracks = typedlist(dtype='I')
-		def atface(i, reached):
-			faces.append(self.faces[i])
-			tracks.append(self.tracks[i])
+		selection = []
+		faces = typedlist_view(self.faces)
+		tracks = typedlist_view(self.tracks)
 		def atisland(reached):
-			islands.append(Mesh(self.points, deepcopy(faces), deepcopy(tracks), self.groups))
-			faces.clear()
-			tracks.clear()
-		self.propagate(atface, atisland, conn=conn)
+			islands.append(Mesh(self.points, 
+				numpy_to_typedlist(faces[selection], uvec3), 
+				typedlist(tracks[selection], 'I'), 
+				self.groups))
+			selection.clear()
+		self.propagate(lambda i, reached: selection.append(i), atisland, conn=conn)
 		return islands
 	
 	def flip(self) -> 'Self':
@@ -628,28 +693,37 @@ class Mesh(NMesh):
 						# propagate
 						stack.append(n)
 		
+		self.touch('faces')
 		return self
 	
 	# END BEGIN ----- output methods ------
 	
-	def display(self, scene):
-		from .. import displays
+	def display_buffers(self) -> dict:
+		''' Prepare the buffers needed to display the mesh: points are duplicated on the sharp edges and on the group frontiers, so each has one normal.
 		
+			Return a dictionnary of numpy arrays with keys `points, normals, faces, edges, idents`, or None if there is nothing to display
+		'''
 		m = self.own(points=True)
 		
 		m.split(m.frontiers().edges)
 		edges = m.outlines().edges
 		
 		# select edges above a threshold
-		tosplit = []
 		thresh = cos(settings.display['sharp_angle'])
-		conn = connef(m.faces)
-		for edge, f1 in conn.items():
-			if edge[1] > edge[0]:	continue
-			f2 = conn.get((edge[1],edge[0]))
-			if f2 is None:	continue
-			if m.tracks[f1] != m.tracks[f2] or dot(m.facenormal(f1), m.facenormal(f2)) <= thresh:
-				tosplit.append(edge)
+		topology = m.topology()
+		# as in `connef`, each oriented edge is taken once with its last face
+		origins, destinations = topology.origins(), topology.destinations()
+		halfedges = np.arange(len(topology))
+		opposites = topology.find(destinations, origins)
+		halfedges = halfedges[(opposites >= 0) & (origins > destinations) & (topology.find(origins, destinations) == halfedges)]
+		f1, f2 = halfedges // 3, opposites[halfedges] // 3
+		tracks = typedlist_view(m.tracks)
+		points = typedlist_view(m.points)[topology.faces]
+		normals = np.cross(points[:,1]-points[:,0], points[:,2]-points[:,0])
+		with np.errstate(invalid='ignore', divide='ignore'):
+			normals /= np.linalg.norm(normals, axis=1)[:,None]
+		sharp = (tracks[f1] != tracks[f2]) | ((normals[f1] * normals[f2]).sum(axis=1) <= thresh)
+		tosplit = np.stack([topology.origins(halfedges[sharp]), topology.destinations(halfedges[sharp])], axis=1).tolist()
 		
 		m.split(tosplit)
 		
@@ -662,14 +736,29 @@ class Mesh(NMesh):
 		normals = m.vertexnormals()
 		
 		if not m.points or not m.faces:	
+			return None
+		
+		return dict(
+				points = typedlist_to_numpy(m.points, 'f4'), 
+				normals = typedlist_to_numpy(normals, 'f4'), 
+				faces = typedlist_to_numpy(m.faces, 'u4'),
+				edges = typedlist_to_numpy(edges, 'u4'),
+				idents = typedlist_to_numpy(idents, 'u4'),
+				)
+	
+	def display(self, scene):
+		from .. import displays
+		
+		buffers = self.display_buffers()
+		if buffers is None:
 			return displays.Display()
 		
 		return displays.SolidDisplay(scene, 
-				typedlist_to_numpy(m.points, 'f4'), 
-				typedlist_to_numpy(normals, 'f4'), 
-				typedlist_to_numpy(m.faces, 'u4'),
-				typedlist_to_numpy(edges, 'u4'),
-				typedlist_to_numpy(idents, 'u4'),
+				buffers['points'], 
+				buffers['normals'], 
+				buffers['faces'],
+				buffers['edges'],
+				buffers['idents'],
 				color = self.options.get('color'),
 				)
 	
@@ -695,6 +784,8 @@ def mktri(mesh, pts, track=0):
 	''' append a triangle '''
 	mesh.faces.append(pts)
 	mesh.tracks.append(track)
+	mesh.touch('faces', len(mesh.faces)-1)
+	mesh.touch('tracks', len(mesh.tracks)-1)
 
 def mkquad(mesh, pts, track=0):
 	''' append a quad, choosing the best diagonal '''
@@ -707,3 +798,21 @@ def mkquad(mesh, pts, track=0):
 		mesh.faces.append((pts[2], pts[3], pts[1]))
 	mesh.tracks.append(track)
 	mesh.tracks.append(track)
+	mesh.touch('faces', len(mesh.faces)-2)
+	mesh.touch('tracks', len(mesh.tracks)-2)
+
+
+def _normalize(vectors: 'ndarray') -> 'ndarray':
+	''' normalize the (n,3) array of vectors the same way `glm.normalize` does '''
+	with np.errstate(invalid='ignore', divide='ignore'):
+		return vectors * (1 / np.sqrt(np.einsum('ij,ij->i', vectors, vectors)))[:,None]
+
+def _facenormals(corners: 'ndarray') -> 'ndarray':
+	''' normals of the faces given by the (n,3,3) array of their corners '''
+	return _normalize(np.cross(corners[:,1]-corners[:,0], corners[:,2]-corners[:,0]))
+
+def _anglebt(x: 'ndarray', y: 'ndarray') -> 'ndarray':
+	''' `anglebt` for (n,3) arrays of vectors '''
+	n = np.sqrt(np.einsum('ij,ij->i', x, x)) * np.sqrt(np.einsum('ij,ij->i', y, y))
+	with np.errstate(invalid='ignore', divide='ignore'):
+		return np.where(n != 0, np.arccos(np.clip(np.einsum('ij,ij->i', x, y)/n, -1, 1)), 0)
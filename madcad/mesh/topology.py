@@ -0,0 +1,144 @@
+# This file is part of pymadcad,  distributed under license LGPL v3
+
+import numpy as np
+
+from .container import typedlist_view, ensure_typedlist
+from ..mathutils import uvec3
+
+
+class Topology:
+	''' Array-backed connectivity of a triangle mesh, based on half-edges.
+
+		The half-edge `3*f+k` goes from point `faces[f,k]` to point `faces[f,(k+1)%3]`, so it needs not be stored. All the connectivity queries are then answered using sorted arrays of half-edges instead of dictionnaries of tuples.
+
+		This structure is not meant to be modified, it is usually obtained from `Mesh.topology()`, which keeps it until the mesh faces change when the mesh changes are tracked.
+
+		Attributes:
+			faces (ndarray):   (n,3) array of the face indices
+			keys (ndarray):    sorted keys of the half-edges, `origin*size + destination`
+			order (ndarray):   half-edges sorted by their key, such as `keys` is `key(order)`
+			offsets (ndarray): offsets in `order` of the half-edges starting from each point (CSR layout), so the half-edges starting from point `p` are `order[offsets[p]:offsets[p+1]]`
+			twins (ndarray):   for each half-edge, the opposite half-edge or -1 if there is none. Duplicated half-edges are paired one to one with the opposite ones in the order of the faces, so the copies left without opposite are borders
+			size (int):        the number of points indexed, and factor for the keys
+	'''
+	__slots__ = 'faces', 'keys', 'order', 'offsets', 'twins', 'size'
+
+	def __init__(self, faces):
+		if not isinstance(faces, np.ndarray):
+			faces = typedlist_view(ensure_typedlist(faces, uvec3))
+		self.faces = faces = np.asarray(faces, dtype=np.int64).reshape(-1,3)
+		self.size = size = int(faces.max())+1 if len(faces) else 0
+
+		origins = faces.ravel()
+		destinations = faces[:,[1,2,0]].ravel()
+		keys = origins*size + destinations
+		# stable sort, so among duplicated half-edges the last one is from the last face
+		self.order = np.argsort(keys, kind='stable').astype(np.int32)
+		self.keys = keys[self.order]
+		self.offsets = np.searchsorted(self.keys, np.arange(size+1, dtype=np.int64)*size).astype(np.int32)
+		self.twins = np.empty(len(keys), np.int32)
+		self.twins[self.order] = self._pair(np.arange(len(keys)))
+
+	def extend(self, faces) -> 'Topology':
+		''' Return the topology of the current faces followed by the given ones, without sorting again the current half-edges.
+			The current topology is left untouched.
+		'''
+		if not isinstance(faces, np.ndarray):
+			faces = typedlist_view(ensure_typedlist(faces, uvec3))
+		faces = np.asarray(faces, dtype=np.int64).reshape(-1,3)
+		new = object.__new__(type(self))
+		new.faces = np.concatenate([self.faces, faces])
+		new.size = size = max(self.size, int(faces.max())+1 if len(faces) else 0)
+
+		# the current keys keep their order when the size grows
+		keys = self.keys
+		if size != self.size:
+			keys = keys // self.size * size + keys % self.size
+		origins = faces.ravel()
+		destinations = faces[:,[1,2,0]].ravel()
+		added = origins*size + destinations
+		order = np.argsort(added, kind='stable')
+		# the appended half-edges come after the current ones with the same key, as in a stable sort
+		positions = np.searchsorted(keys, added[order], 'right')
+		new.keys = np.insert(keys, positions, added[order])
+		new.order = np.insert(self.order, positions, (order + len(self.order)).astype(np.int32))
+		new.offsets = np.searchsorted(new.keys, np.arange(size+1, dtype=np.int64)*size).astype(np.int32)
+
+		# only the half-edges sharing an unoriented edge with appended ones can get a different twin
+		changed = np.unique(np.concatenate([added, destinations*size + origins]))
+		starts = np.searchsorted(new.keys, changed, 'left')
+		counts = np.searchsorted(new.keys, changed, 'right') - starts
+		positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+		new.twins = np.concatenate([self.twins, np.full(len(added), -1, np.int32)])
+		new.twins[new.order[positions]] = new._pair(positions)
+		return new
+
+	def _pair(self, positions) -> 'ndarray':
+		''' opposite half-edges of the half-edges at the given positions in `order`. The k-th copy of a half-edge is paired with the k-th copy of its opposite, and a degenerated half-edge with the next or previous copy of itself '''
+		keys = self.keys[positions]
+		origins, destinations = keys // self.size, keys % self.size
+		rank = positions - np.searchsorted(self.keys, keys, 'left')
+		rank = np.where(origins == destinations, rank ^ 1, rank)
+		opposite = destinations*self.size + origins
+		start = np.searchsorted(self.keys, opposite, 'left')
+		found = rank < np.searchsorted(self.keys, opposite, 'right') - start
+		return np.where(found, self.order[np.where(found, start + rank, 0)], -1).astype(np.int32)
+
+	def __len__(self):
+		''' number of half-edges '''
+		return len(self.order)
+
+	def origins(self, halfedges=slice(None)) -> 'ndarray':
+		''' origin points of the given half-edges, all by default '''
+		return self.faces.ravel()[halfedges]
+
+	def destinations(self, halfedges=slice(None)) -> 'ndarray':
+		''' destination points of the given half-edges, all by default '''
+		return self.faces[:,[1,2,0]].ravel()[halfedges]
+
+	def find(self, origins, destinations) -> 'ndarray':
+		''' index of the half-edges going from `origins` to `destinations` (arrays of points), -1 where there is none. As in `connef`, the last half-edge is returned if there is duplicates. '''
+		origins = np.asarray(origins, dtype=np.int64)
+		destinations = np.asarray(destinations, dtype=np.int64)
+		if not len(self.keys):
+			return np.full(origins.shape, -1, np.int32)
+		keys = origins*self.size + destinations
+		found = np.maximum(np.searchsorted(self.keys, keys, 'right') - 1, 0)
+		valid = (origins < self.size) & (destinations < self.size) & (self.keys[found] == keys)
+		return np.where(valid, self.order[found], -1).astype(np.int32)
+
+	def edgeface(self, a, b) -> int:
+		''' face having the oriented edge `(a,b)`, or -1 if there is none. This is the equivalent of `connef(faces)[(a,b)]` '''
+		key = a*self.size + b
+		i = int(np.searchsorted(self.keys, key, 'right')) - 1
+		if i >= 0 and a < self.size and b < self.size and self.keys[i] == key:
+			return int(self.order[i]) // 3
+		return -1
+
+	def adjacents(self) -> 'ndarray':
+		''' (n,3) array of the face on the other side of each half-edge, or -1. As in `connef`, the last face is taken when there is several, so unlike `twins` this never leaves a duplicated half-edge alone '''
+		twins = self.find(self.destinations(), self.origins())
+		return np.where(twins >= 0, twins // 3, -1).reshape(-1,3)
+
+	def pointfaces(self, p) -> 'ndarray':
+		''' faces using the point `p` '''
+		if p >= self.size:	return np.empty(0, np.int32)
+		return self.order[self.offsets[p]:self.offsets[p+1]] // 3
+
+	def duplicates(self) -> 'ndarray':
+		''' half-edges that have the same origin and destination as an other half-edge before them '''
+		repeat = np.empty(len(self.keys), bool)
+		repeat[:1] = False
+		repeat[1:] = self.keys[1:] == self.keys[:-1]
+		return np.sort(self.order[repeat])
+
+	def borders(self) -> 'ndarray':
+		''' half-edges with no opposite half-edge, so they are on the outline of the surface '''
+		return np.flatnonzero(self.twins < 0)
+
+	def edges(self) -> 'ndarray':
+		''' (m,2) array of the unique UNORIENTED edges, sorted '''
+		origins, destinations = self.origins(), self.destinations()
+		keys = np.sort(np.minimum(origins, destinations)*self.size + np.maximum(origins, destinations))
+		keys = keys[np.concatenate([keys[:1] == keys[:1], keys[1:] != keys[:-1]])]
+		return np.stack([keys // max(self.size,1), keys % max(self.size,1)], axis=1)
@@ -17,7 +17,7 @@ class Web(NMesh):
 			groups:     custom information for each group
 			options:	custom informations for the entire web
 	'''
-	__slots__ = 'points', 'edges', 'tracks', 'groups', 'options'
+	__slots__ = 'points', 'edges', 'tracks', 'groups', 'options', '_cache', '_changes'
 
 	# BEGIN --- special methods ---
 	
@@ -31,35 +31,47 @@ class Web(NMesh):
 	def __add__(self, other):
 		''' return a new mesh concatenating the faces and points of both meshes '''
 		if isinstance(other, Web):
-			r = Web(
-				self.points if self.points is other.points else self.points[:], 
-				self.edges[:], 
-				self.tracks[:], 
-				self.groups if self.groups is other.groups else self.groups[:],
-				)
-			r.__iadd__(other)
-			return r
+			return Web.concatenate((self, other), share=True)
 		else:
 			return NotImplemented
 			
 	def __iadd__(self, other):
 		''' append the faces and points of the other mesh '''
 		if isinstance(other, Web):
-			if self.points is other.points:
-				self.edges.extend(other.edges)
-			else:
+			le = len(self.edges)
+			self.edges.extend(other.edges)
+			if self.points is not other.points:
 				lp = len(self.points)
 				self.points.extend(other.points)
-				self.edges.extend(e+lp  for e in other.edges)
-			if self.groups is other.groups:
-				self.tracks.extend(other.tracks)
-			else:
+				typedlist_view(self.edges)[le:] += lp
+				self.touch('points', lp)
+			if self.groups is not other.groups:
 				lt = len(self.groups)
 				self.groups.extend(other.groups)
-				self.tracks.extend(t+lt   for t in other.tracks)
+				self.tracks.extend(other.tracks)
+				typedlist_view(self.tracks)[le:] += lt
+			else:
+				self.tracks.extend(other.tracks)
+			self.touch('edges', le)
+			self.touch('tracks', le)
 			return self
 		else:
 			return NotImplemented
+	
+	@classmethod
+	def concatenate(cls, webs, share=False) -> 'Web':
+		''' return a new web concatenating the edges and points of all the given webs, as their sum would do but allocating the buffers only once.
+			The points and groups are always new buffers, unless `share` is True and all the webs share them, like their sum does.
+		'''
+		webs = list(webs)
+		points, pointoffsets = concatenate_buffers([w.points  for w in webs], vec3, share)
+		groups, groupoffsets = concatenate_buffers([w.groups  for w in webs], share=share)
+		return cls(
+			points, 
+			concatenate_indices([w.edges  for w in webs], uvec2, pointoffsets), 
+			concatenate_indices([w.tracks  for w in webs], 'I', groupoffsets), 
+			groups,
+			)
 			
 	# END BEGIN ----- data management -----
 	
@@ -70,24 +82,18 @@ class Web(NMesh):
 			return a table of the reindex made
 		'''
 		self.points, self.edges, reindex = striplist(self.points, self.edges)
+		self.touch('points')
+		self.touch('edges')
 		return reindex
 	
 	def mergepoints(self, merges) -> 'self':
 		''' merge points with the merge dictionnary {src index: dst index}
 			merged points are not removed from the buffer.
 		'''
-		j = 0
-		for i,f in enumerate(self.edges):
-			f = uvec2(
-				merges.get(f[0], f[0]),
-				merges.get(f[1], f[1]),
-				)
-			if not f[0] == f[1]:
-				self.edges[j] = f
-				self.tracks[j] = self.tracks[i]
-				j += 1
-		del self.edges[j:]
-		del self.tracks[j:]
+		l = len(self.edges)
+		mergesimplices(self.edges, self.tracks, merges, len(self.points))
+		self.touch('edges', 0, l)
+		self.touch('tracks', 0, l)
 		return self
 			
 	
@@ -106,19 +112,20 @@ class Web(NMesh):
 		''' true if the wire form a loop '''
 		return len(self.extremities()) == 0
 	
+	def validate(self, checks=None) -> dict:
+		''' Return a report of the inconsistencies and defects of the web data, as a dictionnary of arrays of faulty point or edge indices. See `validate_buffers` for the available checks. '''
+		return validate_buffers(self.points, self.edges, self.tracks, self.groups, checks)
+	
 	def check(self):
 		''' check that the internal data references are good (indices and list lengths) '''
 		if not (isinstance(self.points, typedlist) and self.points.dtype == vec3):	raise MeshError("points must be a typedlist(dtype=vec3)")
 		if not (isinstance(self.edges, typedlist) and self.edges.dtype == uvec2): 	raise MeshError("edges must be in a typedlist(dtype=uvec2)")
 		if not (isinstance(self.tracks, typedlist) and self.tracks.dtype == 'I'): 	raise MeshError("tracks must be in a typedlist(dtype='I')")
-		l = len(self.points)
-		for line in self.edges:
-			for p in line:
-				if p >= l:	raise MeshError("some indices are greater than the number of points", line, l)
-				if p < 0:	raise MeshError("point indices must be positive", line)
-			if line[0] == line[1]:	raise MeshError("some edges use the same point multiple times", line)
+		report = self.validate(('indices', 'degenerated', 'tracks'))
+		if len(report['indices']):	raise MeshError("some indices are greater than the number of points", self.edges[report['indices'][0]], len(self.points))
+		if len(report['degenerated']):	raise MeshError("some edges use the same point multiple times", self.edges[report['degenerated'][0]])
 		if len(self.edges) != len(self.tracks):	raise MeshError("tracks list doesn't match edge list length")
-		if max(self.tracks, default=-1) >= len(self.groups): raise MeshError("some line group indices are greater than the number of groups", max(self.tracks, default=-1), len(self.groups))
+		if len(report['tracks']): raise MeshError("some line group indices are greater than the number of groups", max(self.tracks), len(self.groups))
 	
 	
 	
@@ -130,8 +137,7 @@ class Web(NMesh):
 	
 	def edgenear(self, point: vec3) -> int:
 		''' return the index of the closest edge to the given point '''
-		return min( range(len(self.edges)),
-					key=lambda i: distance_pe(point, self.edgepoints(i)) )
+		return self._searchtree().nearest(point)[0]
 	
 	def group(self, quals) -> 'Self':
 		''' extract a part of the mesh corresponding to the designated groups.
@@ -156,27 +162,34 @@ class Web(NMesh):
 				>>> mesh.group(['extrusion', 'arc'])   
 				<Mesh ...>
 		'''
-		edges = typedlist(dtype=uvec2)
-		tracks = typedlist(dtype='I')
-		for i in self.qualified_indices(quals):
-			edges.append(self.edges[i])
-			tracks.append(self.tracks[i])
-		return Web(self.points, edges, tracks, self.groups)
+		return self.filter(self.qualified_mask(quals))
+	
+	def filter(self, selection) -> 'Self':
+		''' extract the edges designated by `selection`, sharing the points and groups with the current web.
+		
+			`selection` can be a boolean mask with one value per edge, or an iterable of edge indices
+		'''
+		selection = selection_mask(selection, len(self.edges))
+		return Web(self.points, 
+			numpy_to_typedlist(typedlist_view(self.edges)[selection], uvec2), 
+			typedlist(typedlist_view(self.tracks)[selection], 'I'), 
+			self.groups)
 	
 	def replace(self, mesh, groups=None) -> 'self':
 		''' replace the given groups by the given mesh.
 			If groups is not specified, it will take the matching groups (with same index) in the current mesh
 		'''
 		if groups:
-			groups = set(self.qualified_groups(groups))
+			groups = np.fromiter(self.qualified_groups(groups), np.int64)
 		else:
-			groups = set(mesh.tracks)
-		j = 0
-		for i,t in enumerate(self.tracks):
-			if t not in groups:
-				self.edges[j] = self.edges[i]
-				self.tracks[j] = t
-				j += 1
+			groups = np.unique(typedlist_view(mesh.tracks))
+		simplices, tracks = typedlist_view(self.edges), typedlist_view(self.tracks)
+		keep = ~np.isin(tracks, groups)
+		j = int(np.count_nonzero(keep))
+		simplices[:j] = simplices[keep]
+		tracks[:j] = tracks[keep]
+		self.touch('edges', 0, len(self.edges))
+		self.touch('tracks', 0, len(self.tracks))
 		del self.edges[j:]
 		del self.tracks[j:]
 		self += mesh
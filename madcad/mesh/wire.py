@@ -22,7 +22,7 @@ class Wire(NMesh):
 			groups:	    data associated to each point (or edge)
 			options:	custom informations for the entire wire
 	'''
-	__slots__ = 'points', 'indices', 'tracks', 'groups', 'options'
+	__slots__ = 'points', 'indices', 'tracks', 'groups', 'options', '_cache', '_changes'
 	
 	# BEGIN ----- special methods -----
 	
@@ -47,14 +47,7 @@ class Wire(NMesh):
 	def __add__(self, other):
 		''' append the indices and points of the other wire '''
 		if isinstance(other, Wire):
-			r = Wire(
-				self.points if self.points is other.points else self.points[:], 
-				self.indices[:], 
-				self.tracks[:] if self.tracks else None, 
-				self.groups if self.groups is other.groups else self.groups[:],
-				)
-			r.__iadd__(other)
-			return r
+			return Wire.concatenate((self, other), share=True)
 		else:
 			return NotImplemented
 			
@@ -68,7 +61,9 @@ class Wire(NMesh):
 			else:
 				lp = len(self.points)
 				self.points.extend(other.points)
-				self.indices.extend(i+lp  for i in other.indices)
+				self.indices.extend(other.indices)
+				typedlist_view(self.indices)[li:] += lp
+				self.touch('points', lp)
 			
 			if self.groups is other.groups:
 				if self.tracks or other.tracks:
@@ -81,12 +76,37 @@ class Wire(NMesh):
 				if not self.tracks:	
 					self.tracks = typedlist.full(0, li, 'I')
 				if other.tracks:
-					self.tracks.extend(track+lg	for track in other.tracks)
+					lt = len(self.tracks)
+					self.tracks.extend(other.tracks)
+					typedlist_view(self.tracks)[lt:] += lg
 				else:
 					self.tracks.extend(typedlist.full(lg, len(other.indices), 'I'))
+			self.touch('indices', li)
+			self.touch('tracks', li)
 			return self
 		else:
 			return NotImplemented
+	
+	@classmethod
+	def concatenate(cls, wires, share=False) -> 'Wire':
+		''' return a new wire concatenating the indices and points of all the given wires, as their sum would do but allocating the buffers only once.
+			The points and groups are always new buffers, unless `share` is True and all the wires share them, like their sum does.
+		'''
+		wires = list(wires)
+		if not wires:
+			return cls()
+		points, pointoffsets = concatenate_buffers([w.points  for w in wires], vec3, share)
+		groups, groupoffsets = concatenate_buffers([w.groups  for w in wires], share=share)
+		if groups is not wires[0].groups or any(w.tracks  for w in wires):
+			tracks = concatenate_indices([w.tracks or typedlist.full(0, len(w.indices), 'I')  for w in wires], 'I', groupoffsets)
+		else:
+			tracks = None
+		return cls(
+			points, 
+			concatenate_indices([w.indices  for w in wires], 'I', pointoffsets), 
+			tracks, 
+			groups,
+			)
 			
 	# END BEGIN ----- data management -----
 	
@@ -101,6 +121,8 @@ class Wire(NMesh):
 		if self.points[-1] == self.points[0]:	
 			self.points.pop()
 			self.indices[-1] = 0
+		self.touch('points')
+		self.touch('indices')
 	
 	def mergepoints(self, merges) -> 'self':
 		''' merge points with the merge dictionnary {src index: dst index}
@@ -115,6 +137,8 @@ class Wire(NMesh):
 					self.tracks[j] = self.tracks[i]
 				j += 1
 		del self.indices[j:]
+		self.touch('indices')
+		if self.tracks:	self.touch('tracks')
 		return self
 	
 	def mergeclose(self, limit=None):
@@ -124,6 +148,7 @@ class Wire(NMesh):
 		if limit is None:	limit = self.precision()
 		limit *= limit
 		merges = {}
+		l = len(self.indices)
 		for i in reversed(range(1, len(self.indices))):
 			if distance2(self[i-1], self[i]) <= limit:
 				merges[self.indices[i]] = self.indices[i-1]
@@ -135,6 +160,8 @@ class Wire(NMesh):
 			self.indices[-1] = self.indices[0]
 			if self.tracks:
 				self.tracks[-1] = self.tracks[0]
+		self.touch('indices', 0, l)
+		self.touch('tracks', 0, l)
 		return merges
 		
 	# END BEGIN ----- mesh checks -----
@@ -143,17 +170,20 @@ class Wire(NMesh):
 		''' return True if the wire is closed, meaning the first and final indices are the same '''
 		return self.indices[0] == self.indices[-1]
 	
+	def validate(self, checks=None) -> dict:
+		''' Return a report of the inconsistencies and defects of the wire data, as a dictionnary of arrays of faulty point or index positions. See `validate_buffers` for the available checks. '''
+		return validate_buffers(self.points, self.indices, self.tracks, self.groups, checks)
+	
 	def check(self):
 		''' raise if the internal data are not consistent '''
 		if not (isinstance(self.points, typedlist) and self.points.dtype == vec3):	raise MeshError("points must be a typedlist(dtype=vec3)")
 		if not (isinstance(self.indices, typedlist) and self.indices.dtype == 'I'): 	raise MeshError("indices must be a typedlist(dtype='I')")
 		if self.tracks and not (isinstance(self.tracks, typedlist) and self.tracks.dtype == 'I'): 	raise MeshError("tracks must be a typedlist(dtype='I')")
-		l = len(self.points)
-		for i in self.indices:
-			if i >= l:	raise MeshError("some indices are greater than the number of points", i, l)
+		report = self.validate(('indices', 'tracks'))
+		if len(report['indices']):	raise MeshError("some indices are greater than the number of points", self.indices[report['indices'][0]], len(self.points))
 		if self.tracks:
 			if len(self.indices) != len(self.tracks):	raise MeshError("tracks list doesn't match indices list length")
-			if max(self.tracks) >= len(self.groups):	raise MeshError("some tracks are greater than the number of groups", max(self.tracks), len(self.groups))
+			if len(report['tracks']):	raise MeshError("some tracks are greater than the number of groups", max(self.tracks), len(self.groups))
 
 	
 	# END BEGIN ----- selection methods -----
@@ -164,8 +194,7 @@ class Wire(NMesh):
 	
 	def edgenear(self, point: vec3) -> int:
 		''' return the index of the closest edge to the given point '''
-		return min( range(len(self.indices)-1),
-					key=lambda i: distance_pe(point, self.edgepoints(i)) )
+		return self._searchtree().nearest(point)[0]
 	
 	def group(self, groups):
 		''' extract a part of the mesh corresponding to the designated groups.
@@ -195,13 +224,14 @@ class Wire(NMesh):
 		if isinstance(groups, set):			pass
 		elif hasattr(groups, '__iter__'):	groups = set(groups)
 		else:								groups = (groups,)
-		indices = typedlist(dtype=self.indices.dtype)
-		tracks = typedlist(dtype=self.tracks.dtype)
-		for i,t in zip(self.indices, self.tracks):
-			if t in groups:
-				indices.append(i)
-				tracks.append(t)
-		return Wire(self.points, indices, tracks, self.groups, self.options)
+		tracks = typedlist_view(ensure_typedlist(self.tracks, 'I'))
+		indices = typedlist_view(ensure_typedlist(self.indices, 'I'))
+		n = min(len(indices), len(tracks))
+		selection = np.isin(tracks[:n], list(groups))
+		return Wire(self.points, 
+			typedlist(indices[:n][selection], 'I'), 
+			typedlist(tracks[:n][selection], 'I'), 
+			self.groups, self.options)
 
 	# END BEGIN ----- extraction methods -----
 		
@@ -329,6 +359,8 @@ class Wire(NMesh):
 			self.indices.append(self.indices[0])
 			if self.tracks:
 				self.tracks.append(self.tracks[0])
+			self.touch('indices', len(self.indices)-1)
+			self.touch('tracks', len(self.indices)-1)
 		return self
 		
 	def unclose(self) -> 'Self':
@@ -141,12 +141,16 @@ def edgenear(web, obj):
 		raise TypeError("obj must be a point or an axis")
 	if isinstance(web, Mesh):	web = web.groupoutlines()
 	best = None
-	score = math.inf
-	for edge in web.edges:
-		d = dist((web.points[edge[0]], web.points[edge[1]]))
-		if d < score:
-			score = d
-			best = edge
+	if isinstance(obj,vec3):
+		i = web.edgenear(obj)
+		if i is not None:	best = web.edges[i]
+	else:
+		score = math.inf
+		for edge in web.edges:
+			d = dist((web.points[edge[0]], web.points[edge[1]]))
+			if d < score:
+				score = d
+				best = edge
 	if isinstance(obj,tuple) and dot(web.points[best[1]]-web.points[best[0]], obj[1]) < 0:
 		best = best[1],best[0]
 	return best
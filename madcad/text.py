@@ -394,11 +394,10 @@ else:
 			
 		'''
 		if fill:	
-			pool = Mesh()
 			character = character_surface
 		else:
-			pool = Web()
 			character = character_outline
+		parts = []
 		
 		face = freetype.Face(font_path(font or 'NotoMono-Regular'))
 		position = vec3(0)
@@ -415,12 +414,14 @@ else:
 				cache = character(char, face, resolution)
 				if fill:	part = cache['mesh']
 				else:		part = cache['web']
-				pool += part.transform(position-vec3(cache['cbox'].min.x,0,0))
+				parts.append(part.transform(position-vec3(cache['cbox'].min.x,0,0)))
 				if cache['fixed']:
 					position.x += 0.5 + spacing.x
 				else:
 					position.x += cache['cbox'].width.x + spacing.x
 		
+		if fill:	pool = Mesh.concatenate(parts)
+		else:		pool = Web.concatenate(parts)
 		if size != 1:	
 			pool = pool.transform(size)
 		if align != (0,0):	
@@ -2,20 +2,29 @@
 
 from math import inf
 from .mathutils import *
-from .mesh import Mesh, Web, Wire, MeshError, connpe, web
+from .mesh import Mesh, Web, Wire, MeshError, connpe, web, edgekey
 from .asso import Asso
 from .nprint import nformat, nprint
 
 from copy import copy
 from operator import itemgetter
+from heapq import heapify, heappush, heappop, heapreplace
+from collections import deque
+import numpy as np
 
 
 class TriangulationError(Exception):	pass
 
 
-def triangulation(outline, normal=None, prec=NUMPREC):
-	''' triangulate using the prefered method '''
-	return triangulation_closest(outline, normal)
+def triangulation(outline, normal=None, prec=NUMPREC, method='closest', **kwargs):
+	''' triangulate using the prefered method
+	
+		`method` can be `'closest'` for `triangulation_closest` (the default) or `'cdt'` for `triangulation_cdt`, and the additional keyword arguments are passed to it
+	'''
+	if method == 'closest':	return triangulation_closest(outline, normal, **kwargs)
+	elif method == 'cdt':	return triangulation_cdt(outline, normal, **kwargs)
+	else:
+		raise ValueError('unknown triangulation method {}'.format(repr(method)))
 	
 	
 	
@@ -167,7 +176,9 @@ def triangulation_outline(outline: Wire, normal=None, prec=None) -> Mesh:
 	''' return a mesh with the triangles formed in the outline
 		the returned mesh uses the same buffer of points than the input
 		
-		complexity:  O(n*k)  where k is the number of non convex points
+		The ears are clipped in order of their priority kept in a heap, and the remaining outline is a ring of linked points. The non convex points, the only ones that can be in an ear, are sorted in a grid so each ear only checks the ones around it.
+		
+		complexity:  O(n*log(n) + n*k)  where k is the number of non convex points near an ear, usually much smaller than their total
 	'''
 	# get a normal in the right direction for loop winding
 	if not normal:		normal = outline.normal()
@@ -180,6 +191,10 @@ def triangulation_outline(outline: Wire, normal=None, prec=None) -> Mesh:
 	# reducing contour, indexing proj and outlines.indices
 	hole = list(range(len(outline.indices)))
 	if length2(outline[-1]-outline[0]) <= prec:		hole.pop()
+	if len(hole) < 3:	return Mesh(outline.points)
+	# remaining contour as a ring of linked points
+	after = {hole[i-1]: hole[i]  for i in range(len(hole))}
+	before = {hole[i]: hole[i-1]  for i in range(len(hole))}
 	
 	# set of remaining non-convexity points, indexing proj
 	l = len(outline.indices)
@@ -187,6 +202,25 @@ def triangulation_outline(outline: Wire, normal=None, prec=None) -> Mesh:
 					for i in hole
 					if perpdot(proj[i]-proj[i-1], proj[(i+1)%l]-proj[i]) <= prec
 					}
+	# grid of the non-convexity points, for the ears to only check their neighbors
+	low, high = vec2(inf), vec2(-inf)
+	for i in nonconvex:
+		low = glm.min(low, proj[i])
+		high = glm.max(high, proj[i])
+	cell = max(high - low) / sqrt(len(nonconvex)) if nonconvex else 1
+	if not cell > 0:	cell = 1
+	grid = {}
+	for i in nonconvex:
+		grid.setdefault(tuple(ivec2(glm.floor((proj[i] - low) / cell))), []).append(i)
+	gridmax = ivec2(glm.floor((high - low) / cell))  if nonconvex else ivec2(-1)
+	
+	def neighbors(a, b, c, margin):
+		''' non convex points in the grid cells around the given triangle '''
+		lo = glm.max(ivec2(glm.floor((glm.min(glm.min(a, b), c) - margin - low) / cell)), ivec2(0))
+		hi = glm.min(ivec2(glm.floor((glm.max(glm.max(a, b), c) + margin - low) / cell)), gridmax)
+		for x in range(lo.x, hi.x+1):
+			for y in range(lo.y, hi.y+1):
+				yield from grid.get((x,y), ())
 	
 	def priority(u,v):
 		''' priority criterion for 2D triangles, depending on its shape
@@ -196,20 +230,22 @@ def triangulation_outline(outline: Wire, normal=None, prec=None) -> Mesh:
 		return (dot(u,v) + uv) / uv**2
 	
 	def score(i):
-		l = len(hole)
-		o = proj[hole[ i ]]
-		u = proj[hole[ (i+1)%l ]] - o
-		v = proj[hole[ (i-1)%l ]] - o
-		triangle = (hole[(i-1)%l], hole[i], hole[(i+1)%l])
+		o = proj[i]
+		u = proj[after[i]] - o
+		v = proj[before[i]] - o
+		triangle = (before[i], i, after[i])
 		
 		# check for badly oriented triangle
 		if perpdot(u,v) < -prec:		
 			return -inf
 		# check for intersection with the rest
 		elif perpdot(u,v) > prec:
+			# the points passing the test below have barycentric coordinates above -3*prec/perpdot(u,v) so they are in the triangle box extended by that much
+			extent = proj[triangle[0]], proj[triangle[1]], proj[triangle[2]]
+			margin = (3*prec/perpdot(u,v) + NUMPREC) * max(glm.max(glm.max(*extent[:2]), extent[2]) - glm.min(glm.min(*extent[:2]), extent[2]))
 			# check that there is not point of the outline inside the triangle
-			for j in nonconvex:
-				if j not in triangle:
+			for j in neighbors(*extent, margin):
+				if j not in triangle and j in nonconvex:
 					for k in range(3):
 						a,b = proj[triangle[k]], proj[triangle[k-1]]
 						s = perpdot(a-b, proj[j]-a)
@@ -222,25 +258,36 @@ def triangulation_outline(outline: Wire, normal=None, prec=None) -> Mesh:
 		elif dot(u,v) >= prec:
 			return -inf
 		return priority(u,v)
-	scores = [score(i) for i in range(len(hole))]
+	
+	# heap of the ears, the best score first and the last point on equality
+	scores = {i: score(i)  for i in hole}
+	heap = [(-score, -i)  for i, score in scores.items()]
+	heapify(heap)
 	
 	triangles = typedlist(dtype=uvec3)
-	while len(hole) > 2:
-		l = len(hole)
-		i = imax(scores)
-		if scores[i] == -inf:
-			raise TriangulationError("no more feasible triangles (algorithm failure or bad input outline)", [outline.indices[i] for i in hole])
+	remaining = len(hole)
+	while remaining > 2:
+		best, i = heappop(heap)
+		i = -i
+		# skip the outdated entries
+		if i not in scores or scores[i] != -best:
+			continue
+		if best == inf:
+			raise TriangulationError("no more feasible triangles (algorithm failure or bad input outline)", [outline.indices[i] for i in sorted(scores)])
 		
+		p, n = before[i], after[i]
 		triangles.append(uvec3(
-			outline.indices[hole[(i-1)%l]], 
-			outline.indices[hole[i]], 
-			outline.indices[hole[(i+1)%l]],
+			outline.indices[p], 
+			outline.indices[i], 
+			outline.indices[n],
 			))
-		nonconvex.discard(hole.pop(i))
-		scores.pop(i)
-		l -= 1
-		scores[(i-1)%l] = score((i-1)%l)
-		scores[i%l] = score(i%l)
+		nonconvex.discard(i)
+		del scores[i], before[i], after[i]
+		after[p], before[n] = n, p
+		remaining -= 1
+		for j in (p, n):
+			scores[j] = score(j)
+			heappush(heap, (-scores[j], -j))
 	
 	return Mesh(outline.points, triangles)
 
@@ -514,10 +561,12 @@ def line_bridges(lines: Web, conn=None) -> 'Web':
 	''' find what edges to insert in the given mesh to make all its loops connex.
 		returns a Web of the bridging edges.
 		
-		complexity:  O(n**2 + n*k)
+		The closest elements are searched in a grid of the points and edges of the lines, and the best bridge of each reached point and edge is kept in a heap until its destination gets reached too.
+		
+		complexity:  O(n*k*log(n))
 		with
 			n = number of points in the lines
-			k = average number of points per loop
+			k = average number of elements in the grid cells around a point, usually small
 	'''
 	if conn is None:	conn = connpe(lines.edges)
 	pts = lines.points
@@ -529,83 +578,129 @@ def line_bridges(lines: Web, conn=None) -> 'Web':
 	remain_points = set(p 	 for e in lines.edges for p in e)
 	remain_edges = set(range(len(lines.edges)))
 	
+	# grid of the points and edges projected on the 2 axis the lines extend the most, projected distances are lower bounds of the distances
+	low = high = pts[lines.edges[0][0]]
+	for p in remain_points:
+		low, high = glm.min(low, pts[p]), glm.max(high, pts[p])
+	axis = sorted(range(3), key=lambda i: high[i]-low[i])[1:]
+	cell = sum(distance(pts[a], pts[b])  for a,b in lines.edges) / len(lines.edges)
+	if not cell > 0:	cell = 1
+	def flat(p):
+		return vec2(p[axis[0]] - low[axis[0]], p[axis[1]] - low[axis[1]])
+	def key(p):
+		return int(p[0] // cell), int(p[1] // cell)
+	extent = max(key(flat(high)))
+	
+	grid_points = {}
+	for p in remain_points:
+		grid_points.setdefault(key(flat(pts[p])), []).append(p)
+	grid_edges = {}
+	for i, (a,b) in enumerate(lines.edges):
+		fa, fb = flat(pts[a]), flat(pts[b])
+		(xa, ya), (xb, yb) = key(fa), key(fb)
+		for x in range(min(xa,xb), max(xa,xb)+1):
+			for y in range(min(ya,yb), max(ya,yb)+1):
+				# only the cells the edge is crossing
+				center = vec3((x+0.5)*cell, (y+0.5)*cell, 0)
+				if distance_pe(center, (vec3(fa,0), vec3(fb,0))) <= cell:
+					grid_edges.setdefault((x,y), []).append(i)
+	
+	def nearest(point, grid, remain, metric, slack=0):
+		''' closest remaining element to the given point, and its distance. The smallest element is kept on equality
+			`slack` is how much closer than the point the elements can be, according to the `metric` function
+		'''
+		x, y = key(flat(point))
+		best = (inf, None)
+		for ring in range(extent+2):
+			# elements beyond the rings already reviewed are at least that far
+			if best[0] <= (ring-1)*cell - slack:
+				break
+			# when the rings are getting bigger than the remaining elements, reviewing them all is cheaper
+			if (2*ring+1)**2 > len(remain):
+				for item in remain:
+					best = min(best, (metric(item), item))
+				break
+			for cx in range(x-ring, x+ring+1):
+				for cy in (range(y-ring, y+ring+1)  if abs(cx-x) == ring else (y-ring, y+ring)):
+					for item in grid.get((cx,cy), ()):
+						if item in remain:
+							best = min(best, (metric(item), item))
+		return best
+	
+	def find_closest_edge(ac):
+		''' find the bridge to the closest point to the given edge '''
+		ep = lines.edgepoints(ac)
+		e = lines.edges[ac]
+		# the search is centered on the edge, points can be closer to it by its half length
+		score, ma = nearest((ep[0]+ep[1])/2, grid_points, remain_points, 
+					lambda ma: distance_pe(pts[ma], ep), 
+					distance(ep[0], ep[1])/2)
+		if ma is None:
+			return inf, None
+		if distance2(pts[ma], pts[e[0]]) < distance2(pts[ma], pts[e[1]]):
+			return score, (ma, e[0])
+		else:
+			return score, (ma, e[1])
+	
+	def find_closest_point(ac):
+		''' find the bridge to the closest edge to the given point '''
+		score, ma = nearest(pts[ac], grid_edges, remain_edges, lambda ma: distance_pe(pts[ac], lines.edgepoints(ma)))
+		if ma is None:
+			return inf, None
+		e = lines.edges[ma]
+		if distance2(pts[ac], pts[e[0]]) < distance2(pts[ac], pts[e[1]]):
+			return score, (e[0], ac)
+		else:
+			return score, (e[1], ac)
+	
+	# heap of the closest bridges, points first and then in reach order on equality
+	heap = []
 	def propagate(start):
 		''' propagate from the given start point to make connex points and edges as reached '''
 		front = [start]
+		points, edges = [], []
 		while front:
 			s = front.pop()
 			if s in reached_points:	continue
-			reached_points[s] = (inf, (s,s))
+			reached_points[s] = None
+			points.append(s)
 			remain_points.discard(s)
 			for e in conn[s]:
 				if e in reached_edges: continue
-				reached_edges[e] = (inf, (s,s))
+				reached_edges[e] = None
+				edges.append(e)
 				remain_edges.discard(e)
 				front.extend(lines.edges[e])
-				
-	def update_closest():
-		# from points to edges
-		for s, (score, best) in reached_points.items():
-			if best[0] in reached_points:
-				reached_points[s] = find_closest_point(s)
-		# from edges to points
-		for e, (score, best) in reached_edges.items():
-			if best[0] in reached_points:
-				reached_edges[e] = find_closest_edge(e)
-	
-	def find_closest_edge(ac):
-		''' find the bridge to the closest point to the given edge
-		'''
-		best = None
-		score = inf
-		# minimum from edge to points
-		ep = lines.edgepoints(ac)
-		for ma in remain_points:
-			d = distance_pe(pts[ma], ep)
-			if d < score:
-				e = lines.edges[ac]
-				if distance2(pts[ma], pts[e[0]]) < distance2(pts[ma], pts[e[1]]):
-					score, best = d, (ma, e[0])
-				else:
-					score, best = d, (ma, e[1])
-		
-		return score, best
-		
-	def find_closest_point(ac):
-		''' find the bridge to the closest edge to the given point
-		'''
-		best = None
-		score = inf
-		# minimum from point to edges
-		for ma in remain_edges:
-			d = distance_pe(pts[ac], lines.edgepoints(ma))
-			if d < score:
-				e = lines.edges[ma]
-				if distance2(pts[ac], pts[e[0]]) < distance2(pts[ac], pts[e[1]]):
-					score, best = d, (e[0], ac)
-				else:
-					score, best = d, (e[1], ac)
-						
-		return score, best
+		# closest elements are searched once all the connex ones are reached
+		for s in points:
+			reached_points[s] = find_closest_point(s)
+			heappush(heap, (reached_points[s][0], 0, len(heap), s))
+		for e in edges:
+			reached_edges[e] = find_closest_edge(e)
+			heappush(heap, (reached_edges[e][0], 1, len(heap), e))
 	
 	# main loop
 	propagate(lines.edges[0][0])
 	while remain_edges:
-		update_closest()
-		closest = min(
-					min(reached_points.values(), key=itemgetter(0)),
-					min(reached_edges.values(), key=itemgetter(0)),
-					key=itemgetter(0)) [1]
+		while True:
+			_, kind, order, item = heap[0]
+			reached = reached_edges  if kind else reached_points
+			closest = reached[item][1]
+			if closest is not None and closest[0] not in reached_points:
+				break
+			# update the bridges leading to elements reached since
+			reached[item] = find_closest_edge(item)  if kind else find_closest_point(item)
+			heapreplace(heap, (reached[item][0], kind, order, item))
 		bridges.append(closest)
 		bridges.append(tuple(reversed(closest)))
 		propagate(closest[0])
-		
-	return Web(lines.points, bridges)
 	
+	return Web(lines.points, bridges)
+
+
+
+
 
-	
-	
-	
 def flat_loops(lines: Web, normal=None) -> '[Wire]':
 	''' collect the closed loops present in the given web, so that no loop overlap on the other ones.
 	'''
@@ -621,13 +716,10 @@ def flat_loops(lines: Web, normal=None) -> '[Wire]':
 	# create lists of edges that have a double and edges that have not
 	doubled = []
 	nondoubled = []
+	edges = set(map(tuple, lines.edges))
 	for i, e in enumerate(lines.edges):
-		double = False
-		for j in conn[e[1]]:
-			if lines.edges[j][1] == e[0]:
-				double = True
-		if double:	doubled.append(i)
-		else:		nondoubled.append(i)
+		if (e[1], e[0]) in edges:	doubled.append(i)
+		else:						nondoubled.append(i)
 	# iterator of start points
 	choice = (i  for i in (nondoubled + doubled)  if not used[i])
 	
@@ -694,6 +786,252 @@ def triangulation_closest(outline, normal=None, prec=None):
 		result += triangulation_outline(loop, z, prec)
 	return result
 
+
+def triangulation_cdt(outline, normal=None, prec=None, minangle=None, maxarea=None) -> Mesh:
+	''' constrained Delaunay triangulation of the given outline: the outline edges are kept and the other edges are chosen so that no triangle has a point inside its circumcircle, which maximizes the minimum angle of the triangles.
+		
+		The outline can be a `Wire` or a `Web` with holes, like for `triangulation_closest` which gives the starting triangulation, whose edges are then flipped until they are all Delaunay.
+		
+		Parameters:
+			minangle:   if given, points are inserted until the angles of all triangles are above it (in radians). The refinement may not terminate above 30°, around 20° is safe.
+			maxarea:    if given, points are inserted until the areas of all triangles are below it
+		
+		The returned mesh uses the same buffer of points than the input, unless points are inserted: then it has its own buffer of points starting with the original points.
+		
+		complexity:  O(n*k) flips  where k is usually small, plus the initial triangulation
+	'''
+	if not normal:
+		normal = outline.normal() if isinstance(outline, Wire) else convex_normal(web(outline))
+	result = triangulation_closest(outline, normal, prec)
+	if not result.faces:
+		return result
+	if prec is None:	prec = result.precision()
+	# the outline edges must be kept
+	if isinstance(outline, Wire):
+		constraints = {edgekey(outline.indices[i-1], outline.indices[i])  for i in range(len(outline.indices))}
+	else:
+		constraints = {edgekey(*e)  for e in web(outline).edges}
+	
+	proj = list(planeproject(result.points, normal))
+	faces = [tuple(f)  for f in result.faces]
+	tracks = list(result.tracks)
+	conn = {}	# face of each oriented edge
+	for i, (a,b,c) in enumerate(faces):
+		conn[(a,b)] = conn[(b,c)] = conn[(c,a)] = i
+	
+	def orient(a, b, c) -> bool:
+		''' True if the 2D triangle is clearly counterclockwise '''
+		u, v = proj[b]-proj[a], proj[c]-proj[a]
+		return perpdot(u, v) > NUMPREC * length2(u) + NUMPREC * length2(v)
+	
+	def incircle(a, b, c, d) -> bool:
+		''' True if d is inside the circumcircle of the counterclockwise triangle abc, or if abc is flat '''
+		if not orient(a, b, c):
+			return True
+		pd = proj[d]
+		ad, bd, cd = proj[a]-pd, proj[b]-pd, proj[c]-pd
+		al, bl, cl = length2(ad), length2(bd), length2(cd)
+		det = al * perpdot(bd, cd) + bl * perpdot(cd, ad) + cl * perpdot(ad, bd)
+		return det > NUMPREC * (al + bl + cl) ** 2
+	
+	def opposite(f, a, b) -> int:
+		''' the point of face f that is not a or b '''
+		for p in faces[f]:
+			if p != a and p != b:	return p
+	
+	def setface(f, face):
+		faces[f] = face
+		a,b,c = face
+		conn[(a,b)] = conn[(b,c)] = conn[(c,a)] = f
+		changed.append(f)
+	
+	def legalize(stack):
+		''' flip the given edges and the ones around until they are all Delaunay '''
+		while stack:
+			a, b = stack.pop()
+			if edgekey(a,b) in constraints or (a,b) not in conn or (b,a) not in conn:
+				continue
+			f1, f2 = conn[(a,b)], conn[(b,a)]
+			c, d = opposite(f1, a, b), opposite(f2, b, a)
+			# the flipped triangles must be valid, that is the quad must be convex
+			if not (incircle(a, b, c, d) and orient(a, d, c) and orient(d, b, c)):
+				continue
+			del conn[(a,b)], conn[(b,a)]
+			setface(f1, (a,d,c))
+			setface(f2, (d,b,c))
+			stack.extend(((a,d), (d,b), (b,c), (c,a)))
+	
+	changed = []
+	legalize([e  for e in conn  if e[0] < e[1]])
+	
+	if minangle or maxarea:
+		result = result.own(points=True)
+		points = result.points
+		# maximum ratio of the circumradius over the shortest edge, for the minimum angle
+		ratio = 1/(2*sin(minangle))  if minangle else inf
+		
+		def bad(f) -> bool:
+			a,b,c = faces[f]
+			u, v, w = proj[b]-proj[a], proj[c]-proj[b], proj[a]-proj[c]
+			area = perpdot(u, -w) / 2
+			shortest = min(length2(u), length2(v), length2(w))
+			if area <= 0 or shortest <= prec**2:
+				return False
+			if maxarea and area > maxarea:
+				return True
+			# a small angle between two segments of the outline cannot be enlarged, trying would only insert points endlessly
+			for k, l in enumerate((length2(v), length2(w), length2(u))):
+				if l == shortest and edgekey(faces[f][k], faces[f][k-1]) in constraints and edgekey(faces[f][k], faces[f][k-2]) in constraints:
+					return False
+			# circumradius = product of the edge lengths / (4*area)
+			return sqrt(length2(u) * length2(v) * length2(w) / shortest) > ratio * 4*area
+		
+		def encroached(a, b, p) -> bool:
+			''' True if p is in the diametral circle of the constrained edge ab '''
+			return edgekey(a,b) in constraints and dot(proj[a]-p, proj[b]-p) < 0
+		
+		def locate(f, p):
+			''' walk from face f to the face containing p, return it with the constrained edge stopping the walk if any '''
+			for _ in range(len(faces)):
+				face = faces[f]
+				for k in range(3):
+					a, b = face[k-1], face[k]
+					if perpdot(proj[b]-proj[a], p-proj[a]) < 0:
+						if edgekey(a,b) in constraints or (b,a) not in conn:
+							return f, (a,b)
+						f = conn[(b,a)]
+						break
+				else:
+					return f, None
+			return f, None
+		
+		def insert(point, p, edge, f):
+			''' insert a new point splitting the given edge, or face f if no edge is given '''
+			i = len(points)
+			points.append(point)
+			proj.append(p)
+			if edge:
+				a, b = edge
+				if edgekey(a,b) in constraints:
+					constraints.remove(edgekey(a,b))
+					constraints.add(edgekey(a,i))
+					constraints.add(edgekey(i,b))
+				stack = []
+				for a, b in (edge, edge[::-1]):
+					if (a,b) not in conn:	continue
+					f = conn.pop((a,b))
+					c = opposite(f, a, b)
+					setface(f, (a,i,c))
+					faces.append(None)
+					tracks.append(tracks[f])
+					setface(len(faces)-1, (i,b,c))
+					stack.extend(((b,c), (c,a)))
+			else:
+				a, b, c = faces[f]
+				setface(f, (a,b,i))
+				for face in ((b,c,i), (c,a,i)):
+					faces.append(None)
+					tracks.append(tracks[f])
+					setface(len(faces)-1, face)
+				stack = [(a,b), (b,c), (c,a)]
+			legalize(stack)
+		
+		def splitedge(a, b):
+			insert((points[a]+points[b])/2, (proj[a]+proj[b])/2, (a,b), None)
+		
+		changed.clear()
+		queue = deque(range(len(faces)))
+		while queue:
+			f = queue.popleft()
+			if not bad(f):	continue
+			a, b, c = faces[f]
+			center = circumcenter(proj[a], proj[b], proj[c])
+			g, stop = locate(f, center)
+			# a constrained edge between the face and its circumcenter, or encroached by the circumcenter, is split instead
+			if stop:
+				if edgekey(*stop) in constraints:
+					splitedge(*stop)
+			else:
+				face = faces[g]
+				for k in range(3):
+					if encroached(face[k-1], face[k], center):
+						splitedge(face[k-1], face[k])
+						break
+				else:
+					# interpolate the point in the 3D triangle, the outline may not be perfectly flat
+					a, b, c = face
+					area = perpdot(proj[b]-proj[a], proj[c]-proj[a])
+					u = perpdot(proj[c]-center, proj[a]-center) / area
+					v = perpdot(proj[a]-center, proj[b]-center) / area
+					point = points[a] + (points[b]-points[a])*u + (points[c]-points[a])*v
+					# on an edge, this edge is split
+					edge = None
+					for k in range(3):
+						if abs(perpdot(proj[face[k]]-proj[face[k-1]], center-proj[face[k-1]])) <= NUMPREC * length2(proj[face[k]]-proj[face[k-1]]):
+							edge = (face[k-1], face[k])
+					insert(point, center, edge, g)
+			queue.extend(changed)
+			changed.clear()
+	
+	return Mesh(result.points, typedlist(faces, uvec3), typedlist(tracks, 'I'), result.groups)
+
+def circumcenter(a: vec2, b: vec2, c: vec2) -> vec2:
+	''' center of the circle passing by the 3 given 2D points '''
+	u, v = b-a, c-a
+	d = 2 * perpdot(u, v)
+	return a + vec2(v.y*length2(u) - u.y*length2(v), u.x*length2(v) - v.x*length2(u)) / d
+
+
+def triangulate_many(outlines, normals=None, prec=None, workers=None) -> '(Mesh, list)':
+	''' triangulate many independent outlines at once, as `triangulation_closest` does for each
+	
+		Parameters:
+			outlines:  a list of `Wire` or `Web`, or anything `web()` accepts
+			normals:   the normal of each outline, or one normal for all, or None to guess each one
+			prec:      the precision for all outlines, if not given it is computed once per buffer of points instead of once per outline
+			workers:   a number of threads (or an existing `concurrent.futures.Executor`) to triangulate the outlines on. The result does not depend on it.
+		
+		Return:
+			`(mesh, offsets)` where mesh is the concatenation of the triangulations, each outline being a group, and `mesh.faces[offsets[i]:offsets[i+1]]` are the triangles of `outlines[i]`.
+			
+			If all the outlines are sharing the same buffer of points, the mesh uses it too.
+	'''
+	from .boolean import workpool
+	
+	outlines = [outline  if isinstance(outline, (Wire, Web)) else web(outline)  for outline in outlines]
+	if normals is None or isinstance(normals, vec3):
+		normals = [normals] * len(outlines)
+	# the precision depends only on the buffer of points
+	precisions = {}
+	if prec is None:
+		for outline in outlines:
+			if id(outline.points) not in precisions:
+				precisions[id(outline.points)] = outline.precision()
+	
+	def triangulate(i):
+		outline = outlines[i]
+		return triangulation_closest(outline, normals[i], prec if prec is not None else precisions[id(outline.points)])
+	
+	with workpool(workers) as pool:
+		meshes = list((pool.map if pool else map)(triangulate, range(len(outlines))))
+	
+	counts = [len(mesh.faces)  for mesh in meshes]
+	offsets = [0]
+	for count in counts:
+		offsets.append(offsets[-1] + count)
+	tracks = typedlist(np.repeat(np.arange(len(meshes), dtype=np.uint32), counts), 'I')
+	groups = [None] * len(meshes)
+	if meshes and all(mesh.points is meshes[0].points  for mesh in meshes):
+		faces = typedlist(dtype=uvec3, reserve=offsets[-1])
+		for mesh in meshes:
+			faces.extend(mesh.faces)
+		return Mesh(meshes[0].points, faces, tracks, groups), offsets
+	else:
+		result = Mesh.concatenate(meshes)
+		result.tracks = tracks
+		result.groups = groups
+		return result, offsets
+
 	
 	
 	
@@ -39,6 +39,31 @@ def test_boolean():
 			assert r.isenvelope()
 			results.append(r)
 		
+def test_intersect_many():
+	import numpy as np
+	from madcad import core, hashing
+	points1, faces1 = hashing.mesh_arrays(m1)
+	points2, faces2 = hashing.mesh_arrays(m2)
+	pairs = np.array([(f1, f2)  for f1 in range(len(m1.faces))  for f2 in range(len(m2.faces))], dtype=np.int64)
+	hits, sides, positions = core.intersect_triangles_many(points1, faces1, points2, faces2, pairs, 1e-6)
+	expected = [i  for i, (f1, f2) in enumerate(pairs.tolist())
+				if core.intersect_triangles(m1.facepoints(f1), m2.facepoints(f2), 1e-6)]
+	assert hits.tolist() == expected
+	for i, s, p in zip(hits.tolist(), sides.tolist(), positions.tolist()):
+		f1, f2 = pairs[i].tolist()
+		ref = core.intersect_triangles(m1.facepoints(f1), m2.facepoints(f2), 1e-6)
+		assert [(face, edge, vec3(*x))  for (face, edge), x in zip(s, p)] == list(ref)
+
+def test_workers():
+	for sides in ((False, True), (True, True)):
+		nprint('* boolean(sides={}, workers=4)'.format(sides))
+		ref = boolean(m1, m2, sides)
+		r = boolean(m1, m2, sides, workers=4)
+		r.check()
+		assert r.isenvelope()
+		assert len(r.faces) == len(ref.faces)
+		assert abs(r.volume() - ref.volume()) <= 1e-9
+		
 def test_sidecases():
 	z = vec3(0,0,1)
 	cut_tool = icosphere(vec3(0), 1, resolution=("div", 1))
@@ -1,4 +1,4 @@
-from madcad import vec3, Mesh, Web, show
+from madcad import vec3, Box, Mesh, Web, show
 from madcad.hashing import *
 from nprint import nprint
 
@@ -35,4 +35,39 @@ print(set( m.get((vec3(8,0,0),vec3(0,8,0),vec3(-2,-2,8))) ))
 
 m.options['color'] = (0.7, 0.9, 1)
 
+# test the array-backed index against the dictionnary one
+reference = PositionMap(1, [(triangles.facepoints(i), i)  for i in range(len(triangles.faces))])
+index = PositionIndex(1, *mesh_arrays(triangles))
+offsets, close = index.query_many(*mesh_arrays(triangles))
+for i in range(len(triangles.faces)):
+	assert close[offsets[i]:offsets[i+1]].tolist() == sorted(set( reference.get(triangles.facepoints(i)) ))
+	assert close[offsets[i]:offsets[i+1]].tolist() == sorted(set( index.get(triangles.facepoints(i)) ))
+
+# test the bounding volume hierarchy against linear searches
+from madcad import icosphere
+from madcad.mathutils import distance, distance_pe, distance_pt
+sphere = icosphere(vec3(0), 1, resolution=('div', 6))
+for p in [vec3(0.3,0.2,0.1), vec3(2,-1,0.5), vec3(-4,3,7), sphere.points[5]]:
+	assert sphere.facenear(p) == min(range(len(sphere.faces)), key=lambda i: distance_pt(p, sphere.facepoints(i)))
+	assert sphere.pointnear(p) == min(range(len(sphere.points)), key=lambda i: distance(p, sphere.points[i]))
+	assert lines.edgenear(p) == min(range(len(lines.edges)), key=lambda i: distance_pe(p, lines.edgepoints(i)))
+assert sphere.pointat(sphere.points[5]) == 5
+face, t = sphere.boxtree().cast(vec3(0,0,-3), vec3(0,0,1))
+assert face is not None and 1.9 < t <= 2
+assert sphere.boxtree().inbox(Box(vec3(-0.1), vec3(0.1))) == []
+# the tree is only kept on tracked meshes, until their modifications are reported
+assert sphere.boxtree() is not sphere.boxtree()
+sphere.points[sphere.faces[0][0]] = vec3(5,0,0)
+assert sphere.facenear(vec3(5,0,0)) == 0
+sphere.track()
+tree = sphere.boxtree()
+assert sphere.boxtree() is tree
+moved = sphere.faces[1][0]
+sphere.points[moved] = vec3(0,5,0)
+sphere.touch('points', moved)
+assert sphere.boxtree() is not tree
+assert moved in sphere.faces[sphere.facenear(vec3(0,5,0))]
+sphere.points.append(vec3(6,0,0))
+assert sphere.pointnear(vec3(6,0,0)) == len(sphere.points)-1
+
 show([m, triangles, lines])
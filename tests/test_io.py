@@ -21,3 +21,66 @@ write(original, 'tests/test_io.stl')
 stl = read('tests/test_io.stl')
 stl.check()
 assert stl.issurface()
+
+# test stl with merged vertices
+stl = read('tests/test_io.stl', merge=True)
+stl.check()
+assert stl.issurface()
+assert len(stl.points) == len(original.points)
+
+# test binary stl padded after the triangles
+with open('tests/test_io.stl', 'ab') as f:
+	f.write(bytes(7))
+stl = read('tests/test_io.stl')
+assert len(stl.faces) == len(original.faces)
+
+# test ply with polygonal faces, convex or not
+from plyfile import PlyData, PlyElement
+import numpy as np
+import os
+vertices = np.array([(0,0,0), (2,0,0), (2,1,0), (1,1,0), (1,2,0), (0,2,0), (3,0,0), (3,1,0)], dtype=[('x','f4'), ('y','f4'), ('z','f4')])
+faces = np.empty(2, dtype=[('vertex_indices', 'O'), ('group', 'u2')])
+faces['vertex_indices'] = [np.array([0,1,2,3,4,5], 'u4'), np.array([1,6,7,2], 'u4')]
+faces['group'] = [0, 1]
+PlyData([PlyElement.describe(vertices, 'vertex'), PlyElement.describe(faces, 'face')]).write('tests/test_io.ply')
+ply = read('tests/test_io.ply')
+ply.check()
+assert len(ply.faces) == 6
+assert list(ply.tracks) == [0,0,0,0,1,1]
+assert abs(ply.surface() - 4) < 1e-6
+
+# test madcad
+write(original, 'tests/test_io.madcad')
+native = read('tests/test_io.madcad')
+native.check()
+assert list(native.points) == list(original.points)
+assert list(native.faces) == list(original.faces)
+assert list(native.tracks) == list(original.tracks)
+assert native.groups == original.groups
+native.points[0] = vec3(2)
+assert read('tests/test_io.madcad').points[0] == original.points[0]
+
+write({'any': 'object'}, 'tests/test_io.madcad')
+assert read('tests/test_io.madcad') == {'any': 'object'}
+os.remove('tests/test_io.madcad')
+
+# test function cache
+import tempfile
+from madcad import io
+functioncache = io.functioncache
+io.functioncache = FunctionCache(tempfile.mkdtemp(), maxsize=30000, memsize=2)
+calls = []
+@cachefunc
+def cached(x):
+	calls.append(x)
+	return extrusion(vec3(0,0,x), Web([vec3(0), vec3(1,0,0)], [(0,1)]))
+assert cached(1) is cached(1)
+io.functioncache.memory.clear()
+assert list(cached(1).points) == list(cached(1).points)
+assert calls == [1]
+assert io.functioncache.stats()['loads'] == 1
+for i in range(100):
+	cached(i)
+assert io.functioncache.size <= io.functioncache.maxsize
+io.functioncache.clear()
+io.functioncache = functioncache
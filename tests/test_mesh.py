@@ -42,12 +42,49 @@ m = bri.group({0,1})
 m = bri.group({0,2}).frontiers({2,None})
 assert set(m.edges) == {uvec2( 0, 4 ), uvec2( 4, 5 ), uvec2( 1, 5 )}
 
+# test topology
+s = icosphere(vec3(0), 1)
+s.track()
+topology = s.topology()
+assert s.topology() is topology
+conn = connef(s.faces)
+assert all(topology.edgeface(*e) == f  for e, f in conn.items())
+assert topology.edgeface(0, 0) == -1
+assert (topology.twins >= 0).all()
+assert len(topology.edges()) == len(s.edges()) == len(s.faces)*3//2
+assert set(topology.pointfaces(0).tolist()) == {f  for e, f in conn.items() if e[0] == 0}
+s.faces.pop()
+s.tracks.pop()
+assert s.topology() is not topology
+assert len(s.outlines_oriented()) == 3 and not s.isenvelope()
+# duplicated half-edges are paired one to one, the copy left alone is a border
+b = brick(width=vec3(1))
+b.faces.append(b.faces[0])
+b.tracks.append(b.tracks[0])
+assert not b.isenvelope() and len(b.outlines().edges) == 3
+assert all(b.vertexnormals()[i] == vec3(0,-1,0)  for i in range(3))
+m = brick(width=vec3(1)) + brick(center=vec3(1,0,0), width=vec3(1))
+m.mergeclose()
+m.faces.append(m.faces[0])
+m.tracks.append(m.tracks[0])
+f = m.faces[3]
+m.faces[3] = uvec3(f[2], f[1], f[0])
+assert all(isfinite(n)  for n in m.vertexnormals())
+
 # test transform
 m = Mesh([vec3(0,0,0), vec3(1,0,0), vec3(0,1,0)], [(0,1,2)]).transform(vec3(0,0,-5))
 m.check()
 # test distance
 assert abs(mesh_distance(m, ico)[0] - 4) < 0.2
 
+# test mergeclose on unshared points
+s = icosphere(vec3(0), 1)
+m = Mesh([s.points[i]  for f in s.faces for i in f], [uvec3(i, i+1, i+2)  for i in range(0, 3*len(s.faces), 3)], [0]*len(s.faces))
+m.mergeclose()
+m.check()
+assert len(m.points) == len(s.points) and len(m.faces) == len(s.faces)
+assert m.isenvelope()
+
 # test orientation
 ico = icosphere(vec3(0), 1)
 ico.faces = typedlist((f if random()>0.5 else (f[0],f[2],f[1])	for f in ico.faces), dtype=uvec3)
@@ -87,3 +124,162 @@ assert bri.groups[0] == {'truc':None, 'machin':None, 'bidule':None}
 assert bri.groups[1] == {'machin':None}
 assert len(bri.group(['truc', 'machin']).faces) == 2
 nprint('groups', bri.groups)
+
+
+# test suites assembly
+assert suites([(0,1), (2,3), (1,2)]) == [[0,1,2,3]]
+assert suites([(1,0), (1,2)]) == [[1,2], [1,0]]
+assert suites([(1,0), (1,2)], oriented=False) == [[0,1,2]]
+assert suites([(0,1), (1,2), (2,0), (0,3)], loop=True) == [[0,1,2,0], [0,3]]
+assert suites([(0,1), (1,2), (2,3), (1,4)]) == [[0,1], [1,2,3], [1,4]]
+assert suites([uvec2(0,1), uvec2(1,2), uvec2(5,6)]) == [[5,6], [0,1,2]]
+indices, offsets = suites([(0,1), (1,2), (4,5)], array=True)
+assert indices.tolist() == [4,5, 0,1,2] and offsets.tolist() == [0,2,5]
+
+
+# test vectorized geometric queries
+m = icosphere(vec3(1,2,3), 2)
+points, faces, tracks = m.arrays()
+assert points.shape == (len(m.points), 3) and faces.shape == (len(m.faces), 3) and len(tracks) == len(m.faces)
+assert all(distance(n, m.facenormal(f)) < 1e-12  for n, f in zip(m.facenormals(), m.faces))
+assert all(distance(n, normalize(p - vec3(1,2,3))) < 0.2  for n, p in zip(m.vertexnormals(), m.points))
+assert abs(m.surface() - sum(length(cross(b-a, c-a))  for a,b,c in map(m.facepoints, m.faces))/2) < 1e-9
+assert distance(m.barycenter(), vec3(1,2,3)) < 1e-9
+assert 0 < m.volume() < 4/3*pi*8
+b = brick(min=vec3(-1,0,1), max=vec3(3,4,5))
+assert b.box().min == vec3(-1,0,1) and b.box().max == vec3(3,4,5)
+assert b.maxnum() == 5
+assert abs(b.volume() - 64) < 1e-9
+
+
+# test points stripping
+m = brick(width=vec3(1))
+m.points.insert(0, vec3(5))
+m.points.append(vec3(6))
+m.faces = typedlist([f+uvec3(1)  for f in m.faces], uvec3)
+faces = m.faces
+reindex = m.strippoints()
+m.check()
+assert list(reindex) == [-1, *range(8), -1]
+assert len(m.points) == 8 and vec3(5) not in m.points
+assert faces is not m.faces and faces[0] == m.faces[0]+uvec3(1)
+
+
+# test concatenation
+a = brick(width=vec3(1))
+b = icosphere(vec3(2,0,0), 1)
+c = Mesh.concatenate([a, b, a])
+c.check()
+assert len(c.points) == 2*len(a.points)+len(b.points) and len(c.faces) == 2*len(a.faces)+len(b.faces)
+assert len(c.groups) == 2*len(a.groups)+len(b.groups)
+s = a+b+a
+assert c.points == s.points and c.faces == s.faces and c.tracks == s.tracks
+c = Mesh.concatenate([a, a.own(faces=True)])
+assert c.points is not a.points and c.groups is not a.groups and len(c.groups) == 2*len(a.groups)
+c.groups.append(None)
+assert len(a.groups) == 6
+c = Mesh.concatenate([a, a.own(faces=True)], share=True)
+assert c.points is a.points and c.groups is a.groups
+w = Web.concatenate([web(a.frontiers(0,1)), web(b.outlines()), Web()])
+w.check()
+assert w.edges == (web(a.frontiers(0,1)) + web(b.outlines())).edges
+
+
+# untracked meshes see the direct modifications of their buffers
+m = brick(width=vec3(1))
+precision = m.precision()
+assert m.box().max == vec3(0.5) and m.isenvelope()
+m.points[0] = vec3(100)
+f = m.faces[3]
+m.faces[3] = uvec3(f[2], f[1], f[0])
+assert m.box().max == vec3(100) and m.precision() > precision
+assert not m.isenvelope() and len(m.outlines().edges) > 0
+
+# test change tracking
+m = brick(width=vec3(2))
+changes = m.track()
+assert m.box().max == vec3(1) and m.topology() is m.topology()
+version = changes.version
+i = m.usepointat(vec3(3,0,0))
+assert changes.since(m, 'points', version) == slice(i, i+1)
+unchanged = changes.since(m, 'faces', version)
+assert unchanged.start == unchanged.stop
+assert m.box().max == vec3(3,1,1) and m.maxnum() == 3
+m.points[0] = vec3(-5)
+m.touch('points', 0, 1)
+assert m.box().min == vec3(-5) and m.maxnum() == 5
+topology = m.topology()
+m += brick(min=vec3(4), max=vec3(5))
+assert m.topology() is not topology and len(m.topology()) == 3*len(m.faces)
+# the appended faces are merged in the topology
+rebuilt = Topology(m.faces)
+assert all((getattr(m.topology(), name) == getattr(rebuilt, name)).all()  for name in ('keys', 'order', 'offsets', 'twins'))
+# unreported resizing is detected
+m.points.append(vec3(0,0,8))
+assert m.box().max == vec3(5,5,8)
+# in-place methods report their changes
+m = brick(width=vec3(2))
+m.track()
+f = m.faces[0]
+m.faces[0] = uvec3(f[2], f[1], f[0])
+m.touch('faces', 0, 1)
+assert len(m.topology().borders()) == 6
+m.orient()
+assert len(m.topology().borders()) == 0
+
+
+# test vectorized group selection
+m = brick(width=vec3(1))
+m.qualify('side', select={1,2,3})
+m.qualify('top', select=3)
+assert m.groupmask('side').tolist() == [False, True, True, True, False, False]
+assert m.groupmask(['side', 'top']).tolist() == [False, False, False, True, False, False]
+assert m.qualified_mask({0,3}).tolist() == [t in (0,3)  for t in m.tracks]
+assert list(m.qualified_indices('top')) == [i  for i,t in enumerate(m.tracks) if t == 3]
+part = m.group('side')
+assert len(part.faces) == 6 and set(part.tracks) == {1,2,3}
+
+
+# test transformations
+m = icosphere(vec3(1,2,3), 1)
+for trans in [2, vec3(1,-2,3), angleAxis(0.4, Y), rotate(0.3, X), translate(vec3(1,2,3))*rotate(0.7,Y)*scale(vec3(1,1,2))]:
+	transformed = m.transform(trans)
+	assert transformed.faces is m.faces
+	assert all(a == transformer(trans)(b)  for a, b in zip(transformed.points, m.points))
+placed = m.instances([translate(vec3(i,0,0))  for i in range(4)])
+assert len(placed) == 4 and all(p.faces is m.faces  for p in placed)
+assert placed[3].points[0] == m.points[0] + vec3(3,0,0)
+
+
+# test vectorized validation
+m = brick(width=vec3(1))
+assert all(len(faulty) == 0  for faulty in m.validate().values())
+m.faces.extend([m.faces[2], uvec3(0,0,1), uvec3(0,1,len(m.points))])
+m.tracks.extend([0, 0, len(m.groups)])
+m.points[3] = vec3(nan)
+report = m.validate()
+assert report['points'].tolist() == [3]
+assert report['duplicated'].tolist() == [12]
+assert report['degenerated'].tolist() == [13]
+assert report['indices'].tolist() == [14]
+assert report['tracks'].tolist() == [14]
+assert not m.isvalid()
+w = brick(width=vec3(1)).frontiers()
+w.edges.append(uvec2(1,1))
+w.tracks.append(0)
+assert w.validate()['degenerated'].tolist() == [len(w.edges)-1] and not w.isvalid()
+
+
+# test mask filtering
+m = brick(width=vec3(1))
+up = m.filter(typedlist_view(m.facenormals())[:,2] > 0)
+assert len(up.faces) == 2 and up.points is m.points and up.groups is m.groups
+assert list(m.filter({3, 0}).faces) == [m.faces[0], m.faces[3]]
+assert list(m.filter(range(len(m.faces))).faces) == list(m.faces)
+assert len(m.filter([]).faces) == 0
+assert list(m.group({1}).tracks) == [t for t in m.tracks if t == 1]
+w = m.frontiers()
+assert list(w.filter(selection_mask([0], len(w.edges))).edges) == [w.edges[0]]
+try:	m.filter([True])
+except ValueError:	pass
+else:	assert False, 'mask of wrong size'
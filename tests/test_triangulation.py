@@ -88,5 +88,52 @@ face = triangulation(lines)
 face.check()
 assert face.issurface()
 
+# constrained delaunay test
+print('case cdt')
+delaunay = triangulation(lines, method='cdt')
+delaunay.check()
+assert delaunay.issurface()
+assert delaunay.points is lines.points and len(delaunay.faces) == len(face.faces)
+assert abs(delaunay.surface() - face.surface()) < 1e-9
+refined = triangulation(lines, method='cdt', minangle=radians(20), maxarea=0.01)
+refined.check()
+assert refined.issurface()
+assert len(refined.points) > len(lines.points)
+assert abs(refined.surface() - face.surface()) < 1e-9
+for a,b,c in refined.faces:
+	a,b,c = refined.points[a], refined.points[b], refined.points[c]
+	assert length(cross(b-a, c-a))/2 <= 0.01
+	assert min(anglebt(b-a, c-a), anglebt(a-b, c-b), anglebt(a-c, b-c)) >= radians(20)-1e-9
+
+# batch triangulation test
+print('case many')
+outlines = [web(Circle((vec3(3*i,0,0),Z), 1))  for i in range(4)] + [lines]
+batch, offsets = triangulate_many(outlines)
+batch.check()
+assert len(offsets) == len(outlines)+1 and offsets[-1] == len(batch.faces)
+for i, outline in enumerate(outlines):
+	single = triangulation_closest(outline)
+	assert offsets[i+1] - offsets[i] == len(single.faces)
+	assert set(batch.tracks[offsets[i]:offsets[i+1]]) == {i}
+	assert abs(batch.group(i).surface() - single.surface()) < 1e-9
+shared = Wire(lines.points, [0,1,2,3])
+batch, offsets = triangulate_many([shared, shared], workers=2)
+assert batch.points is lines.points and offsets == [0, 2, 4]
+
+# many holes test, spread over the grid of the bridges search
+print('case holes')
+holes = web([Circle((O,Z), 12)] + [
+			Circle((vec3(3*i-6, 3*j-6, 0),-Z), 1, resolution=('div',12))
+			for i in range(5) for j in range(5)])
+holes.mergeclose()
+bridges = line_bridges(holes)
+assert len(bridges.edges) == 2*25
+plate = triangulation(holes)
+plate.check()
+assert plate.issurface()
+disc = triangulation(web(Circle((O,Z), 12)))
+hole = triangulation(web(Circle((O,Z), 1, resolution=('div',12))))
+assert abs(plate.surface() - (disc.surface() - 25*hole.surface())) < 1e-9
+
 # final display
 show([face], options={'display_wire':True})
@@ -26,6 +26,18 @@ for shapename in ['rectangle', 'scomplex', 'scircle', 'sharicot']:
 	mesh.issurface()
 	print(mesh.faces)
 
+# many non convex points, spread over the grid of the ear clipping
+teeth = 40
+comb = []
+for i in range(teeth):
+	comb += [vec3(2*i,0,0), vec3(2*i,5,0), vec3(2*i+1,5,0), vec3(2*i+1,1,0)]
+comb = Wire(comb + [vec3(2*teeth,1,0), vec3(2*teeth,-1,0), vec3(0,-1,0)])
+mesh = triangulation_outline(comb, vec3(0,0,-1))
+mesh.check()
+assert mesh.issurface()
+assert len(mesh.faces) == len(comb.indices)-2
+assert abs(mesh.surface() - (7.5*teeth + 0.5)) < 1e-9
+
 # display a specific case
 shape = scomplex
 mesh = triangulation_outline(shape, vec3(0,0,1))